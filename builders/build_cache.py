@@ -0,0 +1,218 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+A persistent (SQLite) cache of populated items and monsters, used by the item
+and monster builders to skip wikitext parsing, cleaning and validation of
+entries whose inputs have not changed.
+
+While an entry is populated, every builder input (for example, the cache data,
+the processed wikitext and the buy limits) is wrapped in an InputRecorder, which
+records each key that is read. The cache stores the populated properties with a
+fingerprint of every input entry that was read, so the wikitext slice, version
+and auxiliary entries of the entry are exactly the inputs that were used. A
+cached entry is only used when the builder code version is the same, and every
+recorded input entry has the same fingerprint. Cached entries are not validated
+again, so the schema file is part of the code version.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import json
+import sqlite3
+import hashlib
+import inspect
+from pathlib import Path
+from types import ModuleType
+from collections.abc import Mapping
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Iterable
+from typing import Optional
+
+import mwparserfromhell
+
+import osrsbox
+from osrsbox import codec
+
+BUILD_CACHE_VERSION = 1
+# The number of stored entries between commits, so an interrupted build keeps most entries
+COMMIT_INTERVAL = 1000
+
+# The fingerprint of an input key that does not exist
+MISSING = ""
+
+
+def fingerprint(value: Any) -> str:
+    """Return a short fingerprint of a JSON value.
+
+    :param value: A JSON value, for example, the buy limit of an item.
+    :return: A hex digest, the same for equal values.
+    """
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def entry_fingerprint(data: Mapping, key: Any) -> str:
+    """Return the fingerprint of one input entry, or MISSING when the key does not exist.
+
+    :param data: The input, for example, the buy limits dictionary.
+    :param key: The key of the entry.
+    :return: A hex digest.
+    """
+    try:
+        return fingerprint(data[key])
+    except (KeyError, TypeError):
+        return MISSING
+
+
+def library_versions() -> Dict[str, str]:
+    """Return the versions of the libraries that populate an entry, the wikitext parser and osrsbox.
+
+    :return: A dictionary of library name to version.
+    """
+    return {"mwparserfromhell": mwparserfromhell.__version__, "osrsbox": osrsbox.__version__}
+
+
+def code_version(*modules: ModuleType, data_files: Iterable[Path] = ()) -> str:
+    """Return a version of the builder code, that changes when any of the source or data files,
+    or the library versions, change.
+
+    :param modules: The modules used to populate an entry, for example, `build_item`.
+    :param data_files: Files that a cached entry is checked with, for example, the schema it was validated with.
+    :return: A hex digest of the cache format version, the library versions, the source files and the data files.
+    """
+    digest = hashlib.sha256(str(BUILD_CACHE_VERSION).encode("utf-8"))
+    digest.update(json.dumps(library_versions(), sort_keys=True).encode("utf-8"))
+    paths = [inspect.getsourcefile(module) for module in modules] + list(data_files)
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class InputRecorder(Mapping):
+    """This class wraps a builder input, and records every key that is read.
+
+    :param data: The input, for example, the buy limits dictionary.
+    """
+    def __init__(self, data: Mapping):
+        self.data = data
+        self.keys_read = set()
+        # Iterating the input reads every entry, the result cannot be cached
+        self.iterated = False
+
+    def __getitem__(self, key: Any) -> Any:
+        self.keys_read.add(key)
+        return self.data[key]
+
+    def __iter__(self):
+        self.iterated = True
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        self.iterated = True
+        return len(self.data)
+
+
+def recorded_inputs(recorders: Dict[str, InputRecorder]) -> Optional[List[List]]:
+    """Return the fingerprint of every input entry that was read.
+
+    :param recorders: A dictionary of input name to InputRecorder.
+    :return: A list of [input name, key, fingerprint], or None when the inputs cannot be recorded.
+    """
+    inputs = list()
+    for name, recorder in recorders.items():
+        if recorder.iterated:
+            return None
+        for key in sorted(recorder.keys_read, key=str):
+            inputs.append([name, key, entry_fingerprint(recorder.data, key)])
+    return inputs
+
+
+class BuildCache:
+    """This class stores populated items or monsters, in a SQLite database.
+
+    :param path_to_database: The path to the SQLite database file, created when missing.
+    :param version: The builder code version, see :func:`code_version`.
+    """
+    def __init__(self, path_to_database: Path, version: str):
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.uncommitted = 0
+        self.connection = sqlite3.connect(str(path_to_database))
+        self.connection.execute("CREATE TABLE IF NOT EXISTS build_cache ("
+                                "entry_id TEXT PRIMARY KEY, "
+                                "code_version TEXT NOT NULL, "
+                                "inputs TEXT NOT NULL, "
+                                "output TEXT NOT NULL)")
+
+    def get(self, entry_id: str, sources: Dict[str, Mapping]) -> Optional[Dict]:
+        """Return the cached properties of an entry, if every recorded input is unchanged.
+
+        :param entry_id: The item or monster ID.
+        :param sources: A dictionary of input name to the current input.
+        :return: The populated properties, or None on a cache miss.
+        """
+        row = self.connection.execute("SELECT inputs, output FROM build_cache WHERE entry_id = ? AND code_version = ?",
+                                      (entry_id, self.version)).fetchone()
+        if row is None or not self._inputs_unchanged(codec.loads(row[0]), sources):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return codec.loads(row[1])
+
+    def inputs(self, entry_id: str) -> Optional[List[List]]:
+        """Return the recorded inputs of a cached entry.
+
+        :param entry_id: The item or monster ID.
+        :return: The recorded inputs, see :func:`recorded_inputs`, or None when the entry is not cached.
+        """
+        row = self.connection.execute("SELECT inputs FROM build_cache WHERE entry_id = ? AND code_version = ?",
+                                      (entry_id, self.version)).fetchone()
+        return codec.loads(row[0]) if row is not None else None
+
+    @staticmethod
+    def _inputs_unchanged(inputs: List[List], sources: Dict[str, Mapping]) -> bool:
+        for name, key, expected in inputs:
+            if name not in sources or entry_fingerprint(sources[name], key) != expected:
+                return False
+        return True
+
+    def put(self, entry_id: str, inputs: List[List], output: str) -> None:
+        """Store the populated properties of an entry.
+
+        :param entry_id: The item or monster ID.
+        :param inputs: The recorded inputs, see :func:`recorded_inputs`.
+        :param output: The populated properties, as JSON.
+        """
+        self.connection.execute("INSERT OR REPLACE INTO build_cache VALUES (?, ?, ?, ?)",
+                                (entry_id, self.version, codec.dumps(inputs), output))
+        self.uncommitted += 1
+        if self.uncommitted >= COMMIT_INTERVAL:
+            self.connection.commit()
+            self.uncommitted = 0
+
+    def close(self) -> None:
+        """Commit the stored entries, and close the database."""
+        self.connection.commit()
+        self.connection.close()
+
+    def print_summary(self) -> None:
+        """Print the count of cache hits and misses."""
+        print(f">>> Build cache: {self.hits} hits, {self.misses} misses")
@@ -62,7 +62,7 @@ class BuildItem:
         self.duplicates = kwargs["duplicates"]
         # The item schema
         self.schema_data = kwargs["schema_data"]
-        # A list of already known (processed) items
+        # A KnownItems index of already known (processed) items
         self.known_items = kwargs["known_items"]
         # Specify verbosity
         self.verbose = kwargs["verbose"]
@@ -594,38 +594,11 @@ class BuildItem:
             self.item_dict["duplicate"] = True
             return None
 
-        # Set the item properties that we want to compare
-        correlation_properties = {
-            "name": False,
-            "wiki_name": False
-        }
-
-        # Loop the list of currently (already processed) items
-        for known_item in self.known_items:
-            # Skip when cache names are not the same
-            if item_properties.name != known_item.name:
-                continue
-
-            # Check equality of each correlation property
-            for cprop in correlation_properties:
-                if getattr(item_properties, cprop) == getattr(known_item, cprop):
-                    correlation_properties[cprop] = True
-
-            # Check all values in correlation properties are True
-            correlation_result = all(value is True for value in correlation_properties.values())
-
-            # If name and wiki_name match, set duplicate property to True
-            if correlation_result:
-                item_properties.duplicate = True
-                self.item_dict["duplicate"] = True
-                return item_properties
-
-            # If wiki_name is None, but cache names match...
-            # The item must also be a duplicate
-            if not item_properties.wiki_name:
-                item_properties.duplicate = True
-                self.item_dict["duplicate"] = True
-                return item_properties
+        # Look up an already processed item with the same name (and wiki_name)
+        if self.known_items.find_duplicate(item_properties) is not None:
+            item_properties.duplicate = True
+            self.item_dict["duplicate"] = True
+            return item_properties
 
         # If we made it this far, no duplicates were found
         item_properties.duplicate = False
@@ -21,12 +21,34 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
-import json
 import argparse
 from pathlib import Path
+from typing import Dict
+from typing import Set
+from typing import List
+from typing import Tuple
+from typing import Optional
 
 import config
+import validator
+from osrsbox import codec
+from builders import parallel_build
+from builders import build_cache
 from builders.items import build_item
+from builders.items import dirty_items
+from builders.items import known_items
+from builders.items import infobox_cleaner
+from scripts.wiki import wikitext_parser
+from scripts.update import update_json_files
+from osrsbox.items_api import item_weapon
+from osrsbox.items_api import item_equipment
+from osrsbox.items_api import item_properties
+from osrsbox.items_api.item_properties import ItemProperties
+
+# The builder inputs that are read to populate an item, recorded for the build cache
+POPULATE_INPUTS = ("all_items_cache_data", "all_wikitext_raw", "all_wikitext_processed") + dirty_items.AUXILIARY_INPUTS
+BUILD_CACHE_FILE = Path(config.DATA_ITEMS_PATH / "items-build-cache.db")
+SCHEMA_FILE = Path(config.DATA_SCHEMAS_PATH / "schema-items.json")
 
 
 class Builder:
@@ -39,149 +61,378 @@ class Builder:
 
         # Load the raw cache data that has been processed (this is ground truth)
         with open(Path(config.DATA_ITEMS_PATH / "items-cache-data.json")) as f:
-            self.all_items_cache_data = json.load(f)
+            self.all_items_cache_data = codec.load(f)
 
         # Load all item data (from min JSON file)
         with open(Path(config.DOCS_PATH / "items-complete.json")) as f:
-            self.all_db_items = json.load(f)
+            self.all_db_items = codec.load(f)
 
         # Load the item wikitext file of page text
         with open(Path(config.DATA_ITEMS_PATH / "items-wiki-page-text.json")) as f:
-            self.all_wikitext_raw = json.load(f)
+            self.all_wikitext_raw = codec.load(f)
 
         # Load the item wikitext file of processed data
         with open(Path(config.DATA_ITEMS_PATH / "items-wiki-page-text-processed.json")) as f:
-            self.all_wikitext_processed = json.load(f)
+            self.all_wikitext_processed = codec.load(f)
 
         # Load dict of unalchable items
         unalchable_items_path = Path(config.DATA_ITEMS_PATH / "items-unalchable.json")
         with open(unalchable_items_path) as f:
-            self.unalchable = json.load(f)
+            self.unalchable = codec.load(f)
 
         # Load buy limit data
         buy_limits_file_path = Path(config.DATA_ITEMS_PATH / "items-buylimits.json")
         with open(buy_limits_file_path) as f:
-            self.buy_limits = json.load(f)
+            self.buy_limits = codec.load(f)
 
         # Load skill requirement data
         skill_requirements_file_path = Path(config.DATA_ITEMS_PATH / "items-skill-requirements.json")
         with open(skill_requirements_file_path) as f:
-            self.skill_requirements = json.load(f)
+            self.skill_requirements = codec.load(f)
 
         # Load stances data
         weapon_stance_file_path = Path(config.DATA_ITEMS_PATH / "weapon-stances.json")
         with open(weapon_stance_file_path) as f:
-            self.weapon_stances = json.load(f)
+            self.weapon_stances = codec.load(f)
 
         # Load icon data
         icons_file_path = Path(config.DATA_ICONS_PATH / "icons-items-complete.json")
         with open(icons_file_path) as f:
-            self.icons = json.load(f)
+            self.icons = codec.load(f)
 
         # Load duplicate item data
         duplicates_file_path = Path(config.DATA_ITEMS_PATH / "items-duplicates.json")
         with open(duplicates_file_path) as f:
-            self.duplicates = json.load(f)
+            self.duplicates = codec.load(f)
 
         # Load schema data
-        with open(Path(config.DATA_SCHEMAS_PATH / "schema-items.json")) as f:
-            self.schema_data = json.load(f)
-
-        # Initialize a list of known items
-        self.known_items = list()
-
-    def run(self):
-        # Start processing every item!
-        for item_id in self.all_items_cache_data:
-
-            # if int(item_id) < 25800:
-            #     continue
-
-            # Skip any beta items
-            if "(beta" in self.all_items_cache_data[item_id]["name"]:
-                continue
-
-            # Initialize the BuildItem class, used for all items
-            builder = build_item.BuildItem(item_id=item_id,
-                                           all_items_cache_data=self.all_items_cache_data,
-                                           all_db_items=self.all_db_items,
-                                           all_wikitext_raw=self.all_wikitext_raw,
-                                           all_wikitext_processed=self.all_wikitext_processed,
-                                           unalchable=self.unalchable,
-                                           buy_limits=self.buy_limits,
-                                           skill_requirements=self.skill_requirements,
-                                           weapon_stances=self.weapon_stances,
-                                           icons=self.icons,
-                                           duplicates=self.duplicates,
-                                           schema_data=self.schema_data,
-                                           known_items=self.known_items,
-                                           verbose=self.verbose)
-
+        with open(SCHEMA_FILE) as f:
+            self.schema_data = codec.load(f)
+
+        # Initialize an index of known items
+        self.known_items = known_items.KnownItems()
+
+        # The cache of populated items, see open_build_cache
+        self.build_cache = None
+
+        # The auxiliary input keys read to build each item, saved in the build state, see dirty_items
+        self.item_inputs = dict()
+
+    def open_build_cache(self, path_to_database: Path = BUILD_CACHE_FILE):
+        """Use a persistent cache of populated items, to skip items with unchanged inputs.
+
+        :param path_to_database: The path to the SQLite database file.
+        """
+        version = build_cache.code_version(build_item, infobox_cleaner, wikitext_parser,
+                                           item_properties, item_equipment, item_weapon, validator,
+                                           data_files=[SCHEMA_FILE])
+        self.build_cache = build_cache.BuildCache(path_to_database, version)
+
+    def cached_item(self, item_id: str) -> Optional[Dict]:
+        """Return the cached item properties of an item, populated from the same inputs.
+
+        :param item_id: The item ID number, as a string.
+        :return: The populated item properties, or None when there is no build cache, or a cache miss.
+        """
+        if self.build_cache is None:
+            return None
+        return self.build_cache.get(item_id, {name: getattr(self, name) for name in POPULATE_INPUTS})
+
+    def store_item(self, item_id: str, inputs: Optional[List], populated: str):
+        """Store populated item properties in the build cache, after the item is validated.
+
+        :param item_id: The item ID number, as a string.
+        :param inputs: The recorded inputs of the item, or None when they were not recorded.
+        :param populated: The populated item properties, as JSON.
+        """
+        # Cached items are not validated again, so only validated items are stored
+        if self.build_cache is not None and self.validate and inputs is not None:
+            self.build_cache.put(item_id, inputs, populated)
+
+    def item_ids(self) -> List[str]:
+        """Return the IDs of the items to build, in cache order, skipping any beta items."""
+        return [item_id for item_id in self.all_items_cache_data
+                if "(beta" not in self.all_items_cache_data[item_id]["name"]]
+
+    def item_builder(self, item_id: str, item_dict: Dict = None) -> build_item.BuildItem:
+        """Initialize the BuildItem class, used for all items.
+
+        :param item_id: The item ID number, as a string.
+        :param item_dict: The item properties, when the item is already populated.
+        :return: A BuildItem object.
+        """
+        builder = build_item.BuildItem(item_id=item_id,
+                                       all_items_cache_data=self.all_items_cache_data,
+                                       all_db_items=self.all_db_items,
+                                       all_wikitext_raw=self.all_wikitext_raw,
+                                       all_wikitext_processed=self.all_wikitext_processed,
+                                       unalchable=self.unalchable,
+                                       buy_limits=self.buy_limits,
+                                       skill_requirements=self.skill_requirements,
+                                       weapon_stances=self.weapon_stances,
+                                       icons=self.icons,
+                                       duplicates=self.duplicates,
+                                       schema_data=self.schema_data,
+                                       known_items=self.known_items,
+                                       verbose=self.verbose)
+        if item_dict is not None:
+            builder.item_dict = item_dict
+        return builder
+
+    def populate_item(self, item_id: str, timer: parallel_build.PhaseTimer,
+                      record_inputs: bool = False) -> build_item.BuildItem:
+        """Preprocess and populate one item, this does not depend on any other item.
+
+        :param item_id: The item ID number, as a string.
+        :param timer: The PhaseTimer to add the phase times to.
+        :param record_inputs: Record the inputs that are read, as `inputs_read`, for the build cache.
+        :return: The populated BuildItem object.
+        """
+        builder = self.item_builder(item_id)
+        recorders = dict()
+        if record_inputs:
+            for name in POPULATE_INPUTS:
+                recorders[name] = build_cache.InputRecorder(getattr(self, name))
+                setattr(builder, name, recorders[name])
+
+        with timer.phase("preprocessing"):
             status = builder.preprocessing()
 
+        with timer.phase("populate"):
             if status["status"]:
                 builder.populate_wiki_item()
             else:
                 builder.populate_non_wiki_item()
 
+        builder.inputs_read = build_cache.recorded_inputs(recorders) if record_inputs else None
+        return builder
+
+    def check_duplicate_item(self, builder: build_item.BuildItem, timer: parallel_build.PhaseTimer) -> List[str]:
+        """Determine if an item is a duplicate, this must be called for every item in cache order.
+
+        :param builder: The populated BuildItem object.
+        :param timer: The PhaseTimer to add the phase time to.
+        :return: The keys of the known duplicates that were read.
+        """
+        recorder = build_cache.InputRecorder(self.duplicates)
+        builder.duplicates = recorder
+        with timer.phase("duplicates"):
             known_item = builder.check_duplicate_item()
             if known_item:
-                self.known_items.append(known_item)
-            if self.compare:
+                self.known_items.add(known_item)
+        return sorted(recorder.keys_read)
+
+    def finish_item(self, builder: build_item.BuildItem, timer: parallel_build.PhaseTimer, cached: bool = False) -> Dict:
+        """Compare, export and validate one item, after the duplicate check.
+
+        :param builder: The populated BuildItem object.
+        :param timer: The PhaseTimer to add the phase times to.
+        :param cached: The item is from the build cache, and was validated when it was stored.
+        :return: The final item properties.
+        """
+        if self.compare:
+            with timer.phase("compare"):
                 builder.compare_new_vs_old_item()
-            if self.export:
+        if self.export:
+            with timer.phase("export"):
                 builder.export_item_to_json()
-            if self.validate:
+        if self.validate and not cached:
+            with timer.phase("validate"):
                 builder.validate_item()
+        return builder.item_dict
+
+    def add_known_item(self, item_id: str, timer: parallel_build.PhaseTimer):
+        """Add an item that is not rebuilt to the known items, using the existing database entry.
+
+        In an incremental build, the duplicate check of a rebuilt item still depends
+        on every earlier item, so this must be called in cache order.
+
+        :param item_id: The item ID number, as a string.
+        :param timer: The PhaseTimer to add the phase time to.
+        """
+        with timer.phase("duplicates"):
+            if item_id not in self.all_db_items or item_id in self.duplicates:
+                return
+            item_properties = ItemProperties.from_json(dict(self.all_db_items[item_id]))
+            # The same items that BuildItem.check_duplicate_item returns
+            if not (item_properties.stacked or item_properties.noted or item_properties.placeholder):
+                self.known_items.add(item_properties)
+
+    def build(self, workers: int = 1, item_ids: List[str] = None) -> Dict[str, Dict]:
+        """Build every item, or only some items, serially or with a pool of worker processes.
+
+        A timing summary of each phase is printed after the build. An item that fails
+        does not stop the build, every error is reported after the timing summary,
+        and then the build exits with status 1.
+
+        :param workers: The number of worker processes, 1 to build serially.
+        :param item_ids: The IDs of the items to build, or None for every item.
+        :return: A dictionary of item ID to the final item properties, of every built item.
+        """
+        timer = parallel_build.PhaseTimer()
+        all_item_ids = self.item_ids()
+        dirty = set(all_item_ids if item_ids is None else item_ids)
+        item_dicts, errors = self.build_items(workers, all_item_ids, dirty, timer)
+        timer.print_summary()
+        if self.build_cache is not None:
+            self.build_cache.print_summary()
+            self.build_cache.close()
+            self.build_cache = None
+
+        if errors:
+            parallel_build.print_error_report(errors)
+            exit(1)
+        return item_dicts
+
+    def build_items(self, workers: int, all_item_ids: List[str], dirty: Set[str],
+                    timer: parallel_build.PhaseTimer) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+        """Build items, with a pool of worker processes, or in this process.
+
+        Items are populated, and then compared, exported and validated, as tasks
+        run by the workers (or by this process, with 1 worker). The duplicate check
+        is run by this process in cache order, so the output is the same for any
+        number of workers. An item that fails does not stop the build, the error is
+        returned instead.
+
+        :param workers: The number of worker processes, 1 to build serially.
+        :param all_item_ids: The IDs of every item, in cache order.
+        :param dirty: The IDs of the items to build.
+        :param timer: The PhaseTimer to add the phase times to.
+        :return: A dictionary of item ID to the final item properties, and a dictionary of item ID to the error.
+        """
+        global _worker_builder
+        # Workers (forked, or this process) share this builder, and the inputs it has loaded
+        _worker_builder = self
+
+        options = dict(verbose=self.verbose, compare=self.compare, export=self.export, validate=self.validate)
+        # The inputs are recorded for the build cache, and for the build state of an exported build
+        record_inputs = self.build_cache is not None or self.export
+        errors = dict()
+        item_dicts = dict()
+        # Items from the build cache are not populated again
+        cached_ids = set()
+        # The recorded inputs of each item, and the populated JSON of each item to store in the build cache
+        inputs = dict()
+        populated = dict()
+        item_ids = list()
+        for item_id in all_item_ids:
+            if item_id in dirty:
+                item_dict = self.cached_item(item_id)
+                if item_dict is not None:
+                    item_dicts[item_id] = item_dict
+                    inputs[item_id] = self.build_cache.inputs(item_id)
+                    cached_ids.add(item_id)
+                else:
+                    item_ids.append(item_id)
+
+        with parallel_build.task_runner(workers, _init_worker, (options, record_inputs)) as run_tasks:
+            for result in run_tasks(_populate_worker, item_ids):
+                if parallel_build.collect_result(result, timer, errors):
+                    item_dicts[result.key], inputs[result.key] = result.value
+                    if self.build_cache is not None:
+                        populated[result.key] = codec.dumps(item_dicts[result.key])
+
+            duplicates_read = dict()
+            for item_id in all_item_ids:
+                if item_id in item_dicts:
+                    duplicates_read[item_id] = self.check_duplicate_item(self.item_builder(item_id, item_dicts[item_id]), timer)
+                elif item_id not in dirty:
+                    self.add_known_item(item_id, timer)
+
+            # Items are finished in cache order
+            entries = [(item_id, item_dicts[item_id], item_id in cached_ids) for item_id in all_item_ids if item_id in item_dicts]
+            for result in run_tasks(_finish_worker, entries):
+                if parallel_build.collect_result(result, timer, errors):
+                    item_dicts[result.key] = result.value
+                    if result.key in populated:
+                        self.store_item(result.key, inputs[result.key], populated[result.key])
+                    if record_inputs:
+                        self.item_inputs[result.key] = dirty_items.auxiliary_keys(inputs[result.key], duplicates_read[result.key])
+                else:
+                    del item_dicts[result.key]
+        return item_dicts, errors
+
+    def build_incremental(self, workers: int = 1):
+        """Build only the dirty items, and patch the item JSON files in place.
+
+        See `dirty_items` for how the dirty items are determined. The build state is
+        saved after every exported build, incremental or not.
+
+        :param workers: The number of worker processes, 1 to build serially.
+        """
+        item_ids, removed_ids = dirty_items.dirty_item_ids(self,
+                                                           dirty_items.load_cache_changes(),
+                                                           dirty_items.load_build_state(),
+                                                           dirty_items.load_page_titles())
+        print(f">>> Incremental build: {len(item_ids)} dirty items, {len(removed_ids)} removed items")
+        item_dicts = self.build(workers, item_ids)
+
+        if self.export:
+            items = {int(item_id): ItemProperties(**item_dict).construct_json() for item_id, item_dict in item_dicts.items()}
+            for item_id in removed_ids:
+                try:
+                    Path(config.DOCS_PATH, "items-json", f"{item_id}.json").unlink()
+                except FileNotFoundError:
+                    pass
+            update_json_files.patch_items_files(items, removed_ids)
+
+    def run(self, workers: int = 1, incremental: bool = False):
+        # Start processing every item, or only the dirty items!
+        if incremental:
+            self.build_incremental(workers)
+        else:
+            self.build(workers)
+        if self.export:
+            dirty_items.write_build_state(self)
 
         # Done processing, rejoice!
         print("Built.")
         exit(0)
 
-    def test(self):
-        # Start processing every item!
-        for item_id in self.all_items_cache_data:
-
-            # if int(item_id) < 25800:
-            #     continue
-
-            # Skip any beta items
-            if "(beta" in self.all_items_cache_data[item_id]["name"]:
-                continue
-
-            # Initialize the BuildItem class, used for all items
-            builder = build_item.BuildItem(item_id=item_id,
-                                           all_items_cache_data=self.all_items_cache_data,
-                                           all_db_items=self.all_db_items,
-                                           all_wikitext_raw=self.all_wikitext_raw,
-                                           all_wikitext_processed=self.all_wikitext_processed,
-                                           unalchable=self.unalchable,
-                                           buy_limits=self.buy_limits,
-                                           skill_requirements=self.skill_requirements,
-                                           weapon_stances=self.weapon_stances,
-                                           icons=self.icons,
-                                           duplicates=self.duplicates,
-                                           schema_data=self.schema_data,
-                                           known_items=self.known_items,
-                                           verbose=self.verbose)
-
-            status = builder.preprocessing()
-
-            if status["status"]:
-                builder.populate_wiki_item()
-            else:
-                builder.populate_non_wiki_item()
-
-            known_item = builder.check_duplicate_item()
-            if known_item:
-                self.known_items.append(known_item)
-            builder.validate_item()
+    def test(self, workers: int = 1):
+        # Start processing every item, only validating the result
+        self.compare = False
+        self.export = False
+        self.validate = True
+        self.build(workers)
 
         # Done testing, rejoice!
         print("Tested.")
         exit(0)
 
 
+# The Builder used by worker processes, shared with the main process when forked
+_worker_builder = None
+# Whether worker processes record the inputs of each item, for the build cache and the build state
+_record_inputs = False
+
+
+def _init_worker(options: Dict, record_inputs: bool):
+    """Load the builder inputs in a worker process, unless they were inherited by forking, or shared by a serial build."""
+    global _worker_builder, _record_inputs
+    if _worker_builder is None:
+        _worker_builder = Builder(**options)
+    # The build cache is only read and written by the main process
+    _record_inputs = record_inputs
+
+
+def _populate_item_dict(item_id: str, timer: parallel_build.PhaseTimer) -> Tuple[Dict, Optional[List]]:
+    builder = _worker_builder.populate_item(item_id, timer, _record_inputs)
+    return builder.item_dict, builder.inputs_read
+
+
+def _finish_item_dict(item_id: str, item_dict: Dict, cached: bool, timer: parallel_build.PhaseTimer) -> Dict:
+    return _worker_builder.finish_item(_worker_builder.item_builder(item_id, item_dict), timer, cached)
+
+
+def _populate_worker(item_id: str) -> parallel_build.TaskResult:
+    return parallel_build.run_task(item_id, _populate_item_dict, item_id)
+
+
+def _finish_worker(entry: Tuple[str, Dict, bool]) -> parallel_build.TaskResult:
+    return parallel_build.run_task(entry[0], _finish_item_dict, *entry)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Build item database.")
     parser.add_argument('--verbose',
@@ -204,13 +455,28 @@ if __name__ == "__main__":
                         default=False,
                         required=False,
                         help='A boolean of whether to test the builder process.')
+    parser.add_argument('--incremental',
+                        default=False,
+                        required=False,
+                        help='A boolean of whether to only build the dirty items, and patch the JSON files.')
+    parser.add_argument('--build-cache',
+                        default=False,
+                        required=False,
+                        help='A boolean of whether to reuse populated items with unchanged inputs.')
+    parser.add_argument('--workers',
+                        default=1,
+                        type=int,
+                        required=False,
+                        help='The number of worker processes, 1 to build serially.')
     args = parser.parse_args()
 
     builder = Builder(verbose=args.verbose,
                       compare=args.compare,
                       export=args.export,
                       validate=args.validate)
+    if args.build_cache:
+        builder.open_build_cache()
     if args.test:
-        builder.test()
+        builder.test(args.workers)
     else:
-        builder.run()
+        builder.run(args.workers, args.incremental)
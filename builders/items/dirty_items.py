@@ -0,0 +1,276 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Determine the dirty items for an incremental item build.
+
+An item is dirty when one of the inputs used to build it has changed since the
+last build:
+
+- The cache definition: the added and changed item IDs, from the change set
+  saved by `scripts/cache/determine_changes.py`.
+- The wikitext: a wiki page with a new revision timestamp (or a page that was
+  added or removed) in `items-wiki-page-titles.json`.
+- An auxiliary input: an entry in the unalchable items, buy limits, skill
+  requirements, weapon stances, icons or known duplicates, that was read when
+  the item was last built.
+
+The page revision timestamps, a fingerprint of every auxiliary entry, and the
+auxiliary keys each item read (recorded by an InputRecorder, so a lookup of a
+missing entry counts too) are saved in a build state file after each exported
+build, and compared with the current inputs. An item without recorded keys is
+always dirty. The noted and placeholder variants of a dirty item, and any item
+with the same name (the duplicate check depends on earlier items with the same
+name), are dirty too.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Iterable
+from typing import Optional
+from urllib.parse import unquote
+
+import config
+from osrsbox import codec
+from builders.build_cache import fingerprint
+
+CACHE_CHANGES_FILE = Path(config.DATA_ITEMS_PATH / "items-cache-changes.json")
+BUILD_STATE_FILE = Path(config.DATA_ITEMS_PATH / "items-build-state.json")
+PAGE_TITLES_FILE = Path(config.DATA_ITEMS_PATH / "items-wiki-page-titles.json")
+
+# The Builder attributes of auxiliary inputs
+AUXILIARY_INPUTS = ("unalchable", "buy_limits", "skill_requirements", "weapon_stances", "icons", "duplicates")
+
+
+def changed_keys(old: Dict, new: Dict) -> List[str]:
+    """Return the keys that were added, removed or changed between two dictionaries.
+
+    :param old: The dictionary from the last build.
+    :param new: The current dictionary.
+    :return: A sorted list of keys.
+    """
+    return sorted(key for key in old.keys() | new.keys() if old.get(key) != new.get(key))
+
+
+def auxiliary_keys(inputs_read: Optional[List[List]], duplicates_read: Iterable[str]) -> Optional[Dict[str, List[str]]]:
+    """Return the auxiliary entries an item was built from, by auxiliary input.
+
+    :param inputs_read: The recorded inputs of the populated item, see `build_cache.recorded_inputs`.
+    :param duplicates_read: The keys of the known duplicates read by the duplicate check.
+    :return: A dictionary of auxiliary input name to the keys read, or None when the inputs were not recorded.
+    """
+    if inputs_read is None:
+        return None
+    keys = {name: set() for name in AUXILIARY_INPUTS}
+    for name, key, _ in inputs_read:
+        if name in keys:
+            keys[name].add(key)
+    keys["duplicates"].update(duplicates_read)
+    return {name: sorted(keys[name], key=str) for name in AUXILIARY_INPUTS}
+
+
+def build_state(builder, page_titles: Dict[str, str], item_inputs: Dict[str, Optional[Dict]] = None) -> Dict:
+    """Return the build state of the current builder inputs.
+
+    :param builder: The item Builder, with every input loaded.
+    :param page_titles: A dictionary of wiki page title to the revision timestamp.
+    :param item_inputs: A dictionary of item ID to the auxiliary keys read, see :func:`auxiliary_keys`.
+    :return: A dictionary of the page titles, a fingerprint of every auxiliary entry, and the item inputs.
+    """
+    return {"wiki_page_titles": page_titles,
+            "auxiliary": {name: {key: fingerprint(value) for key, value in getattr(builder, name).items()}
+                          for name in AUXILIARY_INPUTS},
+            "item_inputs": item_inputs or dict()}
+
+
+def load_page_titles(path_to_page_titles: Path = PAGE_TITLES_FILE) -> Dict[str, str]:
+    """Load the wiki page titles, and the revision timestamp of each page.
+
+    :param path_to_page_titles: The path to `items-wiki-page-titles.json`.
+    :return: A dictionary of page title to the revision timestamp.
+    """
+    with open(path_to_page_titles) as f:
+        return codec.load(f)
+
+
+def write_build_state(builder, path_to_state: Path = BUILD_STATE_FILE,
+                      path_to_page_titles: Path = PAGE_TITLES_FILE) -> Path:
+    """Save the build state of the current builder inputs, after a build.
+
+    The recorded inputs of the items that were not built (in an incremental
+    build) are kept from the last build state.
+
+    :param builder: The item Builder, with every input loaded.
+    :param path_to_state: The output path.
+    :param path_to_page_titles: The path to `items-wiki-page-titles.json`.
+    :return: The path to the build state file.
+    """
+    item_inputs = dict()
+    if Path(path_to_state).is_file():
+        item_inputs = load_build_state(path_to_state).get("item_inputs", dict())
+    item_inputs.update(builder.item_inputs)
+    item_inputs = {item_id: item_inputs[item_id] for item_id in builder.all_items_cache_data if item_id in item_inputs}
+    with open(path_to_state, "w") as f:
+        codec.dump(build_state(builder, load_page_titles(path_to_page_titles), item_inputs), f)
+    return path_to_state
+
+
+def load_build_state(path_to_state: Path = BUILD_STATE_FILE) -> Dict:
+    """Load the build state saved by the last build.
+
+    :param path_to_state: The path to the build state file.
+    :return: The build state dictionary.
+    :raises ValueError: There is no build state, run a full build first.
+    """
+    if not Path(path_to_state).is_file():
+        raise ValueError("Error: No item build state, run a full build with --export first. Exiting.")
+    with open(path_to_state) as f:
+        return codec.load(f)
+
+
+def load_cache_changes(path_to_changes: Path = CACHE_CHANGES_FILE) -> Dict[str, List[str]]:
+    """Load the cache change set saved by `scripts/cache/determine_changes.py`.
+
+    :param path_to_changes: The path to `items-cache-changes.json`.
+    :return: A dictionary of `added`, `removed` and `changed` item IDs, empty when there is no change set.
+    """
+    if not Path(path_to_changes).is_file():
+        return {"added": [], "removed": [], "changed": []}
+    with open(path_to_changes) as f:
+        return codec.load(f)
+
+
+def _page_title_from_url(wiki_url: str) -> str:
+    # For example, https://oldschool.runescape.wiki/w/Black_mask#Uncharged is `Black mask`
+    page = wiki_url.split("/w/", 1)[-1].split("#", 1)[0]
+    return unquote(page).replace("_", " ")
+
+
+def _item_page_titles(builder, item_id: str) -> List[str]:
+    """Return the wiki page titles an item was built from, before and after the update."""
+    item_cache_data = builder.all_items_cache_data[item_id]
+    titles = list()
+
+    # The same lookup order as BuildItem.preprocessing
+    linked_id = item_cache_data["linked_id_item"]
+    linked_id = str(linked_id) if linked_id is not None else None
+    if item_id in builder.all_wikitext_processed:
+        titles.append(builder.all_wikitext_processed[item_id][0])
+    elif linked_id in builder.all_wikitext_processed:
+        titles.append(builder.all_wikitext_processed[linked_id][0])
+    else:
+        titles.append(item_cache_data["name"])
+
+    db_item = builder.all_db_items.get(item_id)
+    if db_item and db_item.get("wiki_url"):
+        titles.append(_page_title_from_url(db_item["wiki_url"]))
+    return titles
+
+
+def linked_variants(all_items_cache_data: Dict[str, Dict]) -> Dict[str, List[str]]:
+    """Return the noted and placeholder variants of every item.
+
+    :param all_items_cache_data: The cache data of every item.
+    :return: A dictionary of base item ID to the IDs of the variants built from it.
+    """
+    variants = dict()
+    for item_id, item_cache_data in all_items_cache_data.items():
+        linked_ids = [item_cache_data.get("linked_id_noted"), item_cache_data.get("linked_id_placeholder")]
+        if item_cache_data["noted"] or item_cache_data["placeholder"]:
+            # Noted and placeholder items use the wiki data of the linked item
+            base_id = item_cache_data["linked_id_item"]
+            if base_id is not None:
+                variants.setdefault(str(base_id), list()).append(item_id)
+        for linked_id in linked_ids:
+            if linked_id is not None and str(linked_id) in all_items_cache_data:
+                variants.setdefault(item_id, list()).append(str(linked_id))
+    return variants
+
+
+def dirty_item_ids(builder, cache_changes: Dict[str, List[str]], state: Dict,
+                   page_titles: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """Determine the items to rebuild, and the items to remove.
+
+    :param builder: The item Builder, with every input loaded.
+    :param cache_changes: The cache change set, see :func:`load_cache_changes`.
+    :param state: The build state of the last build, see :func:`load_build_state`.
+    :param page_titles: The current wiki page titles, and the revision timestamp of each page.
+    :return: A tuple of the dirty item IDs (in cache order), and the removed item IDs.
+    """
+    all_items_cache_data = builder.all_items_cache_data
+    dirty = {str(item_id) for item_id in cache_changes["added"] + cache_changes["changed"]}
+
+    changed_titles = set(changed_keys(state["wiki_page_titles"], page_titles))
+    current_state = build_state(builder, page_titles)
+    changed_auxiliary = {name: set(changed_keys(state["auxiliary"].get(name, dict()), current_state["auxiliary"][name]))
+                         for name in AUXILIARY_INPUTS}
+
+    item_inputs = state.get("item_inputs", dict())
+    for item_id in all_items_cache_data:
+        if item_id in dirty:
+            continue
+        if changed_titles.intersection(_item_page_titles(builder, item_id)):
+            dirty.add(item_id)
+            continue
+        keys = item_inputs.get(item_id)
+        if keys is None:
+            # The inputs of the item were not recorded by the last build
+            dirty.add(item_id)
+            continue
+        for name in AUXILIARY_INPUTS:
+            if changed_auxiliary[name].intersection(keys.get(name, ())):
+                dirty.add(item_id)
+                break
+
+    _add_dependents(builder, dirty)
+    # Items that are not built (beta items) have no recorded inputs, so are skipped
+    dirty_ids = [item_id for item_id in builder.item_ids() if item_id in dirty]
+    removed_ids = sorted(str(item_id) for item_id in cache_changes["removed"] if str(item_id) not in all_items_cache_data)
+    return dirty_ids, removed_ids
+
+
+def _add_dependents(builder, dirty: set) -> None:
+    """Add the linked variants, and the items that share a name, of every dirty item."""
+    variants = linked_variants(builder.all_items_cache_data)
+    for item_id in list(dirty):
+        dirty.update(variants.get(item_id, ()))
+
+    # A changed name can change the duplicate flag of a later item with the same name,
+    # noted and placeholder items are always duplicates, so are not affected
+    names = set()
+    for item_id in dirty:
+        names.update(_item_names(builder, item_id))
+    for item_id in builder.all_items_cache_data:
+        if item_id not in dirty and names.intersection(_item_names(builder, item_id)):
+            dirty.add(item_id)
+
+
+def _item_names(builder, item_id: str) -> Iterable[str]:
+    """Return the current and previous names of an item, or no names for noted and placeholder items."""
+    names = set()
+    item_cache_data = builder.all_items_cache_data.get(item_id)
+    if item_cache_data is None or item_cache_data["noted"] or item_cache_data["placeholder"]:
+        return names
+    names.add(item_cache_data["name"])
+    db_item = builder.all_db_items.get(item_id)
+    if db_item:
+        names.add(db_item["name"])
+    return names
@@ -0,0 +1,77 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+An index of the items already processed by the item builder, used to determine
+if an item is a duplicate of an earlier item.
+
+An item is a duplicate when an earlier item has the same name and the same
+wiki_name, or when an earlier item has the same name and the item has no
+wiki_name. The index maps the name, and the (name, wiki_name) pair, to the
+first known item, so each duplicate check is a dictionary lookup, instead of a
+loop over every known item.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+from typing import Dict
+from typing import Tuple
+from typing import Optional
+
+from osrsbox.items_api.item_properties import ItemProperties
+
+
+class KnownItems:
+    """This class indexes the known (already processed) items, in build order."""
+    def __init__(self):
+        self.by_name: Dict[str, ItemProperties] = dict()
+        self.by_name_wiki_name: Dict[Tuple[str, Optional[str]], ItemProperties] = dict()
+        self.count = 0
+
+    def add(self, item_properties: ItemProperties) -> None:
+        """Add a known item, an earlier item with the same name is kept in the index.
+
+        :param item_properties: The ItemProperties object of the known item.
+        """
+        self.by_name.setdefault(item_properties.name, item_properties)
+        self.by_name_wiki_name.setdefault((item_properties.name, item_properties.wiki_name), item_properties)
+        self.count += 1
+
+    def find_duplicate(self, item_properties: ItemProperties) -> Optional[ItemProperties]:
+        """Return the known item that an item is a duplicate of.
+
+        :param item_properties: The ItemProperties object of the item to check.
+        :return: The first matching known item, or None when the item is not a duplicate.
+        """
+        same_name = self.by_name.get(item_properties.name)
+        if same_name is None:
+            return None
+
+        # If name and wiki_name match, the item is a duplicate
+        same_wiki_name = self.by_name_wiki_name.get((item_properties.name, item_properties.wiki_name))
+        if same_wiki_name is not None:
+            return same_wiki_name
+
+        # If wiki_name is None, but cache names match...
+        # The item must also be a duplicate
+        if not item_properties.wiki_name:
+            return same_name
+        return None
+
+    def __len__(self) -> int:
+        """Return the count of known items."""
+        return self.count
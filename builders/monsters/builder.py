@@ -21,12 +21,28 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
-import json
 import argparse
 from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Optional
 
 import config
+import validator
+from osrsbox import codec
+from builders import build_cache
+from builders import parallel_build
 from builders.monsters import build_monster
+from builders.monsters import infobox_cleaner
+from scripts.wiki import wikitext_parser
+from osrsbox.monsters_api import monster_drop
+from osrsbox.monsters_api import monster_properties
+
+# The builder inputs that are read to populate a monster (and its drops), recorded for the build cache
+POPULATE_INPUTS = ("all_monster_cache_data", "all_wikitext_raw", "all_wikitext_processed", "monsters_drops")
+BUILD_CACHE_FILE = Path(config.DATA_MONSTERS_PATH / "monsters-build-cache.db")
+SCHEMA_FILE = Path(config.DATA_SCHEMAS_PATH / "schema-monsters.json")
 
 
 class Builder:
@@ -39,97 +55,275 @@ class Builder:
 
         # Load the raw cache data that has been processed (this is ground truth)
         with open(Path(config.DATA_MONSTERS_PATH / "monsters-cache-data.json")) as f:
-            self.all_monster_cache_data = json.load(f)
+            self.all_monster_cache_data = codec.load(f)
 
         # Load all monster data (from min JSON file)
         with open(Path(config.DOCS_PATH / "monsters-complete.json")) as f:
-            self.all_db_monsters = json.load(f)
+            self.all_db_monsters = codec.load(f)
 
         # Load the monster wikitext file of page text
         with open(Path(config.DATA_MONSTERS_PATH / "monsters-wiki-page-text.json")) as f:
-            self.all_wikitext_raw = json.load(f)
+            self.all_wikitext_raw = codec.load(f)
 
         # Load the monster wikitext file of processed data
         with open(Path(config.DATA_MONSTERS_PATH / "monsters-wiki-page-text-processed.json")) as f:
-            self.all_wikitext_processed = json.load(f)
+            self.all_wikitext_processed = codec.load(f)
 
         # Load the monster processed monster drops
         with open(Path(config.DATA_MONSTERS_PATH / "monsters-drops.json")) as f:
-            self.monsters_drops = json.load(f)
+            self.monsters_drops = codec.load(f)
 
         # Load schema data
-        with open(Path(config.DATA_SCHEMAS_PATH / "schema-monsters.json")) as f:
-            self.schema_data = json.load(f)
+        with open(SCHEMA_FILE) as f:
+            self.schema_data = codec.load(f)
 
         # Initialize a list of known monsters
         self.known_monsters = list()
 
-    def run(self):
-        # Start processing every monster!
-        for monster_id in self.all_monster_cache_data:
+        # The cache of populated monsters, see open_build_cache
+        self.build_cache = None
 
-            # if int(monster_id) < 11000:
-            #     continue
+    def open_build_cache(self, path_to_database: Path = BUILD_CACHE_FILE):
+        """Use a persistent cache of populated monsters, to skip monsters with unchanged inputs.
 
-            # Initialize the BuildMonster class, used for all monsters
-            builder = build_monster.BuildMonster(monster_id=monster_id,
-                                                 all_monster_cache_data=self.all_monster_cache_data,
-                                                 all_db_monsters=self.all_db_monsters,
-                                                 all_wikitext_raw=self.all_wikitext_raw,
-                                                 all_wikitext_processed=self.all_wikitext_processed,
-                                                 monsters_drops=self.monsters_drops,
-                                                 schema_data=self.schema_data,
-                                                 known_monsters=self.known_monsters,
-                                                 verbose=self.verbose)
+        :param path_to_database: The path to the SQLite database file.
+        """
+        version = build_cache.code_version(build_monster, infobox_cleaner, wikitext_parser,
+                                           monster_properties, monster_drop, validator,
+                                           data_files=[SCHEMA_FILE])
+        self.build_cache = build_cache.BuildCache(path_to_database, version)
 
-            status = builder.preprocessing()
-            if status:
-                builder.populate_monster()
-                known_monster = builder.check_duplicate_monster()
-                self.known_monsters.append(known_monster)
-                builder.populate_monster_drops()
-                if self.compare:
-                    builder.compare_new_vs_old_monster()
-                if self.export:
-                    builder.export_monster_to_json()
-                if self.validate:
-                    builder.validate_monster()
+    def cached_monster(self, monster_id: str) -> Optional[Dict]:
+        """Return the cached monster properties of a monster, populated from the same inputs.
 
-        # Done processing, rejoice!
-        print("Built.")
-        exit(0)
+        :param monster_id: The monster ID number, as a string.
+        :return: The populated monster properties, or None when there is no build cache, or a cache miss.
+        """
+        if self.build_cache is None:
+            return None
+        return self.build_cache.get(monster_id, {name: getattr(self, name) for name in POPULATE_INPUTS})
 
-    def test(self):
-        # Start processing every monster!
-        for monster_id in self.all_monster_cache_data:
+    def store_monster(self, monster_id: str, inputs: Optional[List], populated: str):
+        """Store populated monster properties in the build cache, after the monster is validated.
+
+        :param monster_id: The monster ID number, as a string.
+        :param inputs: The recorded inputs of the monster, or None when they were not recorded.
+        :param populated: The populated monster properties, as JSON.
+        """
+        # Cached monsters are not validated again, so only validated monsters are stored
+        if self.build_cache is not None and self.validate and inputs is not None:
+            self.build_cache.put(monster_id, inputs, populated)
 
-            # if int(monster_id) < 10000:
-            #     continue
+    def monster_builder(self, monster_id: str, monster_dict: Dict = None) -> build_monster.BuildMonster:
+        """Initialize the BuildMonster class, used for all monsters.
 
-            # Initialize the BuildMonster class, used for all monsters
-            builder = build_monster.BuildMonster(monster_id=monster_id,
-                                                 all_monster_cache_data=self.all_monster_cache_data,
-                                                 all_db_monsters=self.all_db_monsters,
-                                                 all_wikitext_raw=self.all_wikitext_raw,
-                                                 all_wikitext_processed=self.all_wikitext_processed,
-                                                 monsters_drops=self.monsters_drops,
-                                                 schema_data=self.schema_data,
-                                                 known_monsters=self.known_monsters,
-                                                 verbose=self.verbose)
+        :param monster_id: The monster ID number, as a string.
+        :param monster_dict: The monster properties, when the monster is already populated.
+        :return: A BuildMonster object.
+        """
+        builder = build_monster.BuildMonster(monster_id=monster_id,
+                                             all_monster_cache_data=self.all_monster_cache_data,
+                                             all_db_monsters=self.all_db_monsters,
+                                             all_wikitext_raw=self.all_wikitext_raw,
+                                             all_wikitext_processed=self.all_wikitext_processed,
+                                             monsters_drops=self.monsters_drops,
+                                             schema_data=self.schema_data,
+                                             known_monsters=self.known_monsters,
+                                             verbose=self.verbose)
+        if monster_dict is not None:
+            builder.monster_dict = monster_dict
+        return builder
 
+    def populate_monster(self, monster_id: str, timer: parallel_build.PhaseTimer,
+                         record_inputs: bool = False) -> Optional[build_monster.BuildMonster]:
+        """Preprocess and populate one monster, this does not depend on any other monster.
+
+        :param monster_id: The monster ID number, as a string.
+        :param timer: The PhaseTimer to add the phase times to.
+        :param record_inputs: Record the inputs that are read, as `inputs_read`, for the build cache.
+        :return: The populated BuildMonster object, or None when the monster has no wiki infobox.
+        """
+        builder = self.monster_builder(monster_id)
+        recorders = dict()
+        if record_inputs:
+            for name in POPULATE_INPUTS:
+                recorders[name] = build_cache.InputRecorder(getattr(self, name))
+                setattr(builder, name, recorders[name])
+
+        with timer.phase("preprocessing"):
             status = builder.preprocessing()
-            if status:
-                builder.populate_monster()
-                known_monster = builder.check_duplicate_monster()
-                self.known_monsters.append(known_monster)
-                builder.populate_monster_drops()
+        if not status:
+            return None
+
+        with timer.phase("populate"):
+            builder.populate_monster()
+
+        if record_inputs:
+            # The drops are added after the duplicate check, but are validated with the monster
+            recorders["monsters_drops"].get(monster_id)
+            builder.inputs_read = build_cache.recorded_inputs(recorders)
+        else:
+            builder.inputs_read = None
+        return builder
+
+    def check_duplicate_monster(self, builder: build_monster.BuildMonster, timer: parallel_build.PhaseTimer):
+        """Determine if a monster is a duplicate, this must be called for every monster in cache order.
+
+        :param builder: The populated BuildMonster object.
+        :param timer: The PhaseTimer to add the phase time to.
+        """
+        with timer.phase("duplicates"):
+            known_monster = builder.check_duplicate_monster()
+            self.known_monsters.append(known_monster)
+
+    def finish_monster(self, builder: build_monster.BuildMonster, timer: parallel_build.PhaseTimer,
+                       cached: bool = False) -> Dict:
+        """Add drops, then compare, export and validate one monster, after the duplicate check.
+
+        :param builder: The populated BuildMonster object.
+        :param timer: The PhaseTimer to add the phase times to.
+        :param cached: The monster is from the build cache, and was validated when it was stored.
+        :return: The final monster properties.
+        """
+        with timer.phase("drops"):
+            builder.populate_monster_drops()
+        if self.compare:
+            with timer.phase("compare"):
+                builder.compare_new_vs_old_monster()
+        if self.export:
+            with timer.phase("export"):
+                builder.export_monster_to_json()
+        if self.validate and not cached:
+            with timer.phase("validate"):
                 builder.validate_monster()
+        return builder.monster_dict
+
+    def build(self, workers: int = 1):
+        """Build every monster, serially or with a pool of worker processes.
+
+        A timing summary of each phase is printed after the build. A monster that
+        fails does not stop the build, every error is reported after the timing
+        summary, and then the build exits with status 1.
+
+        :param workers: The number of worker processes, 1 to build serially.
+        """
+        timer = parallel_build.PhaseTimer()
+        errors = self.build_monsters(workers, timer)
+        timer.print_summary()
+        if self.build_cache is not None:
+            self.build_cache.print_summary()
+            self.build_cache.close()
+            self.build_cache = None
+
+        if errors:
+            parallel_build.print_error_report(errors)
+            exit(1)
+
+    def build_monsters(self, workers: int, timer: parallel_build.PhaseTimer) -> Dict[str, str]:
+        """Build every monster, with a pool of worker processes, or in this process.
+
+        Monsters are populated, and then compared, exported and validated, as tasks
+        run by the workers (or by this process, with 1 worker). The duplicate check
+        is run by this process in cache order, so the output is the same for any
+        number of workers. A monster that fails does not stop the build, the error
+        is returned instead.
+
+        :param workers: The number of worker processes, 1 to build serially.
+        :param timer: The PhaseTimer to add the phase times to.
+        :return: A dictionary of monster ID to the error, for every monster that failed.
+        """
+        global _worker_builder
+        # Workers (forked, or this process) share this builder, and the inputs it has loaded
+        _worker_builder = self
+
+        options = dict(verbose=self.verbose, compare=self.compare, export=self.export, validate=self.validate)
+        record_inputs = self.build_cache is not None
+        errors = dict()
+        monster_dicts = dict()
+        # Monsters from the build cache are not populated again, the populated JSON and inputs of other monsters are kept
+        cached_ids = set()
+        populated = dict()
+        monster_ids = list()
+        for monster_id in self.all_monster_cache_data:
+            monster_dict = self.cached_monster(monster_id)
+            if monster_dict is not None:
+                monster_dicts[monster_id] = monster_dict
+                cached_ids.add(monster_id)
+            else:
+                monster_ids.append(monster_id)
+
+        with parallel_build.task_runner(workers, _init_worker, (options, record_inputs)) as run_tasks:
+            for result in run_tasks(_populate_worker, monster_ids):
+                # Monsters without a wiki infobox are skipped
+                if parallel_build.collect_result(result, timer, errors) and result.value is not None:
+                    monster_dict, inputs_read = result.value
+                    monster_dicts[result.key] = monster_dict
+                    if record_inputs:
+                        populated[result.key] = (inputs_read, codec.dumps(monster_dict))
+
+            # Monsters are checked and finished in cache order
+            monster_ids = [monster_id for monster_id in self.all_monster_cache_data if monster_id in monster_dicts]
+            for monster_id in monster_ids:
+                self.check_duplicate_monster(self.monster_builder(monster_id, monster_dicts[monster_id]), timer)
+
+            entries = [(monster_id, monster_dicts[monster_id], monster_id in cached_ids) for monster_id in monster_ids]
+            for result in run_tasks(_finish_worker, entries):
+                if parallel_build.collect_result(result, timer, errors) and result.key in populated:
+                    self.store_monster(result.key, *populated[result.key])
+        return errors
+
+    def run(self, workers: int = 1):
+        # Start processing every monster!
+        self.build(workers)
+
+        # Done processing, rejoice!
+        print("Built.")
+        exit(0)
+
+    def test(self, workers: int = 1):
+        # Start processing every monster, only validating the result
+        self.compare = False
+        self.export = False
+        self.validate = True
+        self.build(workers)
 
         # Done testing, rejoice!
         print("Tested.")
         exit(0)
 
 
+# The Builder used by worker processes, shared with the main process when forked
+_worker_builder = None
+# Whether worker processes record the inputs of each monster, for the build cache
+_record_inputs = False
+
+
+def _init_worker(options: Dict, record_inputs: bool):
+    """Load the builder inputs in a worker process, unless they were inherited by forking, or shared by a serial build."""
+    global _worker_builder, _record_inputs
+    if _worker_builder is None:
+        _worker_builder = Builder(**options)
+    # The build cache is only read and written by the main process
+    _record_inputs = record_inputs
+
+
+def _populate_monster_dict(monster_id: str, timer: parallel_build.PhaseTimer) -> Optional[Tuple[Dict, Optional[List]]]:
+    builder = _worker_builder.populate_monster(monster_id, timer, _record_inputs)
+    return (builder.monster_dict, builder.inputs_read) if builder else None
+
+
+def _finish_monster_dict(monster_id: str, monster_dict: Dict, cached: bool, timer: parallel_build.PhaseTimer) -> Dict:
+    return _worker_builder.finish_monster(_worker_builder.monster_builder(monster_id, monster_dict), timer, cached)
+
+
+def _populate_worker(monster_id: str) -> parallel_build.TaskResult:
+    return parallel_build.run_task(monster_id, _populate_monster_dict, monster_id)
+
+
+def _finish_worker(entry: Tuple[str, Dict, bool]) -> parallel_build.TaskResult:
+    return parallel_build.run_task(entry[0], _finish_monster_dict, *entry)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Build monster database.")
     parser.add_argument('--verbose',
@@ -152,13 +346,24 @@ if __name__ == "__main__":
                         default=False,
                         required=False,
                         help='A boolean of whether to test the builder process.')
+    parser.add_argument('--build-cache',
+                        default=False,
+                        required=False,
+                        help='A boolean of whether to reuse populated monsters with unchanged inputs.')
+    parser.add_argument('--workers',
+                        default=1,
+                        type=int,
+                        required=False,
+                        help='The number of worker processes, 1 to build serially.')
     args = parser.parse_args()
 
     builder = Builder(verbose=args.verbose,
                       compare=args.compare,
                       export=args.export,
                       validate=args.validate)
+    if args.build_cache:
+        builder.open_build_cache()
     if args.test:
-        builder.test()
+        builder.test(args.workers)
     else:
-        builder.run()
+        builder.run(args.workers)
@@ -0,0 +1,197 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Helpers to run the item and monster builders with a pool of worker processes.
+
+The builders split the build into phases. The per-entry phases (preprocessing,
+populate, compare, export and validate) are run as tasks, by the workers or by
+the main process in a serial build, and the order-dependent duplicate detection
+is run by the main process, in cache order. Each task captures its printed
+output, any error, and the time spent in each phase, so the main process prints
+the output in cache order, and reports every error and a timing summary at the
+end of the build, the same for any number of workers.
+
+Where available, workers are forked, so the read-only builder inputs (cache
+data, wikitext and so on) are shared with the main process, instead of being
+loaded or copied by every worker.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import io
+import time
+import traceback
+import multiprocessing
+import multiprocessing.pool
+from contextlib import contextmanager
+from contextlib import redirect_stdout
+from dataclasses import field
+from dataclasses import dataclass
+from typing import Any
+from typing import Dict
+from typing import Tuple
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+
+
+class PhaseTimer:
+    """This class accumulates the time spent in each build phase."""
+    def __init__(self):
+        self.seconds: Dict[str, float] = dict()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block of code, adding the time to a phase.
+
+        :param name: The name of the phase, for example, `populate`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def merge(self, seconds: Dict[str, float]) -> None:
+        """Add the phase times of another timer, for example, a worker task.
+
+        :param seconds: A dictionary of phase name to seconds.
+        """
+        for name, value in seconds.items():
+            self.seconds[name] = self.seconds.get(name, 0.0) + value
+
+    def print_summary(self) -> None:
+        """Print the time spent in each phase, in the order the phases started."""
+        print(">>> Build timing (worker phases are summed over every worker):")
+        for name, value in self.seconds.items():
+            print(f"  {name:<32} {value:>10.2f}s")
+
+
+@dataclass
+class TaskResult:
+    """This class defines the result of one worker task.
+
+    :param key: The ID of the item or monster.
+    :param value: The value returned by the task, or None when the task failed.
+    :param output: Everything the task printed.
+    :param error: A description of the error, or None when the task succeeded.
+    :param seconds: A dictionary of phase name to the seconds spent by the task.
+    """
+    key: str
+    value: Any = None
+    output: str = ""
+    error: Optional[str] = None
+    seconds: Dict[str, float] = field(default_factory=dict)
+
+
+def run_task(key: str, function: Callable, *args) -> TaskResult:
+    """Run one task, capturing the printed output, errors and phase times.
+
+    The builders call `exit(1)` on a validation error, this is reported as an
+    error of the task, instead of stopping the worker.
+
+    :param key: The ID of the item or monster.
+    :param function: The task, called with `args` and a PhaseTimer.
+    :return: A TaskResult.
+    """
+    timer = PhaseTimer()
+    output = io.StringIO()
+    result = TaskResult(key=key)
+    with redirect_stdout(output):
+        try:
+            result.value = function(*args, timer)
+        except SystemExit as e:
+            # The builders print the reason (for example, the validation errors) before exiting
+            printed = output.getvalue().strip().splitlines()
+            result.error = f"Exited with status {e.code}" + (f": {printed[-1]}" if printed else "")
+        except Exception:
+            result.error = traceback.format_exc()
+    result.output = output.getvalue()
+    result.seconds = timer.seconds
+    return result
+
+
+def worker_pool(workers: int, initializer: Callable = None, initargs: Tuple = ()) -> multiprocessing.pool.Pool:
+    """Start a pool of worker processes, forked when the platform supports it.
+
+    :param workers: The number of worker processes.
+    :param initializer: A function called by each worker when it starts.
+    :param initargs: The arguments of the initializer.
+    :return: A multiprocessing Pool.
+    """
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        context = multiprocessing.get_context()
+    return context.Pool(workers, initializer, initargs)
+
+
+def chunk_size(count: int, workers: int) -> int:
+    """Return the number of tasks sent to a worker at a time.
+
+    :param count: The total number of tasks.
+    :param workers: The number of worker processes.
+    :return: The chunk size, several chunks per worker to balance the load.
+    """
+    return max(1, count // (workers * 8))
+
+
+@contextmanager
+def task_runner(workers: int, initializer: Callable, initargs: Tuple = ()) -> Iterator[Callable]:
+    """Run tasks in order, with a pool of worker processes, or in this process.
+
+    The runner is called like `map`, with a task function and a list of task
+    arguments, and returns an iterator of the task results, in order.
+
+    :param workers: The number of worker processes, 1 to run the tasks in this process.
+    :param initializer: A function called by each worker when it starts, or by this process.
+    :param initargs: The arguments of the initializer.
+    :return: A context manager of the runner.
+    """
+    if workers > 1:
+        with worker_pool(workers, initializer, initargs) as pool:
+            yield lambda function, tasks: pool.imap(function, tasks, chunk_size(len(tasks), workers))
+    else:
+        initializer(*initargs)
+        yield map
+
+
+def collect_result(result: TaskResult, timer: PhaseTimer, errors: Dict[str, str]) -> bool:
+    """Print the output of a task, add its phase times, and record its error.
+
+    :param result: The TaskResult.
+    :param timer: The PhaseTimer of the build.
+    :param errors: A dictionary of item or monster ID to the error, of the build.
+    :return: True when the task succeeded.
+    """
+    print(result.output, end="")
+    timer.merge(result.seconds)
+    if result.error:
+        errors[result.key] = result.error
+        return False
+    return True
+
+
+def print_error_report(errors: Dict[str, str]) -> None:
+    """Print every error collected during a build.
+
+    :param errors: A dictionary of item or monster ID to the error.
+    """
+    print(f">>> Build errors: {len(errors)}")
+    for key, error in errors.items():
+        print(f"  {key}: {error.strip()}")
@@ -0,0 +1,147 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+A single JSON codec layer for every database loader and exporter.
+
+JSON is parsed with the fastest installed backend: orjson, then msgspec, then
+the standard library json module. The backend can be selected with the
+OSRSBOX_JSON_BACKEND environment variable (a backend that is not installed is
+a warning, and the standard library json module is used), or with set_backend().
+
+JSON is always written with the standard library json module, so exported
+files are byte-for-byte identical whichever backend is installed (the fast
+backends do not support the standard library separators, ASCII escaping or
+indentation). Writing serializes the whole document in one call, which is
+faster than json.dump writing many small chunks.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import os
+import json
+import warnings
+from typing import IO
+from typing import Any
+from typing import List
+from typing import Union
+from typing import Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Backend names, in order of preference
+BACKENDS = ("orjson", "msgspec", "json")
+
+# The selected backend, and its decode function (set on import)
+_backend = "json"
+_decode = json.loads
+
+
+def _decoder(backend: str) -> Callable[[Union[str, bytes]], Any]:
+    if backend == "orjson":
+        return orjson.loads
+    if backend == "msgspec":
+        return msgspec.json.Decoder().decode
+    return json.loads
+
+
+def available_backends() -> List[str]:
+    """Return the names of the installed JSON backends, in order of preference.
+
+    :return: A list of backend names, always ending with `json`.
+    """
+    installed = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+    return [backend for backend in BACKENDS if installed[backend]]
+
+
+def get_backend() -> str:
+    """Return the name of the JSON backend used to parse JSON."""
+    return _backend
+
+
+def set_backend(backend: str = None) -> None:
+    """Set the JSON backend used to parse JSON.
+
+    :param backend: The backend name (`orjson`, `msgspec` or `json`), or None for the fastest installed backend.
+    :raises ValueError: The backend is not installed.
+    """
+    global _backend, _decode
+    if backend is None:
+        backend = available_backends()[0]
+    if backend not in available_backends():
+        raise ValueError(f"Error: JSON backend {backend} is not installed. Exiting.")
+    _backend = backend
+    _decode = _decoder(backend)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document.
+
+    :param data: The JSON document, as a str or UTF-8 encoded bytes.
+    :return: The parsed JSON document.
+    """
+    return _decode(data)
+
+
+def load(fp: IO) -> Any:
+    """Parse a JSON document from an open (text or binary) file.
+
+    :param fp: The open file.
+    :return: The parsed JSON document.
+    """
+    return _decode(fp.read())
+
+
+def dumps(obj: Any, indent: int = None) -> str:
+    """Serialize an object to a JSON document, in the standard library json format.
+
+    :param obj: The object to serialize.
+    :param indent: The indent level for pretty printing, or None for a single line.
+    :return: The JSON document.
+    """
+    return json.dumps(obj, indent=indent)
+
+
+def dump(obj: Any, fp: IO, indent: int = None) -> None:
+    """Serialize an object to a JSON document, and write it to an open text file.
+
+    :param obj: The object to serialize.
+    :param fp: The open text file.
+    :param indent: The indent level for pretty printing, or None for a single line.
+    """
+    fp.write(json.dumps(obj, indent=indent))
+
+
+def _set_environment_backend() -> None:
+    """Set the JSON backend from the OSRSBOX_JSON_BACKEND environment variable, on import."""
+    backend = os.environ.get("OSRSBOX_JSON_BACKEND") or None
+    try:
+        set_backend(backend)
+    except ValueError:
+        warnings.warn(f"JSON backend {backend} (OSRSBOX_JSON_BACKEND) is not installed, using json")
+        set_backend("json")
+
+
+_set_environment_backend()
@@ -0,0 +1,237 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Secondary (field value) indexes over loaded database entries.
+
+A field index maps every value of one field to the set of entry IDs that have
+that value. Fields are named with a dotted path, for example `members` or
+`equipment.slot`, and can be read from built dataclass objects or raw JSON
+records. Each field index is built on first use, and a query of several fields
+is a set intersection, starting with the smallest set.
+
+Query values can also be predicates: Between matches a numeric range with a
+binary search of a sorted index, Contains matches list fields (for example,
+`slayer_masters`) with an index of each list member, and Not matches entries
+that do not match another value or predicate.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+from bisect import bisect_left
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any
+from typing import Set
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Callable
+from typing import Iterable
+
+# Query values of these types match any one of the contained values
+MULTIPLE_VALUE_TYPES = (list, tuple, set, frozenset)
+
+
+@dataclass(frozen=True)
+class Between:
+    """Match field values in an inclusive range, None values never match.
+
+    :param minimum: The lowest matching value, or None for no lower bound.
+    :param maximum: The highest matching value, or None for no upper bound.
+    """
+    minimum: Any = None
+    maximum: Any = None
+
+
+@dataclass(frozen=True)
+class Contains:
+    """Match list field values that contain a value.
+
+    :param value: The value to match, or a list, tuple or set of values to match any of.
+    """
+    value: Any
+
+
+@dataclass(frozen=True)
+class Not:
+    """Match entries that do not match a value or predicate.
+
+    :param value: The value, or Between or Contains predicate, to exclude.
+    """
+    value: Any
+
+
+def field_value(entry: Any, field: str) -> Any:
+    """Return the value of a dotted field path from an object, or a raw JSON record.
+
+    A missing or None value part way along the path gives None, for example,
+    `equipment.slot` of an item that is not equipable.
+
+    :param entry: A dataclass object (for example, ItemProperties) or a dict.
+    :param field: The dotted field path, for example, `equipment.slot`.
+    :return: The field value.
+    """
+    value = entry
+    for part in field.split("."):
+        if value is None:
+            return None
+        if isinstance(value, dict):
+            value = value.get(part)
+        else:
+            value = getattr(value, part, None)
+    return value
+
+
+class FieldIndexes:
+    """This class builds and queries secondary indexes of entry field values.
+
+    :param iter_records: A function that returns an iterable of (ID, entry) tuples.
+    """
+    def __init__(self, iter_records: Callable[[], Iterable[Tuple[int, Any]]]):
+        self.iter_records = iter_records
+        self.indexes: Dict[str, Dict[Any, Set[int]]] = dict()
+        self.sorted_indexes: Dict[str, Tuple[List[Any], List[int]]] = dict()
+        self.member_indexes: Dict[str, Dict[Any, Set[int]]] = dict()
+
+    def index(self, field: str) -> Dict[Any, Set[int]]:
+        """Return the index of a field, building it on first use.
+
+        :param field: The dotted field path, for example, `equipment.slot`.
+        :return: A dictionary of field value to a set of entry IDs.
+        :raises ValueError: The field has values that cannot be indexed (for example, lists).
+        """
+        try:
+            return self.indexes[field]
+        except KeyError:
+            pass
+
+        index = dict()
+        for entry_id, entry in self.iter_records():
+            value = field_value(entry, field)
+            try:
+                index.setdefault(value, set()).add(entry_id)
+            except TypeError as e:
+                raise ValueError(f"Error: Cannot index the {field} field. Exiting.") from e
+
+        self.indexes[field] = index
+        return index
+
+    def sorted_index(self, field: str) -> Tuple[List[Any], List[int]]:
+        """Return the sorted index of a field, building it on first use.
+
+        :param field: The dotted field path, for example, `combat_level`.
+        :return: A tuple of the sorted field values, and the entry ID of each value.
+        :raises ValueError: The field has values that cannot be sorted.
+        """
+        try:
+            return self.sorted_indexes[field]
+        except KeyError:
+            pass
+
+        pairs = [(field_value(entry, field), entry_id) for entry_id, entry in self.iter_records()]
+        try:
+            pairs = sorted(pair for pair in pairs if pair[0] is not None)
+        except TypeError as e:
+            raise ValueError(f"Error: Cannot sort the {field} field. Exiting.") from e
+
+        self.sorted_indexes[field] = ([value for value, _ in pairs], [entry_id for _, entry_id in pairs])
+        return self.sorted_indexes[field]
+
+    def member_index(self, field: str) -> Dict[Any, Set[int]]:
+        """Return the index of each member of a list field, building it on first use.
+
+        :param field: The dotted field path, for example, `slayer_masters`.
+        :return: A dictionary of list member to a set of entry IDs.
+        :raises ValueError: The field has members that cannot be indexed.
+        """
+        try:
+            return self.member_indexes[field]
+        except KeyError:
+            pass
+
+        index = dict()
+        for entry_id, entry in self.iter_records():
+            for member in field_value(entry, field) or ():
+                try:
+                    index.setdefault(member, set()).add(entry_id)
+                except TypeError as e:
+                    raise ValueError(f"Error: Cannot index the {field} field. Exiting.") from e
+
+        self.member_indexes[field] = index
+        return index
+
+    def lookup(self, field: str, value: Any) -> Set[int]:
+        """Return the IDs of entries where a field matches a value.
+
+        :param field: The dotted field path, for example, `equipment.slot`.
+        :param value: The value to match, a list, tuple or set of values to match any of, or a predicate.
+        :return: A set of entry IDs.
+        """
+        return set(self._lookup(field, value))
+
+    def query(self, predicates: Dict[str, Any]) -> List[int]:
+        """Return the IDs of entries that match every field predicate.
+
+        :param predicates: A dictionary of dotted field path to the value (or values, or predicate) to match.
+        :return: A sorted list of entry IDs.
+        """
+        matches = sorted((self._lookup(field, value) for field, value in predicates.items()
+                          if not isinstance(value, Not)), key=len)
+        exclusions = [self._lookup(field, value.value) for field, value in predicates.items()
+                      if isinstance(value, Not)]
+
+        ids = matches[0] if matches else self._all_ids()
+        for other in matches[1:]:
+            if not ids:
+                break
+            ids = ids.intersection(other)
+        for other in exclusions:
+            if not ids:
+                break
+            ids = ids.difference(other)
+        return sorted(ids)
+
+    def _all_ids(self) -> Set[int]:
+        """Return the IDs of every entry."""
+        return {entry_id for entry_id, _ in self.iter_records()}
+
+    def _lookup(self, field: str, value: Any) -> Set[int]:
+        """Return the IDs of entries where a field matches, which may be the (shared) index set."""
+        if isinstance(value, Between):
+            values, ids = self.sorted_index(field)
+            start = 0 if value.minimum is None else bisect_left(values, value.minimum)
+            end = len(values) if value.maximum is None else bisect_right(values, value.maximum)
+            return set(ids[start:end])
+        if isinstance(value, Contains):
+            index = self.member_index(field)
+            if isinstance(value.value, MULTIPLE_VALUE_TYPES):
+                ids = set()
+                for single_value in value.value:
+                    ids.update(index.get(single_value, ()))
+                return ids
+            return index.get(value.value, set())
+        if isinstance(value, Not):
+            return self._all_ids() - self._lookup(field, value.value)
+
+        index = self.index(field)
+        if isinstance(value, MULTIPLE_VALUE_TYPES):
+            ids = set()
+            for single_value in value:
+                ids.update(index.get(single_value, ()))
+            return ids
+        return index.get(value, set())
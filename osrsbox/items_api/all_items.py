@@ -19,11 +19,20 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
 
-import json
+import warnings
 from pathlib import Path
-from typing import Dict, List, Union, Generator
-
+from typing import Any, Dict, List, Tuple, Union, Optional, Generator
+
+from osrsbox import codec
+from osrsbox import snapshot
+from osrsbox import record_store
+from osrsbox import typed_decoder
+from osrsbox.field_index import FieldIndexes
+from osrsbox.name_index import NgramIndex
+from osrsbox.name_index import FuzzyNameIndex
 from osrsbox.items_api.item_properties import ItemProperties
+from osrsbox.items_api.item_properties import SlottedItemProperties
+from osrsbox.items_api.equipment_columns import EquipmentColumns
 
 PATH_TO_ITEMS_COMPLETE_JSON = Path(__file__).absolute().parent / ".." / ".." / "docs" / "items-complete.json"
 if not PATH_TO_ITEMS_COMPLETE_JSON.is_file():
@@ -35,17 +44,45 @@ if not PATH_TO_ITEMS_COMPLETE_JSON.is_file():
 class AllItems:
     """This class handles loading of the osrsbox-db items database.
 
-    :param input_data_file_or_directory: The osrsbox-db items folder of JSON files, or single JSON file.
+    :param input_data_file_or_directory: The osrsbox-db items folder of JSON files, single JSON file,
+        record store data file (`items-complete.jsonl`), or an open RecordStore (for example, in shared memory).
+    :param use_snapshot: Load a fresh binary snapshot of a single JSON file, if available. A snapshot
+        is a pickle, so by default (None) only the snapshots of the packaged `items-complete.json`, next
+        to it or in the user cache directory, are used. Only pass True for a JSON file whose snapshot you trust.
+    :param lazy: Keep the raw JSON records, and only build each ItemProperties object on first access. Built
+        objects are memoized, and iterating or filtering builds (and memoizes) every object.
+    :param slotted: Build compact SlottedItemProperties objects, which use less memory.
     """
-    def __init__(self, input_data_file_or_directory: Path = PATH_TO_ITEMS_COMPLETE_JSON):
-        self.all_items: List[ItemProperties] = list()
+    def __init__(self, input_data_file_or_directory: Union[Path, record_store.RecordStore] = PATH_TO_ITEMS_COMPLETE_JSON,
+                 use_snapshot: Optional[bool] = None, lazy: bool = False, slotted: bool = False):
         self.all_items_dict: Dict[int, ItemProperties] = dict()
+        self.use_snapshot = use_snapshot
+        self.lazy = lazy
+        self.item_class = SlottedItemProperties if slotted else ItemProperties
+        # Sorted IDs of every loaded item (built or not)
+        self._item_ids: List[int] = list()
+        # Raw JSON records of items that have not been built yet (lazy mode only)
+        self._raw_items: Dict[int, Dict] = dict()
+        # Record store that unbuilt items are read from (lazy mode only)
+        self._record_store: Optional[record_store.RecordStore] = None
+        self._all_items: Optional[List[ItemProperties]] = None
+        # Lower case name -> item IDs (in ID order), built on first name lookup
+        self._name_indexes: Dict[str, Dict[str, List[int]]] = dict()
+        # Trigram index of name and wiki_name, built on first keyword search
+        self._ngram_index: Optional[NgramIndex] = None
+        # Fuzzy name index, and IDs of duplicate items, built on first fuzzy search
+        self._fuzzy_index: Optional[FuzzyNameIndex] = None
+        self._duplicate_ids: Optional[List[int]] = None
+        # Field value -> item IDs, built per field on first filter
+        self._field_indexes = FieldIndexes(self._iter_item_records)
+        # Columnar view of equipment stats, built on first use
+        self._equipment_columns = None
         self.load_all_items(input_data_file_or_directory)
 
     def __iter__(self) -> Generator[ItemProperties, None, None]:
         """Iterate (loop) over each ItemProperties object."""
-        for item in self.all_items:
-            yield item
+        for item_id in self._item_ids:
+            yield self._get_item(item_id)
 
     def __getitem__(self, id_number: int) -> ItemProperties:
         """Return the item definition object for a loaded item.
@@ -53,14 +90,34 @@ class AllItems:
         :param id_number: The item ID number.
         :return: The item definition object linked to a specific ID number.
         """
-        return self.all_items_dict[id_number]
+        return self._get_item(id_number)
 
     def __len__(self) -> int:
         """Return the count of the total number of items.
 
         :return: The total number of items.
         """
-        return len(self.all_items)
+        return len(self._item_ids)
+
+    def __contains__(self, id_number: int) -> bool:
+        """Check if an item ID is loaded, without building the item.
+
+        :param id_number: The item ID number.
+        :return: True if the item ID is in the database.
+        """
+        if id_number in self.all_items_dict or id_number in self._raw_items:
+            return True
+        return self._record_store is not None and id_number in self._record_store
+
+    @property
+    def all_items(self) -> List[ItemProperties]:
+        """A list of every ItemProperties object, sorted by item ID.
+
+        In lazy mode, the first access builds every item that is not built yet.
+        """
+        if self._all_items is None:
+            self._all_items = [self._get_item(item_id) for item_id in self._item_ids]
+        return self._all_items
 
     def lookup_by_item_id(self, item_id_number: int) -> ItemProperties:
         """Lookup a specific item ID and get the associated ItemProperties object.
@@ -70,7 +127,7 @@ class AllItems:
         :raises: KeyError when the item ID cannot be found.
         """
         try:
-            item_properties = self.all_items_dict[item_id_number]
+            item_properties = self._get_item(item_id_number)
         except KeyError:
             raise KeyError("Cannot find the provided item ID number...")
         return item_properties
@@ -83,7 +140,8 @@ class AllItems:
         method parameters. The only transformation performed on the item name
         provided is to convert it to lower case to (slightly) improve lookup recall.
         This function works on a first-come-first-served basis. The first instance
-        where the name matches is returned.
+        (lowest item ID) where the name matches is returned. The lookup uses a
+        lower case name index, which is built on the first call.
 
         :param item_name: The item name to lookup.
         :param use_wiki_name: Whether to use the `wiki_name` instead of `name`.
@@ -95,61 +153,173 @@ class AllItems:
         if use_wiki_name:
             lookup_property = "wiki_name"
 
-        for item in self.all_items:
-            # Get the raw property value
-            name_value = getattr(item, lookup_property)
-            # Check property value for None (only effective for wiki_name)
-            if not name_value:
-                continue
-
-            # Check for an exact name match
-            if name_value.lower() == item_name.lower():
-                return item
+        item_ids = self._name_index(lookup_property).get(item_name.lower())
+        if not item_ids:
+            raise ValueError("Cannot find the provided item name...")
 
-        raise ValueError("Cannot find the provided item name...")
+        return self._get_item(item_ids[0])
 
-    def search_item_names(self, keyword: str) -> List[ItemProperties]:
+    def search_item_names(self, keyword: str, limit: int = None, offset: int = 0) -> List[ItemProperties]:
         """Keyword search items and get the a list of ItemProperties objects.
 
         This function performs a search of all item names in the database. The name
         and wiki_name properties are searched. Results are returned as a list of
-        ItemProperties objects. The only transformation performed is converting the
-        search keyword and item name/wiki_name to lower case.
+        ItemProperties objects, in item ID order. The only transformation performed
+        is converting the search keyword and item name/wiki_name to lower case.
+        The search uses a trigram index of the item names, which is built on the
+        first call.
 
         :param keyword: The keyword to search for.
+        :param limit: The maximum number of results to return, or None for all results.
+        :param offset: The number of matching items to skip before collecting results.
         :return: A list of ItemProperties objects found from the keyword search.
         :raises: ValueError when no keyword matches can be found.
         """
-        item_results = list()
-        for item in self.all_items:
-            if keyword.lower() in item.name.lower():
-                item_results.append(item)
-            elif item.wiki_name:
-                if keyword.lower() in item.wiki_name.lower():
-                    item_results.append(item)
+        if self._ngram_index is None:
+            self._ngram_index = NgramIndex()
+            for item_id, item in self._iter_item_records():
+                self._ngram_index.add(item_id, (self._record_value(item, "name"),
+                                                self._record_value(item, "wiki_name")))
+
+        item_ids = self._ngram_index.search(keyword, limit=limit, offset=offset)
+        return [self._get_item(item_id) for item_id in item_ids]
+
+    def fuzzy_search_item_names(self, query: str, limit: int = 10, include_duplicates: bool = False) -> List[ItemProperties]:
+        """Fuzzy search items by name, and get a ranked list of ItemProperties objects.
+
+        This function is tolerant of misspelt and partially typed names, for example,
+        "dragon scimmy" or "abyssal whp". The name and wiki_name of each item are split
+        into words. Each query word is matched to similar words by edit distance and
+        shared prefix, then the items that contain a similar word are ranked. An exact
+        (lower case) name match is always ranked first. The fuzzy index is built on the
+        first call.
+
+        :param query: The (possibly misspelt) item name to search for.
+        :param limit: The maximum number of results to return.
+        :param include_duplicates: Whether to include duplicate (noted, placeholder etc.) items.
+        :return: A list of ItemProperties objects, best match first.
+        """
+        if self._fuzzy_index is None:
+            self._fuzzy_index = FuzzyNameIndex()
+            self._duplicate_ids = list()
+            for item_id, item in self._iter_item_records():
+                self._fuzzy_index.add(item_id, (self._record_value(item, "name"),
+                                                self._record_value(item, "wiki_name")))
+                if self._record_value(item, "duplicate"):
+                    self._duplicate_ids.append(item_id)
+
+        exclude = None if include_duplicates else self._duplicate_ids
+        results = self._fuzzy_index.search(query, limit=limit, exclude=exclude)
+        return [self._get_item(item_id) for _, item_id in results]
+
+    def filter_items(self, predicates: Dict[str, Any] = None, **kwargs) -> List[ItemProperties]:
+        """Filter items by field values, and get a list of ItemProperties objects.
+
+        Each predicate is a field name and the value to match. Nested fields use a
+        dotted name, for example, `equipment.slot` or `weapon.weapon_type`, and are
+        supplied in the `predicates` dictionary. A list, tuple or set value matches
+        any one of the values. Each field is indexed on first use, so a filter of
+        several fields is a set intersection instead of a scan of every item.
+
+        For example, all F2P two-handed weapons:
+        ``all_db_items.filter_items({"equipment.slot": "2h"}, members=False)``
+
+        :param predicates: A dictionary of (dotted) field name to the value to match.
+        :param kwargs: Top level field names and the value to match.
+        :return: A list of ItemProperties objects that match every predicate, in item ID order.
+        :raises ValueError: A field cannot be indexed (for example, a list field).
+        """
+        predicates = dict(predicates or dict(), **kwargs)
+        return [self._get_item(item_id) for item_id in self._field_indexes.query(predicates)]
+
+    def equipment_columns(self) -> EquipmentColumns:
+        """Return a columnar (NumPy) view of the equipment stats of every equipable item.
 
-        return item_results
+        The view is built on the first call, and requires NumPy to be installed.
 
-    def load_all_items(self, input_data_file_or_directory: Union[Path, str]) -> None:
-        """Load the items database via a JSON file, or directory of JSON files.
+        :return: An EquipmentColumns object.
+        :raises ImportError: NumPy is not installed.
+        """
+        if self._equipment_columns is None:
+            self._equipment_columns = EquipmentColumns(item for _, item in self._iter_item_records())
+        return self._equipment_columns
+
+    def load_all_items(self, input_data_file_or_directory: Union[Path, str, record_store.RecordStore]) -> None:
+        """Load the items database via a JSON file, directory of JSON files, or record store.
 
-        :param input_data_file_or_directory: The path to the data input.
+        :param input_data_file_or_directory: The path to the data input, or an open RecordStore.
         :raises ValueError: Valid input not found.
         """
         # Check if a str is supplied, if so, convert to Path object
         if isinstance(input_data_file_or_directory, str):
             input_data_file_or_directory = Path(input_data_file_or_directory)
 
-        # Process the directory of JSON, or a single JSON file
-        if input_data_file_or_directory.is_dir():
+        # Process an open record store, the directory of JSON, a record store file, or a single JSON file
+        if isinstance(input_data_file_or_directory, record_store.RecordStore):
+            self._load_items_from_store(store=input_data_file_or_directory)
+        elif input_data_file_or_directory.is_dir():
             self._load_items_from_directory(path_to_directory=input_data_file_or_directory)
+        elif input_data_file_or_directory.suffix == record_store.DATA_SUFFIX and input_data_file_or_directory.is_file():
+            self._load_items_from_record_store(path_to_data_file=input_data_file_or_directory)
         elif input_data_file_or_directory.is_file():
             self._load_items_from_file(path_to_json_file=input_data_file_or_directory)
         else:
             raise ValueError("Error: Valid input not found. Exiting.")
 
-        # Sort the list of items
-        self.all_items.sort(key=lambda x: x.id)
+        # Sort the list of item IDs, the item list is rebuilt on next access
+        item_ids = set(self.all_items_dict).union(self._raw_items)
+        if self._record_store is not None:
+            item_ids.update(self._record_store)
+        self._item_ids = sorted(item_ids)
+        self._all_items = None
+        self._name_indexes = dict()
+        self._ngram_index = None
+        self._fuzzy_index = None
+        self._duplicate_ids = None
+        self._field_indexes = FieldIndexes(self._iter_item_records)
+        self._equipment_columns = None
+
+    def _name_index(self, lookup_property: str) -> Dict[str, List[int]]:
+        """Return the lower case name index for `name` or `wiki_name`, building it on first use.
+
+        :param lookup_property: The name property to index.
+        :return: A dictionary of lower case name to a list of item IDs, in ID order.
+        """
+        try:
+            return self._name_indexes[lookup_property]
+        except KeyError:
+            pass
+
+        name_index = dict()
+        for item_id, item in self._iter_item_records():
+            name_value = self._record_value(item, lookup_property)
+            # Skip empty names (only effective for wiki_name)
+            if not name_value:
+                continue
+            name_index.setdefault(name_value.lower(), list()).append(item_id)
+
+        self._name_indexes[lookup_property] = name_index
+        return name_index
+
+    def _iter_item_records(self) -> Generator[Tuple[int, Union[ItemProperties, Dict]], None, None]:
+        """Iterate (loop) over each item ID and item, in ID order, without building any items.
+
+        Items that are not built yet (lazy mode) are returned as their raw JSON record.
+        """
+        for item_id in self._item_ids:
+            item = self.all_items_dict.get(item_id)
+            if item is None:
+                item = self._raw_items.get(item_id)
+            if item is None:
+                item = self._record_store[item_id]
+            yield item_id, item
+
+    @staticmethod
+    def _record_value(item: Union[ItemProperties, Dict], property_name: str) -> Any:
+        """Return a property value from an ItemProperties object, or a raw JSON record."""
+        if isinstance(item, dict):
+            return item.get(property_name)
+        return getattr(item, property_name)
 
     def _load_items_from_directory(self, path_to_directory: Path) -> None:
         """Load item database from a directory of JSON files (`items-json`).
@@ -168,33 +338,152 @@ class AllItems:
         # Loop through every item in JSON file
         for json_file in json_files:
             with open(json_file) as input_json_file:
-                temp = json.load(input_json_file)
+                temp = codec.load(input_json_file)
 
             self._load_item(temp)
 
     def _load_items_from_file(self, path_to_json_file: Path) -> None:
         """Load item database from a single JSON file (`items-complete.json`).
 
+        A binary snapshot (`items-complete.snapshot`) next to the JSON file is
+        loaded instead, when the snapshot checksum matches the JSON file. The
+        snapshot is not used in lazy mode, as it stores every built item, or when
+        it stores a different item class (for example, in slotted mode). The
+        snapshot is a pickle, so it is only used for the packaged JSON file,
+        unless `use_snapshot` is True. Snapshots are not shipped in the package,
+        the snapshot of the packaged JSON file is written to the user cache
+        directory (see :func:`osrsbox.snapshot.user_cache_dir`) on first use.
+
+        Otherwise, the JSON is decoded directly into typed ItemProperties objects
+        (see :mod:`osrsbox.typed_decoder`). If the JSON does not match the typed
+        fields, each item is built with :meth:`ItemProperties.from_json` instead.
+
         :param path_to_json_file: The path to the `items-complete.json` file.
         """
-        with open(path_to_json_file) as input_json_file:
-            temp = json.load(input_json_file)
+        packaged_file = Path(path_to_json_file).resolve() == PATH_TO_ITEMS_COMPLETE_JSON.resolve()
+        use_snapshot = packaged_file if self.use_snapshot is None else self.use_snapshot
+        if use_snapshot and not self.lazy:
+            items = snapshot.load_snapshot(self.item_class, path_to_json_file)
+            if items is None and packaged_file:
+                items = snapshot.load_snapshot(self.item_class, path_to_json_file,
+                                               snapshot.cached_snapshot_path(path_to_json_file, self.item_class))
+            if items is not None:
+                for item_def in items:
+                    self.all_items_dict[item_def.id] = item_def
+                return
+
+        with open(path_to_json_file, "rb") as input_json_file:
+            data = input_json_file.read()
+
+        items = None
+        if not self.lazy:
+            try:
+                items = typed_decoder.decode_entries(data, self.item_class)
+            except ValueError:
+                items = None
+            if items is not None:
+                for item_def in items:
+                    self.all_items_dict[item_def.id] = item_def
+
+        if items is None:
+            temp = codec.loads(data)
+            for entry in temp:
+                self._load_item(temp[entry])
+
+        if use_snapshot and packaged_file and not self.lazy:
+            self._write_cached_snapshot(path_to_json_file)
+
+    def _write_cached_snapshot(self, path_to_json_file: Path) -> None:
+        """Write the snapshot of the packaged `items-complete.json` file to the user cache directory.
+
+        A snapshot that cannot be written is reported with a warning, the items are still loaded.
+
+        :param path_to_json_file: The path to the packaged `items-complete.json` file.
+        """
+        path_to_snapshot = snapshot.cached_snapshot_path(path_to_json_file, self.item_class)
+        items = [self.all_items_dict[item_id] for item_id in sorted(self.all_items_dict)]
+        try:
+            path_to_snapshot.parent.mkdir(parents=True, exist_ok=True)
+            snapshot.write_snapshot(items, self.item_class, path_to_json_file, path_to_snapshot)
+        except OSError as e:
+            warnings.warn(f"Cannot write the items snapshot to {path_to_snapshot}: {e}")
+
+    def _load_items_from_record_store(self, path_to_data_file: Path) -> None:
+        """Load item database from a record store (`items-complete.jsonl` and `items-complete.idx`).
+
+        In lazy mode, the data file stays memory-mapped and each item is read
+        from it on first access. Otherwise, every item is read and built now.
+
+        :param path_to_data_file: The path to the `items-complete.jsonl` file.
+        """
+        store = record_store.RecordStore.open(path_to_data_file)
+        if self.lazy:
+            self._record_store = store
+            return
+
+        with store:
+            self._load_items_from_store(store)
 
-        for entry in temp:
-            self._load_item(temp[entry])
+    def _load_items_from_store(self, store: record_store.RecordStore) -> None:
+        """Load item database from an open record store, for example, in shared memory.
+
+        In lazy mode, each item is read from the store on first access, and the
+        store must stay open. Otherwise, every item is read and built now.
+
+        :param store: The open RecordStore.
+        """
+        if self.lazy:
+            self._record_store = store
+            return
+
+        for item_id in store:
+            self._load_item(store[item_id])
 
     def _load_item(self, item_json: Dict) -> None:
-        """Convert the `item_json` into a :class:`ItemProperties` and store it.
+        """Store the `item_json`, building the :class:`ItemProperties` unless in lazy mode.
+
+        :param item_json: A dict from an open and loaded JSON file.
+        :raises ValueError: Cannot populate item.
+        """
+        if self.lazy:
+            self._raw_items[item_json["id"]] = item_json
+            return
+
+        item_def = self._build_item(item_json)
+        self.all_items_dict[item_def.id] = item_def
+
+    def _get_item(self, item_id: int) -> ItemProperties:
+        """Return a built item, building (and memoizing) it on first access in lazy mode.
+
+        :param item_id: The item ID number.
+        :return: The ItemProperties object for the item ID.
+        :raises KeyError: The item ID is not loaded.
+        """
+        try:
+            return self.all_items_dict[item_id]
+        except KeyError:
+            pass
+
+        if item_id in self._raw_items:
+            item_def = self._build_item(self._raw_items[item_id])
+            del self._raw_items[item_id]
+        elif self._record_store is not None:
+            item_def = self._build_item(self._record_store[item_id])
+        else:
+            raise KeyError(item_id)
+
+        self.all_items_dict[item_id] = item_def
+        return item_def
+
+    def _build_item(self, item_json: Dict) -> ItemProperties:
+        """Convert the `item_json` into a :class:`ItemProperties`.
 
         :param item_json: A dict from an open and loaded JSON file.
+        :return: The populated ItemProperties object.
         :raises ValueError: Cannot populate item.
         """
         # Load the item using the ItemProperties class
         try:
-            item_def = ItemProperties.from_json(item_json)
+            return self.item_class.from_json(item_json)
         except TypeError as e:
             raise ValueError("Error: Invalid JSON structure found, check supplied input. Exiting") from e
-
-        # Add item to list
-        self.all_items.append(item_def)
-        self.all_items_dict[item_def.id] = item_def
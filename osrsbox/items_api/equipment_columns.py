@@ -0,0 +1,162 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+A columnar (NumPy) view of the equipment stats of every equipable item.
+
+Each numeric ItemEquipment property is one column of a 2D stats array, with
+one row per item. The item ID, slot and members status of each row are stored
+in matching arrays, and the skill requirements in a matching list. Filters,
+top-k selections and weighted scores are then array operations, instead of
+loops over ItemProperties objects.
+
+NumPy is an optional dependency: `pip install osrsbox[columns]`.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import dataclasses
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Union
+from typing import Iterable
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from osrsbox.field_index import field_value
+from osrsbox.items_api.item_equipment import ItemEquipment
+
+# Every numeric ItemEquipment property, in dataclass field order
+STAT_FIELDS = tuple(field.name for field in dataclasses.fields(ItemEquipment) if field.type is int)
+
+
+class EquipmentColumns:
+    """This class stores the equipment stats of equipable items as NumPy arrays.
+
+    Rows are sorted by item ID. Only items that are equipable by a player, and
+    have equipment stats, are included.
+
+    :param items: An iterable of ItemProperties objects, or raw item JSON records.
+    :raises ImportError: NumPy is not installed.
+    """
+    def __init__(self, items: Iterable[Any]):
+        if np is None:
+            raise ImportError("Error: EquipmentColumns requires NumPy, install osrsbox[columns]. Exiting.")
+
+        rows = list()
+        for item in items:
+            equipment = field_value(item, "equipment")
+            if equipment is None or not field_value(item, "equipable_by_player"):
+                continue
+            rows.append((field_value(item, "id"),
+                         field_value(equipment, "slot"),
+                         bool(field_value(item, "members")),
+                         [field_value(equipment, stat) or 0 for stat in STAT_FIELDS],
+                         field_value(equipment, "requirements") or dict()))
+        rows.sort(key=lambda row: row[0])
+
+        self.ids = np.array([row[0] for row in rows], dtype=np.int32)
+        self.slots = np.array([row[1] or "" for row in rows], dtype=str)
+        self.members = np.array([row[2] for row in rows], dtype=bool)
+        self.stats = np.array([row[3] for row in rows], dtype=np.int32).reshape(len(rows), len(STAT_FIELDS))
+        self.requirements: List[Dict[str, int]] = [row[4] for row in rows]
+        self._stat_columns = {stat: position for position, stat in enumerate(STAT_FIELDS)}
+
+    def __len__(self) -> int:
+        """Return the count of items (rows)."""
+        return len(self.ids)
+
+    def column(self, stat: str) -> "np.ndarray":
+        """Return the column of one equipment stat.
+
+        :param stat: The ItemEquipment property name, for example, `attack_slash`.
+        :return: A 1D array of the stat value for each row.
+        """
+        return self.stats[:, self._stat_position(stat)]
+
+    def mask(self, slot: Union[str, Iterable[str]] = None, members: Optional[bool] = None,
+             minimums: Dict[str, int] = None) -> "np.ndarray":
+        """Return a boolean row mask of items that match every filter.
+
+        :param slot: The equipment slot, or an iterable of slots, to match.
+        :param members: True for members items, False for F2P items, or None for both.
+        :param minimums: A dictionary of equipment stat to the minimum value.
+        :return: A 1D boolean array, True for matching rows.
+        """
+        row_mask = np.ones(len(self), dtype=bool)
+        if slot is not None:
+            if isinstance(slot, str):
+                row_mask &= self.slots == slot
+            else:
+                row_mask &= np.isin(self.slots, list(slot))
+        if members is not None:
+            row_mask &= self.members == members
+        for stat, minimum in (minimums or dict()).items():
+            row_mask &= self.column(stat) >= minimum
+        return row_mask
+
+    def weighted_scores(self, weights: Dict[str, float]) -> "np.ndarray":
+        """Return a score for each row, the weighted sum of equipment stats.
+
+        :param weights: A dictionary of equipment stat to weight, unlisted stats have a weight of 0.
+        :return: A 1D float array of scores.
+        """
+        weight_vector = np.zeros(len(STAT_FIELDS), dtype=np.float64)
+        for stat, weight in weights.items():
+            weight_vector[self._stat_position(stat)] = weight
+        return self.stats @ weight_vector
+
+    def top_k(self, scores: Union[str, "np.ndarray"], k: int, mask: "np.ndarray" = None) -> "np.ndarray":
+        """Return the item IDs of the k highest scoring rows.
+
+        Equal scores are ordered by item ID, so results are stable.
+
+        :param scores: An equipment stat name, or a 1D array with a score for each row.
+        :param k: The maximum number of item IDs to return.
+        :param mask: An optional boolean row mask, only True rows are considered.
+        :return: A 1D array of item IDs, highest score first.
+        """
+        if isinstance(scores, str):
+            scores = self.column(scores)
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        if k <= 0 or not len(rows):
+            return self.ids[:0]
+
+        row_scores = scores[rows]
+        if k < len(rows):
+            # Keep every row tied with the k-th highest score, then sort the (small) remainder
+            threshold = np.partition(row_scores, len(rows) - k)[len(rows) - k]
+            keep = row_scores >= threshold
+            rows = rows[keep]
+            row_scores = row_scores[keep]
+        order = np.lexsort((self.ids[rows], -row_scores))[:k]
+        return self.ids[rows[order]]
+
+    def _stat_position(self, stat: str) -> int:
+        """Return the stats array column number of an equipment stat.
+
+        :raises ValueError: The stat is not a numeric equipment property.
+        """
+        try:
+            return self._stat_columns[stat]
+        except KeyError as e:
+            raise ValueError(f"Error: Unknown equipment stat {stat}. Exiting.") from e
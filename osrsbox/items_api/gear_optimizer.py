@@ -0,0 +1,213 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+A best-in-slot gear optimizer over the columnar equipment stats of all items.
+
+A loadout is one item (or nothing) for each equipment slot, with either a 2h
+weapon, or a weapon and a shield. The score of a loadout is the weighted sum
+of the equipment stats of every item in the loadout.
+
+When the optimizer is created, items that can never be in a top loadout are
+pruned from each slot. An item is dominated by another item in the same slot
+when the other item has stats at least as high, skill requirements no higher,
+and is no more restricted by members status. An item that is dominated by at
+least `max_loadouts` other items can be replaced by any of them, so it cannot
+be in the top `max_loadouts` loadouts of any objective with non-negative weights.
+
+Each query filters the remaining items by skill levels and members status,
+sorts the candidates of each slot by score, and combines the slots with a
+k-best search, so only the top N loadouts are ever built.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import heapq
+from itertools import chain
+from dataclasses import dataclass
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from osrsbox.items_api.all_items import AllItems
+from osrsbox.items_api.item_properties import ItemProperties
+
+# Slots that always hold (at most) one item
+ARMOUR_SLOTS = ("head", "cape", "neck", "ammo", "body", "legs", "hands", "feet", "ring")
+# A loadout has either a 2h weapon, or a weapon and a shield
+WEAPON_SLOTS = ("weapon", "shield", "2h")
+
+# A slot option: the score, and a tuple of (slot, row) pairs (empty for an empty slot)
+Option = Tuple[float, Tuple[Tuple[str, int], ...]]
+
+
+@dataclass
+class Loadout:
+    """This class defines one optimized loadout.
+
+    :param score: The weighted sum of the equipment stats of every item.
+    :param items: A dictionary of equipment slot to item, empty slots are not included.
+    """
+    score: float
+    items: Dict[str, ItemProperties]
+
+
+def _k_best(option_lists: List[List[Option]], n: int) -> List[Option]:
+    """Return the n best combinations of one option from each list.
+
+    :param option_lists: Lists of options, each sorted by score, highest first.
+    :param n: The maximum number of combinations to return.
+    :return: A list of combined options, highest score first.
+    """
+    if not option_lists or any(not options for options in option_lists):
+        return list()
+
+    def total(indices: Tuple[int, ...]) -> float:
+        return sum(option_lists[group][position][0] for group, position in enumerate(indices))
+
+    start = (0,) * len(option_lists)
+    heap = [(-total(start), start)]
+    seen = {start}
+    results = list()
+    while heap and len(results) < n:
+        negative_score, indices = heapq.heappop(heap)
+        items = tuple(chain.from_iterable(option_lists[group][position][1] for group, position in enumerate(indices)))
+        results.append((-negative_score, items))
+        for group, position in enumerate(indices):
+            if position + 1 < len(option_lists[group]):
+                following = indices[:group] + (position + 1,) + indices[group + 1:]
+                if following not in seen:
+                    seen.add(following)
+                    heapq.heappush(heap, (-total(following), following))
+    return results
+
+
+class GearOptimizer:
+    """This class finds the best scoring loadouts of equipable items.
+
+    :param all_db_items: The loaded items database.
+    :param max_loadouts: The largest number of loadouts a query can return, items are pruned to suit.
+    :raises ImportError: NumPy is not installed.
+    """
+    def __init__(self, all_db_items: AllItems, max_loadouts: int = 10):
+        if np is None:
+            raise ImportError("Error: GearOptimizer requires NumPy, install osrsbox[columns]. Exiting.")
+
+        self.all_db_items = all_db_items
+        self.columns = all_db_items.equipment_columns()
+        self.max_loadouts = max_loadouts
+
+        # Required level of every skill for each row, 1 when there is no requirement
+        self.skills = sorted({skill for requirements in self.columns.requirements for skill in requirements})
+        self.requirement_levels = np.ones((len(self.columns), len(self.skills)), dtype=np.int32)
+        for row, requirements in enumerate(self.columns.requirements):
+            for skill, level in requirements.items():
+                self.requirement_levels[row, self.skills.index(skill)] = level
+
+        # Every row of each slot, and the rows left after pruning dominated items
+        self.slot_rows: Dict[str, "np.ndarray"] = dict()
+        self.candidate_rows: Dict[str, "np.ndarray"] = dict()
+        for slot in ARMOUR_SLOTS + WEAPON_SLOTS:
+            self.slot_rows[slot] = np.flatnonzero(self.columns.slots == slot)
+            self.candidate_rows[slot] = self._prune(self.slot_rows[slot])
+
+    def best_loadouts(self, weights: Dict[str, float], skills: Dict[str, int] = None,
+                      members: bool = True, n: int = 1) -> List[Loadout]:
+        """Find the best scoring loadouts for a weighted objective.
+
+        :param weights: A dictionary of equipment stat to weight, for example, `{"melee_strength": 1}`.
+        :param skills: A dictionary of skill to the player level, skills that are not listed are not capped.
+        :param members: Whether members items can be used.
+        :param n: The number of loadouts to return, at most `max_loadouts`.
+        :return: A list of Loadout objects, highest score first.
+        :raises ValueError: The number of loadouts is more than `max_loadouts`.
+        """
+        if n > self.max_loadouts:
+            raise ValueError(f"Error: Cannot return more than {self.max_loadouts} loadouts. Exiting.")
+        if n <= 0:
+            return list()
+
+        scores = self.columns.weighted_scores(weights)
+        allowed = self._allowed_rows(skills, members)
+        # Pruning assumes a higher stat never lowers the score
+        slot_rows = self.candidate_rows if all(weight >= 0 for weight in weights.values()) else self.slot_rows
+
+        options = {slot: self._slot_options(slot, slot_rows[slot], scores, allowed, n) for slot in slot_rows}
+        weapon_options = _k_best([options["weapon"], options["shield"]], n)
+        weapon_options.extend(option for option in options["2h"] if option[1])
+        weapon_options = sorted(weapon_options, key=lambda option: (-option[0], option[1]))[:n]
+
+        loadouts = list()
+        for score, items in _k_best([options[slot] for slot in ARMOUR_SLOTS] + [weapon_options], n):
+            loadout_items = {slot: self.all_db_items[int(self.columns.ids[row])] for slot, row in items}
+            loadouts.append(Loadout(score=float(score), items=loadout_items))
+        return loadouts
+
+    def _allowed_rows(self, skills: Dict[str, int], members: bool) -> "np.ndarray":
+        """Return a row mask of items that the player can equip.
+
+        :param skills: A dictionary of skill to the player level, or None.
+        :param members: Whether members items can be used.
+        :return: A 1D boolean array, True for allowed rows.
+        """
+        allowed = self.columns.mask(members=None if members else False)
+        for skill, level in (skills or dict()).items():
+            if skill in self.skills:
+                allowed &= self.requirement_levels[:, self.skills.index(skill)] <= level
+        return allowed
+
+    def _slot_options(self, slot: str, rows: "np.ndarray", scores: "np.ndarray", allowed: "np.ndarray", n: int) -> List[Option]:
+        """Return the n best options of a slot, including an empty slot.
+
+        :return: A list of options, highest score first.
+        """
+        rows = rows[allowed[rows]]
+        rows = rows[np.lexsort((self.columns.ids[rows], -scores[rows]))[:n]]
+        options = [(float(scores[row]), ((slot, int(row)),)) for row in rows]
+        options.append((0.0, ()))
+        return sorted(options, key=lambda option: (-option[0], option[1]))[:n]
+
+    def _prune(self, rows: "np.ndarray") -> "np.ndarray":
+        """Return the rows of a slot that are dominated by fewer than `max_loadouts` other rows.
+
+        Rows that are identical are ordered by item ID, so only the later rows are dominated.
+
+        :param rows: The rows of one equipment slot, in item ID order.
+        :return: The rows that are kept.
+        """
+        stats = self.columns.stats[rows]
+        levels = self.requirement_levels[rows]
+        members = self.columns.members[rows]
+        positions = np.arange(len(rows))
+
+        keep = list()
+        for position in positions:
+            at_least = ((stats >= stats[position]).all(axis=1)
+                        & (levels <= levels[position]).all(axis=1)
+                        & (members <= members[position]))
+            better = ((stats > stats[position]).any(axis=1)
+                      | (levels < levels[position]).any(axis=1)
+                      | (members < members[position]))
+            dominators = at_least & (better | (positions < position))
+            if np.count_nonzero(dominators) < self.max_loadouts:
+                keep.append(position)
+        return rows[keep]
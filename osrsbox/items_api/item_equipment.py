@@ -21,8 +21,12 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 from dataclasses import asdict
 from dataclasses import dataclass
 from typing import Dict
+from typing import Tuple
+from typing import ClassVar
 from typing import Optional
 
+from osrsbox.slotted import slotted_dataclass
+
 
 @dataclass
 class ItemEquipment:
@@ -50,9 +54,16 @@ class ItemEquipment:
     slot: str
     requirements: Optional[Dict]
 
+    # Properties with strings that repeat across many items, and are interned
+    interned_properties: ClassVar[Tuple[str, ...]] = ("slot",)
+
     def construct_json(self) -> Dict:
         """Construct dictionary/JSON of ItemEquipment class for exporting or printing.
 
         :return: All class attributes stored in a dictionary.
         """
         return asdict(self)
+
+
+# A compact variant that uses __slots__, with the same properties
+SlottedItemEquipment = slotted_dataclass(ItemEquipment)
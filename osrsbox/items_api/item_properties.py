@@ -18,15 +18,21 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
-import json
 from pathlib import Path
 from dataclasses import asdict
 from dataclasses import dataclass
 from typing import Dict
+from typing import Tuple
+from typing import ClassVar
 from typing import Optional
 
+from osrsbox import codec
+from osrsbox.slotted import intern_strings
+from osrsbox.slotted import slotted_dataclass
 from osrsbox.items_api.item_equipment import ItemEquipment
+from osrsbox.items_api.item_equipment import SlottedItemEquipment
 from osrsbox.items_api.item_weapon import ItemWeapon
+from osrsbox.items_api.item_weapon import SlottedItemWeapon
 
 
 @dataclass
@@ -46,7 +52,8 @@ class ItemProperties:
     tradeable: Optional[bool]
     tradeable_on_ge: bool
     stackable: bool
-    stacked: bool
+    # The stack count, or None (see the README property table)
+    stacked: Optional[int]
     noted: bool
     noteable: bool
     linked_id_item: Optional[int]
@@ -57,8 +64,9 @@ class ItemProperties:
     equipable_by_player: bool
     equipable_weapon: bool
     cost: int
-    lowalch: int
-    highalch: int
+    # None for items that cannot be alched, for example, placeholders (see the README property table)
+    lowalch: Optional[int]
+    highalch: Optional[int]
     weight: Optional[float]
     buy_limit: Optional[int]
     quest_item: bool
@@ -71,18 +79,29 @@ class ItemProperties:
     equipment: Optional[ItemEquipment] = None
     weapon: Optional[ItemWeapon] = None
 
+    # The classes of the nested equipment and weapon properties
+    equipment_class: ClassVar[type] = ItemEquipment
+    weapon_class: ClassVar[type] = ItemWeapon
+    # Properties with strings that repeat across many items, and are interned
+    interned_properties: ClassVar[Tuple[str, ...]] = ("last_updated", "release_date")
+
     @classmethod
     def from_json(cls, json_dict: Dict) -> 'ItemProperties':
         """Construct ItemProperties object from dictionary/JSON."""
+        # Share one copy of strings that repeat across many items
+        intern_strings(json_dict, cls.interned_properties)
+
         # Convert the dictionary under the 'equipment' key into ItemEquipment.
         if json_dict.get("equipable_by_player"):
             equipment = json_dict.pop("equipment")
-            json_dict["equipment"] = ItemEquipment(**equipment)
+            intern_strings(equipment, cls.equipment_class.interned_properties)
+            json_dict["equipment"] = cls.equipment_class(**equipment)
 
         # Convert the dictionary under the 'weapon' key into ItemWeapon.
         if json_dict.get("weapon"):
             weapon = json_dict.pop("weapon")
-            json_dict["weapon"] = ItemWeapon(**weapon)
+            intern_strings(weapon, cls.weapon_class.interned_properties)
+            json_dict["weapon"] = cls.weapon_class(**weapon)
 
         return cls(**json_dict)
 
@@ -104,6 +123,14 @@ class ItemProperties:
         out_file_path = Path(export_path / out_file_name)
         with open(out_file_path, "w") as out_file:
             if pretty:
-                json.dump(json_out, out_file, indent=4)
+                codec.dump(json_out, out_file, indent=4)
             else:
-                json.dump(json_out, out_file)
+                codec.dump(json_out, out_file)
+
+
+# A compact variant that uses __slots__, with the same properties
+SlottedItemProperties = slotted_dataclass(ItemProperties,
+                                          field_types={"equipment": Optional[SlottedItemEquipment],
+                                                       "weapon": Optional[SlottedItemWeapon]},
+                                          equipment_class=SlottedItemEquipment,
+                                          weapon_class=SlottedItemWeapon)
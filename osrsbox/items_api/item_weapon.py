@@ -20,7 +20,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from dataclasses import dataclass, asdict
-from typing import List, Dict
+from typing import List, Dict, Tuple, ClassVar
+
+from osrsbox.slotted import slotted_dataclass
 
 
 @dataclass
@@ -35,9 +37,16 @@ class ItemWeapon:
     weapon_type: str
     stances: List
 
+    # Properties with strings that repeat across many items, and are interned
+    interned_properties: ClassVar[Tuple[str, ...]] = ("weapon_type", "stances")
+
     def construct_json(self) -> Dict:
         """Construct dictionary/JSON of ItemWeapon class for exporting or printing.
 
         :return: All class attributes stored in a dictionary.
         """
         return asdict(self)
+
+
+# A compact variant that uses __slots__, with the same properties
+SlottedItemWeapon = slotted_dataclass(ItemWeapon)
@@ -41,8 +41,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
 
-import json
-
+from osrsbox import codec
 from osrsbox import items_api
 
 
@@ -95,4 +94,4 @@ if __name__ == "__main__":
     # Export extracted data
     out_file_name = "EquippableItems.json"
     with open(out_file_name, "w", newline="\n") as out_file:
-        json.dump(chunk_tracker_data, out_file, indent=4)
+        codec.dump(chunk_tracker_data, out_file, indent=4)
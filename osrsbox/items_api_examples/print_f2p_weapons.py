@@ -31,10 +31,11 @@ if __name__ == "__main__":
     # Load all items
     all_db_items = items_api.load()
 
-    # Loop through all items in the database and print the item name for each item
-    for item in all_db_items:
-        # Check if item is equipable, and is not memebers (aka f2p item)
-        if item.equipable_by_player and not item.members:
-            # If item is a "weapon" of "2h" weapon, print it!
-            if item.equipment.slot == "weapon" or item.equipment.slot == "2h":
-                print(f"{item.id:<6} {item.name}")  # New, f-strings printing method
+    # Filter equipable, non-members (aka f2p) items that are a "weapon" or "2h" weapon
+    f2p_weapons = all_db_items.filter_items({"equipment.slot": ("weapon", "2h")},
+                                            equipable_by_player=True,
+                                            members=False)
+
+    # Loop through the filtered items and print the item name for each item
+    for item in f2p_weapons:
+        print(f"{item.id:<6} {item.name}")  # New, f-strings printing method
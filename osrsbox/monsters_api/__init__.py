@@ -19,6 +19,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
 from osrsbox.monsters_api import all_monsters
+from osrsbox.monsters_api.drop_rarity import DropRarityTable
 
 
 def load() -> all_monsters.AllMonsters:
@@ -27,3 +28,18 @@ def load() -> all_monsters.AllMonsters:
     :return: An AllMonsters object containing the entire monster database.
     """
     return all_monsters.AllMonsters()
+
+
+def load_drop_rarity() -> DropRarityTable:
+    """Load the drop rarity tables of the osrsbox monster database.
+
+    The precomputed artifact (`monsters-complete.rarity.json`) is loaded from the
+    user cache directory, without loading the monsters. When the artifact is missing or out of date, the
+    monster database is loaded, and the tables are computed.
+
+    :return: A DropRarityTable of every monster.
+    """
+    drop_rarity = DropRarityTable.load(all_monsters.PATH_TO_MONSTERS_COMPLETE)
+    if drop_rarity is None:
+        drop_rarity = load().drop_rarity()
+    return drop_rarity
@@ -18,14 +18,28 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
-import json
 from pathlib import Path
+from typing import Any
 from typing import Dict
 from typing import List
+from typing import Tuple
 from typing import Union
+from typing import Iterable
+from typing import Optional
 from typing import Generator
 
+from osrsbox import codec
+from osrsbox import record_store
+from osrsbox.field_index import field_value
+from osrsbox.name_index import NameIndex
+from osrsbox.name_index import NgramIndex
+from osrsbox.field_index import FieldIndexes
+from osrsbox.monsters_api.drop_index import DropIndex
+from osrsbox.monsters_api.drop_rarity import DropRarityTable
+from osrsbox.monsters_api.drop_rarity import write_cached_drop_rarity
+from osrsbox.monsters_api.drop_calculator import DropTable
 from osrsbox.monsters_api.monster_properties import MonsterProperties
+from osrsbox.monsters_api.monster_properties import SlottedMonsterProperties
 
 PATH_TO_MONSTERS_COMPLETE = Path(__file__).absolute().parent / ".." / ".." / "docs" / "monsters-complete.json"
 if not PATH_TO_MONSTERS_COMPLETE.is_file():
@@ -37,17 +51,40 @@ if not PATH_TO_MONSTERS_COMPLETE.is_file():
 class AllMonsters:
     """This class handles loading of the osrsbox-db monsters database.
 
-    :param input_data_file_or_directory: The osrsbox-db monsters folder of JSON files, or single JSON file.
+    :param input_data_file_or_directory: The osrsbox-db monsters folder of JSON files, single JSON file,
+        record store data file (`monsters-complete.jsonl`), or an open RecordStore (for example, in shared memory).
+    :param slotted: Build compact SlottedMonsterProperties objects, which use less memory.
+    :param lazy: Keep the raw JSON records, and only build each MonsterProperties object on first access. Built
+        objects are memoized, and iterating or filtering builds (and memoizes) every object.
     """
-    def __init__(self, input_data_file_or_directory: Path = PATH_TO_MONSTERS_COMPLETE):
-        self.all_monsters: List[MonsterProperties] = list()
+    def __init__(self, input_data_file_or_directory: Union[Path, record_store.RecordStore] = PATH_TO_MONSTERS_COMPLETE,
+                 slotted: bool = False, lazy: bool = False):
         self.all_monsters_dict: Dict[int, MonsterProperties] = dict()
+        self.monster_class = SlottedMonsterProperties if slotted else MonsterProperties
+        self.lazy = lazy
+        # Sorted IDs of every loaded monster (built or not)
+        self._monster_ids: List[int] = list()
+        # Raw JSON records of monsters that have not been built yet (lazy mode only)
+        self._raw_monsters: Dict[int, Dict] = dict()
+        # Record store that unbuilt monsters are read from (lazy mode only)
+        self._record_store: Optional[record_store.RecordStore] = None
+        self._all_monsters: Optional[List[MonsterProperties]] = None
+        self._drop_index = None
+        self._drop_table = None
+        self._drop_rarity = None
+        # The single JSON file the monsters were loaded from, None for a directory
+        self.path_to_json_file = None
+        # Secondary indexes of monster fields, built on first use
+        self._field_indexes = FieldIndexes(self._iter_monster_records)
+        # Name indexes, built on first use
+        self._name_indexes: Dict[str, NameIndex] = dict()
+        self._ngram_index = None
         self.load_all_monsters(input_data_file_or_directory)
 
     def __iter__(self) -> Generator[MonsterProperties, None, None]:
         """Iterate (loop) over each MonsterProperties object."""
-        for monster in self.all_monsters:
-            yield monster
+        for monster_id in self._monster_ids:
+            yield self._get_monster(monster_id)
 
     def __getitem__(self, id_number: int) -> MonsterProperties:
         """Return the monster definition object for a loaded monster.
@@ -55,35 +92,248 @@ class AllMonsters:
         :param id_number: The monster ID number.
         :return: The monster definition object linked to a specific ID number.
         """
-        return self.all_monsters_dict[id_number]
+        return self._get_monster(id_number)
 
     def __len__(self) -> int:
         """Return the count of the total number of monsters.
 
         :return: The total number of monsters.
         """
-        return len(self.all_monsters)
+        return len(self._monster_ids)
 
-    def load_all_monsters(self, input_data_file_or_directory: Union[Path, str]) -> None:
-        """Load the monsters database via a JSON file, or directory of JSON files.
+    def __contains__(self, id_number: int) -> bool:
+        """Check if a monster ID is loaded, without building the monster.
 
-        :param input_data_file_or_directory: The path to the data input.
+        :param id_number: The monster ID number.
+        :return: True if the monster ID is in the database.
+        """
+        if id_number in self.all_monsters_dict or id_number in self._raw_monsters:
+            return True
+        return self._record_store is not None and id_number in self._record_store
+
+    @property
+    def all_monsters(self) -> List[MonsterProperties]:
+        """A list of every MonsterProperties object, sorted by monster ID.
+
+        In lazy mode, the first access builds every monster that is not built yet.
+        """
+        if self._all_monsters is None:
+            self._all_monsters = [self._get_monster(monster_id) for monster_id in self._monster_ids]
+        return self._all_monsters
+
+    def load_all_monsters(self, input_data_file_or_directory: Union[Path, str, record_store.RecordStore]) -> None:
+        """Load the monsters database via a JSON file, directory of JSON files, or record store.
+
+        :param input_data_file_or_directory: The path to the data input, or an open RecordStore.
         :raises ValueError: Valid input not found.
         """
         # Check if a str is supplied, if so, convert to Path object
         if isinstance(input_data_file_or_directory, str):
             input_data_file_or_directory = Path(input_data_file_or_directory)
 
-        # Process the directory of JSON, or a single JSON file
-        if input_data_file_or_directory.is_dir():
+        # Process an open record store, the directory of JSON, a record store file, or a single JSON file
+        previously_loaded = bool(self._monster_ids)
+        self.path_to_json_file = None
+        if isinstance(input_data_file_or_directory, record_store.RecordStore):
+            self._load_monsters_from_store(store=input_data_file_or_directory)
+        elif input_data_file_or_directory.is_dir():
             self._load_monsters_from_directory(path_to_directory=input_data_file_or_directory)
+        elif input_data_file_or_directory.suffix == record_store.DATA_SUFFIX and input_data_file_or_directory.is_file():
+            self._load_monsters_from_record_store(path_to_data_file=input_data_file_or_directory)
         elif input_data_file_or_directory.is_file():
             self._load_monsters_from_file(path_to_json_file=input_data_file_or_directory)
         else:
             raise ValueError("Error: Valid input not found. Exiting.")
 
-        # Sort the list of monsters
-        self.all_monsters.sort(key=lambda x: x.id)
+        # Precomputed artifacts only match the monsters of a single JSON file
+        if previously_loaded:
+            self.path_to_json_file = None
+
+        # Sort the list of monster IDs, the monster list is rebuilt on next access
+        monster_ids = set(self.all_monsters_dict).union(self._raw_monsters)
+        if self._record_store is not None:
+            monster_ids.update(self._record_store)
+        self._monster_ids = sorted(monster_ids)
+        self._all_monsters = None
+
+        # Built again on next use, from the loaded monsters
+        self._drop_index = None
+        self._drop_table = None
+        self._drop_rarity = None
+        self._field_indexes = FieldIndexes(self._iter_monster_records)
+        self._name_indexes = dict()
+        self._ngram_index = None
+
+    def lookup_by_monster_name(self, monster_name: str, use_wiki_name: bool = False) -> MonsterProperties:
+        """Lookup a specific monster name and get the associated MonsterProperties object.
+
+        The lookup is case insensitive. Many monsters share a name, and the first
+        instance (lowest monster ID) is returned, use `lookup_monsters_by_name`
+        to get every match. The lookup uses a case-folded name index, which is
+        built on the first call.
+
+        :param monster_name: The monster name to lookup.
+        :param use_wiki_name: Whether to use the `wiki_name` instead of `name`.
+        :return: The MonsterProperties object found from the lookup.
+        :raises: ValueError when the monster name cannot be found.
+        """
+        monsters = self.lookup_monsters_by_name(monster_name, use_wiki_name)
+        if not monsters:
+            raise ValueError("Cannot find the provided monster name...")
+        return monsters[0]
+
+    def lookup_monsters_by_name(self, monster_name: str, use_wiki_name: bool = False) -> List[MonsterProperties]:
+        """Lookup a monster name and get every MonsterProperties object with that name.
+
+        :param monster_name: The monster name to lookup (case insensitive).
+        :param use_wiki_name: Whether to use the `wiki_name` instead of `name`.
+        :return: A list of MonsterProperties objects, in monster ID order, empty when none match.
+        """
+        lookup_property = "wiki_name" if use_wiki_name else "name"
+        return [self._get_monster(monster_id) for monster_id in self._name_index(lookup_property).exact(monster_name)]
+
+    def search_monster_names(self, keyword: str, limit: int = None, offset: int = 0) -> List[MonsterProperties]:
+        """Keyword search monsters and get a list of MonsterProperties objects.
+
+        The name and wiki_name properties are searched (case insensitive), using
+        a trigram index of the monster names, which is built on the first call.
+
+        :param keyword: The keyword to search for.
+        :param limit: The maximum number of results to return, or None for all results.
+        :param offset: The number of matching monsters to skip before collecting results.
+        :return: A list of MonsterProperties objects, in monster ID order.
+        """
+        if self._ngram_index is None:
+            self._ngram_index = NgramIndex()
+            for monster_id, monster in self._iter_monster_records():
+                self._ngram_index.add(monster_id, (field_value(monster, "name"), field_value(monster, "wiki_name")))
+
+        monster_ids = self._ngram_index.search(keyword, limit=limit, offset=offset)
+        return [self._get_monster(monster_id) for monster_id in monster_ids]
+
+    def prefix_search_monster_names(self, prefix: str, limit: int = None,
+                                    use_wiki_name: bool = False) -> Dict[str, List[MonsterProperties]]:
+        """Search monsters by name prefix, grouped by name.
+
+        For example, the prefix `abyssal d` gives every `abyssal demon` monster,
+        in one group. The search uses a sorted case-folded name index, which is
+        built on the first call.
+
+        :param prefix: The name prefix to search for (case insensitive).
+        :param limit: The maximum number of names (groups) to return, or None for all names.
+        :param use_wiki_name: Whether to use the `wiki_name` instead of `name`.
+        :return: A dictionary of case-folded name to MonsterProperties objects (in monster ID order), in name order.
+        """
+        lookup_property = "wiki_name" if use_wiki_name else "name"
+        groups = self._name_index(lookup_property).prefix(prefix, limit=limit)
+        return {name: [self._get_monster(monster_id) for monster_id in monster_ids]
+                for name, monster_ids in groups.items()}
+
+    def filter_monsters(self, predicates: Dict[str, Any] = None, **kwargs) -> List[MonsterProperties]:
+        """Filter monsters by field values, and get a list of MonsterProperties objects.
+
+        Each predicate is a field name and the value to match. A list, tuple or set
+        value matches any one of the values. The predicates in `osrsbox.field_index`
+        match a range of values (Between), members of list fields such as
+        `slayer_masters`, `attributes`, `category` and `attack_type` (Contains),
+        or exclude matches (Not). Each field is indexed on first use, ranges use a
+        binary search of a sorted index, and a filter of several fields is a set
+        intersection instead of a scan of every monster.
+
+        For example, Duradel slayer monsters with a combat level of 100 to 200, that are not immune to venom:
+        ``all_db_monsters.filter_monsters(slayer_masters=Contains("duradel"), combat_level=Between(100, 200), immune_venom=False)``
+
+        :param predicates: A dictionary of field name to the value (or predicate) to match.
+        :param kwargs: Field names and the value (or predicate) to match.
+        :return: A list of MonsterProperties objects that match every predicate, in monster ID order.
+        :raises ValueError: A field cannot be indexed (for example, a list field without Contains).
+        """
+        predicates = dict(predicates or dict(), **kwargs)
+        return [self._get_monster(monster_id) for monster_id in self._field_indexes.query(predicates)]
+
+    def drop_index(self) -> DropIndex:
+        """Return the inverted drop index, of item ID and item name to the monsters that drop the item.
+
+        The index is built on the first call.
+
+        :return: A DropIndex of every loaded monster.
+        """
+        if self._drop_index is None:
+            self._drop_index = DropIndex(self.all_monsters)
+        return self._drop_index
+
+    def drop_table(self) -> DropTable:
+        """Return a columnar (NumPy) view of the drops of every monster.
+
+        The view is built on the first call, and requires NumPy to be installed.
+
+        :return: A DropTable of every loaded monster.
+        :raises ImportError: NumPy is not installed.
+        """
+        if self._drop_table is None:
+            self._drop_table = DropTable(self.all_monsters)
+        return self._drop_table
+
+    def drop_rarity(self) -> DropRarityTable:
+        """Return the drop rarity tables: the rarest drops, item rarity rankings and monster rarity summaries.
+
+        The precomputed artifact (`monsters-complete.rarity.json`) next to the
+        loaded JSON file, or in the user cache directory, is used when it was
+        built from the same JSON file. Otherwise, the tables are computed from the
+        loaded monsters, and for the packaged `monsters-complete.json` file, the
+        artifact is written to the user cache directory. Either way, the tables
+        are loaded on the first call.
+
+        :return: A DropRarityTable of every loaded monster.
+        """
+        if self._drop_rarity is None:
+            if self.path_to_json_file is not None:
+                self._drop_rarity = DropRarityTable.load(self.path_to_json_file)
+            if self._drop_rarity is None:
+                self._drop_rarity = DropRarityTable.from_monsters(self.all_monsters)
+                if self.path_to_json_file is not None and \
+                        Path(self.path_to_json_file).resolve() == PATH_TO_MONSTERS_COMPLETE.resolve():
+                    write_cached_drop_rarity(self.all_monsters, self.path_to_json_file)
+        return self._drop_rarity
+
+    def monsters_dropping(self, item: Union[int, str], rarest_first: bool = False) -> List[MonsterProperties]:
+        """Return the monsters that drop an item, most common drop first.
+
+        :param item: The item ID number, or the item name (case insensitive).
+        :param rarest_first: Sort by the rarest drop first, instead of the most common drop first.
+        :return: A list of MonsterProperties, a monster is listed once for each drop of the item.
+        """
+        if isinstance(item, str):
+            postings = self.drop_index().drops_by_item_name(item, rarest_first)
+        else:
+            postings = self.drop_index().drops_by_item_id(item, rarest_first)
+        return [self._get_monster(posting.monster_id) for posting in postings]
+
+    def _name_index(self, lookup_property: str) -> NameIndex:
+        """Return the case-folded name index for `name` or `wiki_name`, building it on first use."""
+        try:
+            return self._name_indexes[lookup_property]
+        except KeyError:
+            pass
+
+        name_index = NameIndex()
+        for monster_id, monster in self._iter_monster_records():
+            name_index.add(monster_id, (field_value(monster, lookup_property),))
+        self._name_indexes[lookup_property] = name_index
+        return name_index
+
+    def _iter_monster_records(self) -> Iterable[Tuple[int, Union[MonsterProperties, Dict]]]:
+        """Iterate (loop) over each monster ID and monster, in ID order, without building any monsters.
+
+        Monsters that are not built yet (lazy mode) are returned as their raw JSON record.
+        """
+        for monster_id in self._monster_ids:
+            monster = self.all_monsters_dict.get(monster_id)
+            if monster is None:
+                monster = self._raw_monsters.get(monster_id)
+            if monster is None:
+                monster = self._record_store[monster_id]
+            yield monster_id, monster
 
     def _load_monsters_from_directory(self, path_to_directory: Path) -> None:
         """Load monster database from a directory of JSON files (`monsters-json`).
@@ -102,7 +352,7 @@ class AllMonsters:
         # Loop through every monster in JSON file
         for json_file in json_files:
             with open(json_file) as input_json_file:
-                temp = json.load(input_json_file)
+                temp = codec.load(input_json_file)
 
             self._load_monster(temp)
 
@@ -112,23 +362,85 @@ class AllMonsters:
         :param path_to_json_file: The path to the `monster-complete.json` file.
         """
         with open(path_to_json_file) as input_json_file:
-            temp = json.load(input_json_file)
+            temp = codec.load(input_json_file)
+        self.path_to_json_file = path_to_json_file
 
         for entry in temp:
             self._load_monster(temp[entry])
 
+    def _load_monsters_from_record_store(self, path_to_data_file: Path) -> None:
+        """Load monster database from a record store (`monsters-complete.jsonl` and `monsters-complete.idx`).
+
+        :param path_to_data_file: The path to the `monsters-complete.jsonl` file.
+        """
+        store = record_store.RecordStore.open(path_to_data_file)
+        if self.lazy:
+            self._record_store = store
+            return
+
+        with store:
+            self._load_monsters_from_store(store)
+
+    def _load_monsters_from_store(self, store: record_store.RecordStore) -> None:
+        """Load monster database from an open record store, for example, in shared memory.
+
+        In lazy mode, each monster is read from the store on first access, and
+        the store must stay open. Otherwise, every monster is read and built now.
+
+        :param store: The open RecordStore.
+        """
+        if self.lazy:
+            self._record_store = store
+            return
+
+        for monster_id in store:
+            self._load_monster(store[monster_id])
+
     def _load_monster(self, monster_json: Dict) -> None:
-        """Convert the `monster_json` into a :class:`MonsterProperties` and store it.
+        """Store the `monster_json`, building the :class:`MonsterProperties` unless in lazy mode.
 
         :param monster_json: A dict from an open and loaded JSON file.
         :raises ValueError: Cannot populate monster.
         """
+        if self.lazy:
+            self._raw_monsters[monster_json["id"]] = monster_json
+            return
+
+        monster_def = self._build_monster(monster_json)
+        self.all_monsters_dict[monster_def.id] = monster_def
+
+    def _get_monster(self, monster_id: int) -> MonsterProperties:
+        """Return a built monster, building (and memoizing) it on first access in lazy mode.
+
+        :param monster_id: The monster ID number.
+        :return: The MonsterProperties object for the monster ID.
+        :raises KeyError: The monster ID is not loaded.
+        """
+        try:
+            return self.all_monsters_dict[monster_id]
+        except KeyError:
+            pass
+
+        if monster_id in self._raw_monsters:
+            monster_def = self._build_monster(self._raw_monsters[monster_id])
+            del self._raw_monsters[monster_id]
+        elif self._record_store is not None:
+            monster_def = self._build_monster(self._record_store[monster_id])
+        else:
+            raise KeyError(monster_id)
+
+        self.all_monsters_dict[monster_id] = monster_def
+        return monster_def
+
+    def _build_monster(self, monster_json: Dict) -> MonsterProperties:
+        """Convert the `monster_json` into a :class:`MonsterProperties`.
+
+        :param monster_json: A dict from an open and loaded JSON file.
+        :return: The populated MonsterProperties object.
+        :raises ValueError: Cannot populate monster.
+        """
         # Load the monster using the MonsterProperties class
         try:
-            monster_def = MonsterProperties.from_json(monster_json)
+            return self.monster_class.from_json(monster_json)
         except TypeError as e:
             raise ValueError("Error: Invalid JSON structure found, check supplied input. Exiting") from e
-
-        # Add monsters to list
-        self.all_monsters.append(monster_def)
-        self.all_monsters_dict[monster_def.id] = monster_def
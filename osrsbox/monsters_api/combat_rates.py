@@ -0,0 +1,221 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Batched (NumPy) kill rate and loot rate estimates, for player loadouts against
+monsters.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+from dataclasses import field
+from dataclasses import dataclass
+from typing import Dict
+from typing import List
+from typing import Iterable
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from osrsbox.items_api.item_properties import ItemProperties
+from osrsbox.items_api.equipment_columns import STAT_FIELDS
+from osrsbox.monsters_api.drop_calculator import DropTable
+from osrsbox.monsters_api.monster_properties import MonsterProperties
+
+# The length of one game tick, in seconds
+TICK_SECONDS = 0.6
+# The attack speed (in ticks) without a weapon
+UNARMED_ATTACK_SPEED = 4
+# Attack styles, and the player skill used to attack
+ATTACK_STYLES = {"stab": "attack", "slash": "attack", "crush": "attack", "ranged": "ranged", "magic": "magic"}
+
+
+@dataclass
+class CombatLoadout:
+    """This class defines the combined equipment bonuses of a player loadout.
+
+    :param stats: A dictionary of ItemEquipment stat to the total of every equipped item.
+    :param attack_speed: The weapon attack speed, in ticks.
+    """
+    stats: Dict[str, int] = field(default_factory=dict)
+    attack_speed: int = UNARMED_ATTACK_SPEED
+
+    @classmethod
+    def from_items(cls, items: Iterable[ItemProperties]) -> "CombatLoadout":
+        """Combine the equipment bonuses of equipped items.
+
+        :param items: The equipped ItemProperties objects, for example, the items of a Loadout.
+        :return: A CombatLoadout with the summed equipment stats, and the weapon attack speed.
+        """
+        stats = dict.fromkeys(STAT_FIELDS, 0)
+        attack_speed = UNARMED_ATTACK_SPEED
+        for item in items:
+            if item.equipment is not None:
+                for stat in STAT_FIELDS:
+                    stats[stat] += getattr(item.equipment, stat) or 0
+            if item.weapon is not None and item.weapon.attack_speed:
+                attack_speed = item.weapon.attack_speed
+        return cls(stats=stats, attack_speed=attack_speed)
+
+
+@dataclass
+class CombatRateResult:
+    """This class defines the estimates of loadouts (rows) against monsters (columns).
+
+    :param monster_ids: The monster ID of each column.
+    :param hit_chance: The chance of each attack hitting.
+    :param max_hit: The max hit of each loadout (one column, broadcast to every monster).
+    :param dps: The mean damage per second.
+    :param kill_seconds: The mean time to kill, including the overhead per kill, `inf` when the monster cannot be killed.
+    :param kills_per_hour: The mean number of kills per hour.
+    :param loot_per_hour: The mean loot value per hour, all zeros when no prices are supplied.
+    """
+    monster_ids: "np.ndarray"
+    hit_chance: "np.ndarray"
+    max_hit: "np.ndarray"
+    dps: "np.ndarray"
+    kill_seconds: "np.ndarray"
+    kills_per_hour: "np.ndarray"
+    loot_per_hour: "np.ndarray"
+
+
+class CombatRates:
+    """This class estimates kill rates and loot rates of loadouts against monsters.
+
+    The estimates use the standard accuracy and max hit formulas, without prayers,
+    potions, stance bonuses or set effects. Monsters with unknown hitpoints have no kill rate.
+
+    :param monsters: The monsters to estimate, for example, an AllMonsters object.
+    :param drop_table: The DropTable of the same monsters, built when first needed if not supplied.
+    :raises ImportError: NumPy is not installed.
+    """
+    def __init__(self, monsters: Iterable[MonsterProperties], drop_table: DropTable = None):
+        if np is None:
+            raise ImportError("Error: CombatRates requires NumPy, install osrsbox[columns]. Exiting.")
+
+        self.monsters: List[MonsterProperties] = list(monsters)
+        self.monster_ids = np.array([monster.id for monster in self.monsters], dtype=np.int32)
+        self.hitpoints = np.array([monster.hitpoints or 0 for monster in self.monsters], dtype=np.float64)
+        self.defence_level = np.array([monster.defence_level or 0 for monster in self.monsters], dtype=np.float64)
+        self.magic_level = np.array([monster.magic_level or 0 for monster in self.monsters], dtype=np.float64)
+        self.defence_bonuses = {style: np.array([getattr(monster, f"defence_{style}") or 0 for monster in self.monsters],
+                                                dtype=np.float64)
+                                for style in ATTACK_STYLES}
+        self._monster_positions = {monster_id: position for position, monster_id in enumerate(self.monster_ids.tolist())}
+        self._drop_table = drop_table
+        self._drop_columns = None
+
+    def __len__(self) -> int:
+        """Return the count of monsters (columns)."""
+        return len(self.monster_ids)
+
+    def evaluate(self, loadouts: Sequence[CombatLoadout], attack_style: str, levels: Dict[str, int] = None,
+                 monster_ids: Sequence[int] = None, prices: Dict[int, float] = None, spell_max_hit: int = 0,
+                 overhead_seconds: float = 0.0) -> CombatRateResult:
+        """Estimate the kill rates and loot rates of loadouts against monsters.
+
+        :param loadouts: The CombatLoadout objects to evaluate (rows).
+        :param attack_style: The attack style, one of `stab`, `slash`, `crush`, `ranged` or `magic`.
+        :param levels: A dictionary of skill to the player level, unlisted skills are level 99.
+        :param monster_ids: The monster IDs to evaluate (columns), or None for every monster.
+        :param prices: A dictionary of item ID to price, used for the loot value per hour.
+        :param spell_max_hit: The base max hit of the spell, for the magic attack style.
+        :param overhead_seconds: Time added to each kill, for example, for the monster to respawn.
+        :return: A CombatRateResult, each array has a row per loadout and a column per monster.
+        :raises ValueError: Unknown attack style, or unknown monster ID.
+        """
+        if attack_style not in ATTACK_STYLES:
+            raise ValueError(f"Error: Unknown attack style {attack_style}. Exiting.")
+        levels = levels or dict()
+        columns = self._columns(monster_ids)
+
+        # One row per loadout
+        attack_bonus = self._loadout_column(loadouts, f"attack_{attack_style}")
+        attack_interval = np.array([[loadout.attack_speed * TICK_SECONDS] for loadout in loadouts], dtype=np.float64)
+
+        # One column per monster
+        defence_bonus = self.defence_bonuses[attack_style][columns][np.newaxis, :]
+        if attack_style == "magic":
+            # Monsters defend against magic with their magic level
+            defence_level = self.magic_level[columns][np.newaxis, :]
+            magic_damage = self._loadout_column(loadouts, "magic_damage")
+            max_hit = np.floor(spell_max_hit * (1 + magic_damage / 100))
+        else:
+            defence_level = self.defence_level[columns][np.newaxis, :]
+            if attack_style == "ranged":
+                strength_level = levels.get("ranged", 99) + 8
+                strength_bonus = self._loadout_column(loadouts, "ranged_strength")
+            else:
+                strength_level = levels.get("strength", 99) + 8
+                strength_bonus = self._loadout_column(loadouts, "melee_strength")
+            max_hit = np.floor(0.5 + strength_level * (strength_bonus + 64) / 640)
+
+        attack_roll = (levels.get(ATTACK_STYLES[attack_style], 99) + 8) * (attack_bonus + 64)
+        defence_roll = (defence_level + 9) * (defence_bonus + 64)
+        hit_chance = np.where(attack_roll > defence_roll,
+                              1 - (defence_roll + 2) / (2 * (attack_roll + 1)),
+                              attack_roll / (2 * (defence_roll + 1)))
+
+        dps = hit_chance * (max_hit / 2) / attack_interval
+        hitpoints = self.hitpoints[columns][np.newaxis, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            kill_seconds = np.where((dps > 0) & (hitpoints > 0), hitpoints / dps + overhead_seconds, np.inf)
+        kills_per_hour = np.where(np.isfinite(kill_seconds), 3600 / kill_seconds, 0.0)
+
+        if prices:
+            loot_per_kill = self._loot_per_kill(prices)[columns][np.newaxis, :]
+        else:
+            loot_per_kill = np.zeros((1, len(columns)))
+
+        return CombatRateResult(monster_ids=self.monster_ids[columns],
+                                hit_chance=hit_chance,
+                                max_hit=max_hit,
+                                dps=dps,
+                                kill_seconds=kill_seconds,
+                                kills_per_hour=kills_per_hour,
+                                loot_per_hour=kills_per_hour * loot_per_kill)
+
+    def _columns(self, monster_ids: Sequence[int] = None) -> "np.ndarray":
+        """Return the array positions of monster IDs, or of every monster.
+
+        :raises ValueError: Unknown monster ID.
+        """
+        if monster_ids is None:
+            return np.arange(len(self.monster_ids))
+        try:
+            return np.array([self._monster_positions[monster_id] for monster_id in monster_ids], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"Error: Unknown monster ID {e.args[0]}. Exiting.") from e
+
+    @staticmethod
+    def _loadout_column(loadouts: Sequence[CombatLoadout], stat: str) -> "np.ndarray":
+        """Return one equipment stat of each loadout, as a column (one row per loadout)."""
+        return np.array([[loadout.stats.get(stat, 0)] for loadout in loadouts], dtype=np.float64)
+
+    def _loot_per_kill(self, prices: Dict[int, float]) -> "np.ndarray":
+        """Return the expected loot value per kill of each monster."""
+        if self._drop_table is None:
+            self._drop_table = DropTable(self.monsters)
+        if self._drop_columns is None:
+            # The drop table position of each monster, -1 for monsters that are not in the drop table
+            positions = {monster_id: position for position, monster_id in enumerate(self._drop_table.monster_ids.tolist())}
+            self._drop_columns = np.array([positions.get(monster_id, -1) for monster_id in self.monster_ids.tolist()], dtype=np.int64)
+        values = np.append(self._drop_table.expected_value_array(prices), 0.0)
+        return values[self._drop_columns]
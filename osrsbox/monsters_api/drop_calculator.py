@@ -0,0 +1,192 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+A vectorized (NumPy) expected loot and kills-to-drop calculator for the drop
+tables of every monster.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import re
+from functools import lru_cache
+from typing import Dict
+from typing import Tuple
+from typing import Union
+from typing import Iterable
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from osrsbox.monsters_api.drop_index import rarity_value
+from osrsbox.monsters_api.monster_properties import MonsterProperties
+
+# A quantity, or quantity range, for example, `5` or `1-3`
+QUANTITY_RANGE = re.compile(r"^(\d+)(?:-(\d+))?$")
+
+
+@lru_cache(maxsize=None)
+def parse_quantity(quantity: Optional[str]) -> Tuple[float, float, float]:
+    """Parse a drop quantity into a numeric range.
+
+    A quantity is a number (`5`), a range (`1-3`), or a comma separated list of
+    either (`1-3,5`), where each entry is equally likely. Any note, such as
+    `(noted)`, is ignored.
+
+    :param quantity: The drop quantity, or None when unknown.
+    :return: A tuple of the minimum, maximum and mean quantity, (1, 1, 1) when unknown.
+    :raises ValueError: The quantity cannot be parsed.
+    """
+    if quantity is None:
+        return 1.0, 1.0, 1.0
+
+    cleaned = re.sub(r"\(.*?\)|noted", "", str(quantity)).replace(" ", "")
+    ranges = list()
+    for entry in cleaned.split(","):
+        match = QUANTITY_RANGE.match(entry)
+        if match is None:
+            raise ValueError(f"Error: Cannot parse drop quantity {quantity}. Exiting.")
+        low = int(match.group(1))
+        high = int(match.group(2) or low)
+        ranges.append((min(low, high), max(low, high)))
+
+    means = [(low + high) / 2 for low, high in ranges]
+    return (float(min(low for low, _ in ranges)),
+            float(max(high for _, high in ranges)),
+            sum(means) / len(means))
+
+
+class DropTable:
+    """This class stores the drops of every monster as NumPy arrays.
+
+    Rows are grouped by monster, in the order the monsters are supplied. A drop
+    with an unknown rarity has a rarity of 0, and an unknown quantity is 1.
+
+    :param monsters: An iterable of MonsterProperties objects.
+    :raises ImportError: NumPy is not installed.
+    """
+    def __init__(self, monsters: Iterable[MonsterProperties]):
+        if np is None:
+            raise ImportError("Error: DropTable requires NumPy, install osrsbox[columns]. Exiting.")
+
+        monster_ids = list()
+        rows = list()
+        for monster in monsters:
+            position = len(monster_ids)
+            monster_ids.append(monster.id)
+            for drop in monster.drops or ():
+                rarity = rarity_value(drop.rarity)
+                rows.append((position,
+                             drop.id,
+                             0.0 if rarity is None else rarity,
+                             drop.rolls or 1) + parse_quantity(drop.quantity))
+
+        # One entry per monster
+        self.monster_ids = np.array(monster_ids, dtype=np.int32)
+        # One entry per drop
+        columns = np.array(rows, dtype=np.float64).reshape(len(rows), 7)
+        self.monster_rows = columns[:, 0].astype(np.int64)
+        self.item_ids = columns[:, 1].astype(np.int32)
+        self.rarity = columns[:, 2]
+        self.rolls = columns[:, 3].astype(np.int32)
+        self.quantity_min = columns[:, 4]
+        self.quantity_max = columns[:, 5]
+        self.quantity_mean = columns[:, 6]
+        self._monster_positions = {monster_id: position for position, monster_id in enumerate(monster_ids)}
+        # The distinct dropped item IDs, and the position of each drop in them, built on first use
+        self._unique_item_ids = None
+        self._item_positions = None
+
+    def __len__(self) -> int:
+        """Return the count of drops (rows)."""
+        return len(self.item_ids)
+
+    def drop_rows(self, monster_id: int) -> "np.ndarray":
+        """Return the rows of the drops of one monster.
+
+        :param monster_id: The monster ID number.
+        :return: A 1D array of row numbers.
+        :raises ValueError: The monster is not in the drop table.
+        """
+        try:
+            position = self._monster_positions[monster_id]
+        except KeyError as e:
+            raise ValueError(f"Error: Unknown monster ID {monster_id}. Exiting.") from e
+        return np.flatnonzero(self.monster_rows == position)
+
+    def expected_quantities(self) -> "np.ndarray":
+        """Return the expected quantity of each drop, per kill.
+
+        :return: A 1D float array, the rarity multiplied by the rolls and the mean quantity.
+        """
+        return self.rarity * self.rolls * self.quantity_mean
+
+    def expected_values(self, prices: Dict[int, float]) -> Dict[int, float]:
+        """Return the expected loot value of each monster, per kill.
+
+        :param prices: A dictionary of item ID to price, unlisted items have a price of 0.
+        :return: A dictionary of monster ID to the expected value per kill.
+        """
+        totals = self.expected_value_array(prices)
+        return {int(monster_id): float(total) for monster_id, total in zip(self.monster_ids, totals)}
+
+    def expected_value_array(self, prices: Dict[int, float]) -> "np.ndarray":
+        """Return the expected loot value of each monster, per kill, as an array.
+
+        :param prices: A dictionary of item ID to price, unlisted items have a price of 0.
+        :return: A 1D float array, in the same order as `monster_ids`.
+        """
+        # Look up each distinct item once, then expand to every drop
+        if self._unique_item_ids is None:
+            self._unique_item_ids, inverse = np.unique(self.item_ids, return_inverse=True)
+            self._item_positions = inverse.reshape(-1)
+        unique_prices = np.array([prices.get(item_id, 0.0) for item_id in self._unique_item_ids.tolist()], dtype=np.float64)
+        drop_values = self.expected_quantities() * unique_prices[self._item_positions]
+        return np.bincount(self.monster_rows, weights=drop_values, minlength=len(self.monster_ids))
+
+    def kill_probabilities(self, kills: Union[int, Iterable[int]]) -> "np.ndarray":
+        """Return the chance of at least one of each drop within a number of kills.
+
+        :param kills: A number of kills, or an iterable of numbers of kills.
+        :return: A 1D float array with one entry per drop, or a 2D array of drops by kill counts.
+        """
+        kill_counts = np.asarray(kills if isinstance(kills, int) else list(kills), dtype=np.float64)
+        # The chance of no drop in one kill, over every roll
+        miss = (1.0 - self.rarity) ** self.rolls
+        if kill_counts.ndim == 0:
+            return 1.0 - miss ** kill_counts
+        return 1.0 - miss[:, np.newaxis] ** kill_counts[np.newaxis, :]
+
+    def kills_for_probability(self, probability: float) -> "np.ndarray":
+        """Return the number of kills for at least one of each drop, with a given chance.
+
+        :param probability: The chance of at least one drop, for example, 0.9.
+        :return: A 1D float array of kill counts, `inf` for drops with a rarity of 0.
+        :raises ValueError: The probability is not between 0 and 1.
+        """
+        if not 0 < probability < 1:
+            raise ValueError("Error: Probability must be between 0 and 1. Exiting.")
+        with np.errstate(divide="ignore"):
+            log_miss = self.rolls * np.log1p(-np.minimum(self.rarity, 1.0))
+            kills = np.ceil(np.log1p(-probability) / log_miss)
+        # A guaranteed drop takes one kill, an impossible drop never happens
+        kills[self.rarity >= 1.0] = 1.0
+        kills[self.rarity <= 0.0] = np.inf
+        return kills
@@ -0,0 +1,141 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+An inverted index of monster drops, from an item ID or name to the monsters
+that drop it, most common drop first.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+from dataclasses import dataclass
+from typing import Dict
+from typing import List
+from typing import Union
+from typing import Iterable
+from typing import Optional
+
+from osrsbox.monsters_api.monster_properties import MonsterProperties
+
+
+@dataclass(frozen=True)
+class DropPosting:
+    """This class defines one drop of an item by one monster.
+
+    :param monster_id: The ID number of the monster.
+    :param rarity: The drop rarity, as a probability (for example, 1/128), or None when unknown.
+    :param quantity: The drop quantity, for example, `1` or `5-10`.
+    :param rolls: The number of rolls of the drop.
+    :param noted: Whether the item is dropped noted.
+    """
+    monster_id: int
+    rarity: Optional[float]
+    quantity: Optional[str]
+    rolls: Optional[int]
+    noted: Optional[bool]
+
+
+def rarity_value(rarity: Union[float, str, None]) -> Optional[float]:
+    """Convert a drop rarity to a probability.
+
+    :param rarity: The drop rarity, as a number, or a string such as `0.25` or `1/128`.
+    :return: The probability, or None when the rarity is unknown.
+    """
+    if rarity is None or rarity == "":
+        return None
+    if isinstance(rarity, str):
+        try:
+            if "/" in rarity:
+                numerator, denominator = rarity.split("/", 1)
+                return float(numerator) / float(denominator)
+            return float(rarity)
+        except (ValueError, ZeroDivisionError):
+            return None
+    return float(rarity)
+
+
+def _rarity_order(posting: DropPosting):
+    # Most common first, unknown rarity last, then by monster ID
+    if posting.rarity is None:
+        return (1, 0.0, posting.monster_id)
+    return (0, -posting.rarity, posting.monster_id)
+
+
+class DropIndex:
+    """This class maps items to the monsters that drop them.
+
+    :param monsters: The monsters to index.
+    """
+    def __init__(self, monsters: Iterable[MonsterProperties]):
+        self.postings_by_id: Dict[int, List[DropPosting]] = dict()
+        self.postings_by_name: Dict[str, List[DropPosting]] = dict()
+
+        for monster in monsters:
+            for drop in monster.drops or ():
+                posting = DropPosting(monster_id=monster.id,
+                                      rarity=rarity_value(drop.rarity),
+                                      quantity=drop.quantity,
+                                      rolls=drop.rolls,
+                                      noted=drop.noted)
+                self.postings_by_id.setdefault(drop.id, list()).append(posting)
+                if drop.name:
+                    self.postings_by_name.setdefault(drop.name.casefold(), list()).append(posting)
+
+        for postings in self.postings_by_id.values():
+            postings.sort(key=_rarity_order)
+        for postings in self.postings_by_name.values():
+            postings.sort(key=_rarity_order)
+
+    def __len__(self) -> int:
+        """Return the number of distinct item IDs that are dropped."""
+        return len(self.postings_by_id)
+
+    def drops_by_item_id(self, item_id: int, rarest_first: bool = False) -> List[DropPosting]:
+        """Return the drops of an item, by item ID.
+
+        :param item_id: The item ID number.
+        :param rarest_first: Sort by the rarest drop first, instead of the most common drop first.
+        :return: A list of DropPosting objects, empty when no monster drops the item.
+        """
+        return self._sorted(self.postings_by_id.get(item_id, ()), rarest_first)
+
+    def drops_by_item_name(self, item_name: str, rarest_first: bool = False) -> List[DropPosting]:
+        """Return the drops of an item, by item name (case insensitive).
+
+        :param item_name: The item name, for example, `Prayer potion(4)`.
+        :param rarest_first: Sort by the rarest drop first, instead of the most common drop first.
+        :return: A list of DropPosting objects, empty when no monster drops the item.
+        """
+        return self._sorted(self.postings_by_name.get(item_name.casefold(), ()), rarest_first)
+
+    def search_item_names(self, keyword: str) -> List[str]:
+        """Return the case-folded names of dropped items that contain a keyword.
+
+        :param keyword: The keyword to search for, for example, `prayer potion`.
+        :return: A sorted list of case-folded item names.
+        """
+        keyword = keyword.casefold()
+        return sorted(name for name in self.postings_by_name if keyword in name)
+
+    @staticmethod
+    def _sorted(postings: List[DropPosting], rarest_first: bool) -> List[DropPosting]:
+        if not rarest_first:
+            return list(postings)
+        # Unknown rarity stays last
+        known = sorted((posting for posting in postings if posting.rarity is not None),
+                       key=lambda posting: (posting.rarity, posting.monster_id))
+        return known + [posting for posting in postings if posting.rarity is None]
@@ -0,0 +1,288 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Precomputed drop rarity tables, written next to `docs/monsters-complete.json` as a
+derived artifact (`monsters-complete.rarity.json`).
+
+The artifact stores every drop with a known rarity, sorted rarest first, a
+global rarity ranking of every dropped item, and a per-monster table of the
+drops that are not guaranteed, rarest first, with the cumulative chance of at
+least one of them in a single kill. The artifact also stores a SHA-256 checksum
+of the JSON file it was built from, and is only used when the checksum matches,
+otherwise the tables are computed from the loaded monsters.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import bisect
+import warnings
+from pathlib import Path
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Iterable
+from typing import Optional
+
+from osrsbox import codec
+from osrsbox import __version__
+from osrsbox.snapshot import atomic_write
+from osrsbox.snapshot import file_checksum
+from osrsbox.snapshot import user_cache_dir
+from osrsbox.monsters_api.drop_index import rarity_value
+from osrsbox.monsters_api.monster_properties import MonsterProperties
+
+RARITY_SUFFIX = ".rarity.json"
+RARITY_FORMAT_VERSION = 2
+
+
+@dataclass
+class ItemRarity:
+    """This class defines the global rarity of one dropped item.
+
+    :param rank: The rank of the item, 1 for the item that is hardest to get (the rarest best drop rate).
+    :param best_rarity: The rarity of the most common drop of the item, from any monster.
+    :param rarest_rarity: The rarity of the rarest drop of the item, from any monster.
+    :param monsters: The number of monsters that drop the item.
+    """
+    rank: int
+    best_rarity: float
+    rarest_rarity: float
+    monsters: int
+
+
+@dataclass
+class MonsterRarity:
+    """This class defines the drop rarity summary of one monster.
+
+    :param total_rarity: The sum of the rarity of every drop that is not guaranteed.
+    :param any_drop: The chance of at least one drop that is not guaranteed, in a single kill.
+    :param rarest_rarity: The rarity of the rarest drop of the monster, or None when no drop has a known rarity.
+    :param drops: The drops that are not guaranteed, as (rarity, item ID, kill chance, cumulative chance) tuples,
+        rarest first. The kill chance includes the rolls of the drop, the cumulative chance is the chance of
+        at least one of this drop, or a rarer drop, in a single kill.
+    """
+    total_rarity: float
+    any_drop: float
+    rarest_rarity: Optional[float]
+    drops: List[Tuple[float, int, float, float]] = field(default_factory=list)
+
+    def drop_chance(self, rarity: float, kills: int = 1) -> float:
+        """Return the chance of at least one drop as rare as `rarity`, or rarer.
+
+        :param rarity: The most common drop rarity to include, for example, 1/512.
+        :param kills: The number of kills.
+        :return: The chance, 0 when the monster has no drop that rare.
+        """
+        index = bisect.bisect_right([drop[0] for drop in self.drops], rarity)
+        if index == 0 or kills <= 0:
+            return 0.0
+        return 1.0 - (1.0 - self.drops[index - 1][3]) ** kills
+
+
+def rarity_path_for(path_to_json_file: Path) -> Path:
+    """Return the drop rarity artifact path for a `monsters-complete.json` file.
+
+    :param path_to_json_file: The path to the JSON file.
+    :return: The path to the artifact, in the same directory.
+    """
+    return Path(path_to_json_file).with_suffix(RARITY_SUFFIX)
+
+
+def cached_rarity_path(path_to_json_file: Path) -> Path:
+    """Return the drop rarity artifact path, in the user cache directory, for a `monsters-complete.json` file.
+
+    :param path_to_json_file: The path to the JSON file.
+    :return: The path to the artifact, named by the JSON file and the osrsbox version.
+    """
+    return user_cache_dir() / f"{Path(path_to_json_file).stem}-{__version__}{RARITY_SUFFIX}"
+
+
+def build_drop_rarity(monsters: Iterable[MonsterProperties]) -> Dict[str, Any]:
+    """Build the drop rarity tables of every monster.
+
+    :param monsters: The monsters, for example, an AllMonsters object.
+    :return: A dictionary of the tables, in the artifact JSON format.
+    """
+    drops = list()
+    item_rarities: Dict[int, List[float]] = dict()
+    monster_rarities = dict()
+    for monster in monsters:
+        total_rarity = 0.0
+        rarest = None
+        chances = list()
+        for drop in monster.drops or ():
+            rarity = rarity_value(drop.rarity)
+            if rarity is None:
+                continue
+            drops.append((rarity, drop.id, monster.id))
+            item_rarities.setdefault(drop.id, list()).append(rarity)
+            rarest = rarity if rarest is None else min(rarest, rarity)
+            if rarity < 1.0:
+                total_rarity += rarity
+                chances.append((rarity, drop.id, 1.0 - (1.0 - rarity) ** (drop.rolls or 1)))
+
+        # The cumulative chance of at least one drop, adding the drops rarest first
+        miss = 1.0
+        monster_drops = list()
+        for rarity, item_id, chance in sorted(chances):
+            miss *= 1.0 - chance
+            monster_drops.append([rarity, item_id, chance, 1.0 - miss])
+        monster_rarities[str(monster.id)] = [total_rarity, 1.0 - miss, rarest, monster_drops]
+
+    drops.sort()
+    # Hardest items first: the lowest best drop rate, then the lowest rarest drop rate
+    ranking = sorted(item_rarities.items(), key=lambda entry: (max(entry[1]), min(entry[1]), entry[0]))
+    items = {str(item_id): [rank, max(rarities), min(rarities), len(rarities)]
+             for rank, (item_id, rarities) in enumerate(ranking, start=1)}
+
+    return {"format_version": RARITY_FORMAT_VERSION,
+            "checksum": None,
+            "drops": [list(drop) for drop in drops],
+            "items": items,
+            "monsters": monster_rarities}
+
+
+def write_drop_rarity(monsters: Iterable[MonsterProperties], path_to_json_file: Path, path_to_artifact: Path = None) -> Path:
+    """Write the drop rarity artifact of the monsters loaded from a JSON file.
+
+    :param monsters: The monsters loaded from the JSON file.
+    :param path_to_json_file: The `monsters-complete.json` file the monsters were loaded from.
+    :param path_to_artifact: The output path, defaults to the JSON file with a `.rarity.json` suffix.
+    :return: The path to the written artifact.
+    """
+    if path_to_artifact is None:
+        path_to_artifact = rarity_path_for(path_to_json_file)
+
+    tables = build_drop_rarity(monsters)
+    tables["checksum"] = file_checksum(path_to_json_file).hex()
+    with atomic_write(path_to_artifact, "w") as f:
+        codec.dump(tables, f)
+    return path_to_artifact
+
+
+def write_cached_drop_rarity(monsters: Iterable[MonsterProperties], path_to_json_file: Path) -> None:
+    """Write the drop rarity artifact of the packaged `monsters-complete.json` file to the user cache directory.
+
+    An artifact that cannot be written is reported with a warning.
+
+    :param monsters: The monsters loaded from the JSON file.
+    :param path_to_json_file: The path to the packaged `monsters-complete.json` file.
+    """
+    path_to_artifact = cached_rarity_path(path_to_json_file)
+    try:
+        path_to_artifact.parent.mkdir(parents=True, exist_ok=True)
+        write_drop_rarity(monsters, path_to_json_file, path_to_artifact)
+    except OSError as e:
+        warnings.warn(f"Cannot write the drop rarity tables to {path_to_artifact}: {e}")
+
+
+class DropRarityTable:
+    """This class holds the precomputed drop rarity tables.
+
+    :param tables: A dictionary of the tables, in the artifact JSON format.
+    """
+    def __init__(self, tables: Dict[str, Any]):
+        self.drops: List[Tuple[float, int, int]] = [tuple(drop) for drop in tables["drops"]]
+        self.items: Dict[int, ItemRarity] = {int(item_id): ItemRarity(*values) for item_id, values in tables["items"].items()}
+        self.monsters: Dict[int, MonsterRarity] = {
+            int(monster_id): MonsterRarity(total_rarity, any_drop, rarest_rarity, [tuple(drop) for drop in drops])
+            for monster_id, (total_rarity, any_drop, rarest_rarity, drops) in tables["monsters"].items()}
+        self._ranking: Optional[List[int]] = None
+
+    @classmethod
+    def from_monsters(cls, monsters: Iterable[MonsterProperties]) -> "DropRarityTable":
+        """Compute the drop rarity tables from loaded monsters.
+
+        :param monsters: The monsters, for example, an AllMonsters object.
+        :return: A DropRarityTable.
+        """
+        return cls(build_drop_rarity(monsters))
+
+    @classmethod
+    def load(cls, path_to_json_file: Path, path_to_artifact: Path = None) -> Optional["DropRarityTable"]:
+        """Load the drop rarity artifact of a JSON file, if the artifact is fresh.
+
+        :param path_to_json_file: The `monsters-complete.json` file the artifact must match.
+        :param path_to_artifact: The artifact path, defaults to the JSON file with a `.rarity.json` suffix,
+            then the artifact in the user cache directory.
+        :return: A DropRarityTable, or None when no fresh artifact is available.
+        """
+        if path_to_artifact is None:
+            return cls._load_artifact(path_to_json_file, rarity_path_for(path_to_json_file)) or \
+                cls._load_artifact(path_to_json_file, cached_rarity_path(path_to_json_file))
+        return cls._load_artifact(path_to_json_file, path_to_artifact)
+
+    @classmethod
+    def _load_artifact(cls, path_to_json_file: Path, path_to_artifact: Path) -> Optional["DropRarityTable"]:
+        """Load one drop rarity artifact, if it exists and matches the JSON file.
+
+        :param path_to_json_file: The `monsters-complete.json` file the artifact must match.
+        :param path_to_artifact: The artifact path.
+        :return: A DropRarityTable, or None when the artifact is missing or out of date.
+        """
+        if not Path(path_to_artifact).is_file():
+            return None
+
+        try:
+            with open(path_to_artifact, "rb") as f:
+                tables = codec.load(f)
+            if tables.get("format_version") != RARITY_FORMAT_VERSION:
+                return None
+            if tables.get("checksum") != file_checksum(path_to_json_file).hex():
+                return None
+            return cls(tables)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # A truncated or incompatible artifact, compute the tables instead
+            return None
+
+    def rarest_drops(self, limit: int = 10) -> List[Tuple[float, int, int]]:
+        """Return the rarest drops of every monster.
+
+        :param limit: The maximum number of drops to return.
+        :return: A list of (rarity, item ID, monster ID) tuples, rarest first.
+        """
+        return self.drops[:max(limit, 0)]
+
+    def rarest_items(self, limit: int = 10) -> List[int]:
+        """Return the items that are hardest to get, the items with the rarest best drop rate.
+
+        :param limit: The maximum number of item IDs to return.
+        :return: A list of item IDs, hardest first.
+        """
+        if self._ranking is None:
+            self._ranking = sorted(self.items, key=lambda item_id: self.items[item_id].rank)
+        return self._ranking[:max(limit, 0)]
+
+    def item_rarity(self, item_id: int) -> Optional[ItemRarity]:
+        """Return the global rarity of a dropped item.
+
+        :param item_id: The item ID number.
+        :return: An ItemRarity, or None when no monster drops the item with a known rarity.
+        """
+        return self.items.get(item_id)
+
+    def monster_rarity(self, monster_id: int) -> Optional[MonsterRarity]:
+        """Return the drop rarity summary of a monster.
+
+        :param monster_id: The monster ID number.
+        :return: A MonsterRarity, or None for an unknown monster.
+        """
+        return self.monsters.get(monster_id)
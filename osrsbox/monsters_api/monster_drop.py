@@ -20,6 +20,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 from dataclasses import dataclass, asdict
 from typing import Dict
+from typing import Tuple
+from typing import ClassVar
+
+from osrsbox.slotted import slotted_dataclass
 
 
 @dataclass
@@ -38,9 +42,16 @@ class MonsterDrop:
     rarity: str = None
     rolls: int = None
 
+    # Properties with strings that repeat across many drops, and are interned
+    interned_properties: ClassVar[Tuple[str, ...]] = ("name", "quantity")
+
     def construct_json(self) -> Dict:
         """Construct dictionary/JSON of drop entry in a list for exporting or printing.
 
         :return json_out: A dictionary of a single drop instance.
         """
         return asdict(self)
+
+
+# A compact variant that uses __slots__, with the same properties
+SlottedMonsterDrop = slotted_dataclass(MonsterDrop)
@@ -19,14 +19,19 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
 
-import json
 from typing import Dict
 from typing import List
+from typing import Tuple
+from typing import ClassVar
 from pathlib import Path
 from dataclasses import asdict
 from dataclasses import dataclass
 
+from osrsbox import codec
+from osrsbox.slotted import intern_strings
+from osrsbox.slotted import slotted_dataclass
 from osrsbox.monsters_api.monster_drop import MonsterDrop
+from osrsbox.monsters_api.monster_drop import SlottedMonsterDrop
 
 
 @dataclass
@@ -82,13 +87,23 @@ class MonsterProperties:
     defence_ranged: int = None
     drops: List = None
 
+    # The class of each monster drop
+    drop_class: ClassVar[type] = MonsterDrop
+    # Properties with strings that repeat across many monsters, and are interned
+    interned_properties: ClassVar[Tuple[str, ...]] = ("last_updated", "release_date", "attack_type",
+                                                      "attributes", "category", "slayer_masters")
+
     @classmethod
     def from_json(cls, json_dict: Dict) -> List[MonsterDrop]:
         """Convert the list under the 'drops' key into actual :class:`MonsterDrop`"""
+        # Share one copy of strings that repeat across many monsters
+        intern_strings(json_dict, cls.interned_properties)
+
         monster_drops = list()
         if json_dict.get("drops"):
             for drop in json_dict["drops"]:
-                monster_drops.append(MonsterDrop(**drop))
+                intern_strings(drop, cls.drop_class.interned_properties)
+                monster_drops.append(cls.drop_class(**drop))
 
         json_dict["drops"] = monster_drops
 
@@ -112,6 +127,10 @@ class MonsterProperties:
         out_file_path = Path(export_path / out_file_name)
         with open(out_file_path, "w", newline="\n") as out_file:
             if pretty:
-                json.dump(json_out, out_file, indent=4)
+                codec.dump(json_out, out_file, indent=4)
             else:
-                json.dump(json_out, out_file)
+                codec.dump(json_out, out_file)
+
+
+# A compact variant that uses __slots__, with the same properties
+SlottedMonsterProperties = slotted_dataclass(MonsterProperties, drop_class=SlottedMonsterDrop)
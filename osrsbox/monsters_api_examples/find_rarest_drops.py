@@ -23,32 +23,23 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
 
-from collections import defaultdict
-
 from osrsbox import monsters_api
+from osrsbox.monsters_api.drop_index import rarity_value
 
 
 if __name__ == "__main__":
-    # Load all monsters
+    # Load all monsters, and the precomputed drop rarity tables (sorted rarest first)
     all_db_monsters = monsters_api.load()
+    drop_rarity = all_db_monsters.drop_rarity()
 
-    rarest_drop = defaultdict(list)
-    rarest_drop_rate_float = 1.0
-    rarest_drop_rate_fraction = None
-
-    # Loop through all monsters in the database and print the monster name for each monster
-    for monster in all_db_monsters:
-        if monster.drops:
-            for drop in monster.drops:
-                if not drop.rarity:
-                    continue
-                drop_rate = eval(drop.rarity)
-                rarest_drop[drop_rate].append(monster)
-                if drop_rate < rarest_drop_rate_float:
-                    rarest_drop_rate_float = drop_rate
-                    rarest_drop_rate_fraction = drop.rarity
+    rarest_drop_rate_float, item_id, monster_id = drop_rarity.rarest_drops(limit=1)[0]
 
+    # The rarity as stored in the database, with the computed rate next to it
+    rarest_drop_rate_fraction = next(drop.rarity for drop in all_db_monsters[monster_id].drops
+                                     if drop.id == item_id and rarity_value(drop.rarity) == rarest_drop_rate_float)
     print("%f" % rarest_drop_rate_float)
-    print(rarest_drop_rate_fraction)
-    for monster in rarest_drop[rarest_drop_rate_float]:
-        print(monster.name)
+    print(f"{rarest_drop_rate_fraction} (1 in {1 / rarest_drop_rate_float:g})")
+    for rarity, item_id, monster_id in drop_rarity.drops:
+        if rarity > rarest_drop_rate_float:
+            break
+        print(all_db_monsters[monster_id].name)
@@ -24,6 +24,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from osrsbox import monsters_api
+from osrsbox.field_index import Contains
 
 
 slayer_masters_assignments = {
@@ -41,12 +42,10 @@ if __name__ == "__main__":
     # Load all monsters
     all_db_monsters = monsters_api.load()
 
-    # Loop through all monsters in the database
-    monster_set = set()
-    for monster in all_db_monsters:
-        if monster.slayer_monster:
-            for slayer_master in monster.slayer_masters:
-                slayer_masters_assignments[slayer_master].add(monster.name)
+    # Filter the slayer monsters assigned by each slayer master, using the slayer_masters field index
+    for slayer_master, assignments in slayer_masters_assignments.items():
+        for monster in all_db_monsters.filter_monsters(slayer_monster=True, slayer_masters=Contains(slayer_master)):
+            assignments.add(monster.name)
 
     for slayer_master, assignments in slayer_masters_assignments.items():
         print(slayer_master)
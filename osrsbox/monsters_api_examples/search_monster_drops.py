@@ -32,11 +32,9 @@ if __name__ == "__main__":
 
     item_search_keyword = "prayer potion"
 
-    # Loop through all monsters in the database and search for items by name
+    # Search the names of dropped items, then look up the monsters in the drop index
     print("The following monsters drop prayer potions!!!")
     print(f"{'ID':<10} {'Name':<25} {'Wiki Name':<25}")
-    for monster in all_db_monsters:
-        if monster.drops:
-            for drop in monster.drops:
-                if item_search_keyword in drop.name.lower():
-                    print(f"{monster.id:<10} {monster.name:<25} {monster.wiki_name:<25}")
+    for item_name in all_db_monsters.drop_index().search_item_names(item_search_keyword):
+        for monster in all_db_monsters.monsters_dropping(item_name):
+            print(f"{monster.id:<10} {monster.name:<25} {monster.wiki_name:<25}")
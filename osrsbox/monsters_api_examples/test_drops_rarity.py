@@ -29,13 +29,10 @@ if __name__ == "__main__":
     # Load all monsters
     all_db_monsters = monsters_api.load()
 
-    # Loop through all monsters in the database and search for items by name
+    # Print the precomputed total rarity of the drops that are not guaranteed
+    drop_rarity = all_db_monsters.drop_rarity()
     print(f"{'ID':<10} {'Name':<25} {'Rarity Total':<25}")
     for monster in all_db_monsters:
         if monster.drops:
-            total_drop_rarity = 0
-            for drop in monster.drops:
-                if drop.rarity == 1.0:
-                    continue
-                total_drop_rarity += drop.rarity
+            total_drop_rarity = drop_rarity.monster_rarity(monster.id).total_rarity
             print(f"{monster.id:<10} {monster.name:<25} {total_drop_rarity:<25}")
@@ -0,0 +1,442 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Name indexes for fast substring and fuzzy (misspelt) name search.
+
+The NgramIndex is an n-gram (trigram by default) inverted index for substring search.
+The NameIndex groups entries by case-folded name, for exact and prefix lookup.
+
+Every indexed entry has an ID and one or more names (for example, the `name`
+and `wiki_name` of an item). Names are converted to lower case once, when the
+index is built. A search keyword is split into n-grams, the posting lists of
+those n-grams are intersected, and only the remaining candidates are checked
+with a real substring test. Results are always returned in ID order.
+
+The FuzzyNameIndex ranks names by token edit distance and prefix overlap,
+using a deletion neighbourhood index of name tokens to avoid scoring every entry.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import re
+import heapq
+from array import array
+from itertools import islice
+from bisect import bisect_left
+from bisect import bisect_right
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Iterable
+from typing import Optional
+
+# Separates the names of one entry, so a single substring test covers every name
+NAME_SEPARATOR = "\x00"
+
+# Word tokens used for fuzzy name matching
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Query tokens matching more entries than this only add candidates when no
+# other query token is more specific
+MAX_TOKEN_CANDIDATES = 500
+
+
+class NgramIndex:
+    """This class is an inverted index of name n-grams to entry IDs.
+
+    Entries must be added in increasing ID order, so that every posting list
+    is sorted without an extra sort step.
+
+    :param n: The n-gram length.
+    """
+    def __init__(self, n: int = 3):
+        self.n = n
+        self.ids: List[int] = list()
+        self.names: Dict[int, str] = dict()
+        self.postings: Dict[str, array] = dict()
+
+    def __len__(self) -> int:
+        """Return the count of indexed entries."""
+        return len(self.ids)
+
+    def add(self, entry_id: int, names: Iterable[Optional[str]]) -> None:
+        """Add an entry and its names to the index.
+
+        :param entry_id: The entry ID, larger than every ID added before it.
+        :param names: The names of the entry, None values are skipped.
+        """
+        lower_names = [name.lower() for name in names if name is not None]
+        self.ids.append(entry_id)
+        self.names[entry_id] = NAME_SEPARATOR.join(lower_names)
+
+        grams = set()
+        for name in lower_names:
+            for start in range(len(name) - self.n + 1):
+                grams.add(name[start:start + self.n])
+
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("i")
+            posting.append(entry_id)
+
+    def candidates(self, keyword: str) -> Iterable[int]:
+        """Return the IDs of entries that contain every n-gram of a lower case keyword.
+
+        Keywords shorter than the n-gram length return every ID.
+
+        :param keyword: The lower case keyword.
+        :return: The candidate IDs, in ID order.
+        """
+        if len(keyword) < self.n:
+            return self.ids
+
+        grams = {keyword[start:start + self.n] for start in range(len(keyword) - self.n + 1)}
+        postings = list()
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return list()
+            postings.append(posting)
+
+        # Start from the shortest posting list, then binary search the others
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = [entry_id for entry_id in candidates if _sorted_contains(posting, entry_id)]
+            if not candidates:
+                break
+
+        return candidates
+
+    def search(self, keyword: str, limit: int = None, offset: int = 0) -> List[int]:
+        """Search for entries with a name that contains the keyword (case insensitive).
+
+        :param keyword: The keyword to search for.
+        :param limit: The maximum number of IDs to return, or None for no limit.
+        :param offset: The number of matching IDs to skip before collecting results.
+        :return: The matching IDs, in ID order.
+        """
+        keyword = keyword.lower()
+        if limit is not None and limit <= 0:
+            return list()
+
+        # Verify the candidates, matching n-grams do not guarantee a substring match
+        names = self.names
+        if NAME_SEPARATOR in keyword:
+            matches = (entry_id for entry_id in self.candidates(keyword)
+                       if any(keyword in name for name in names[entry_id].split(NAME_SEPARATOR)))
+        else:
+            matches = (entry_id for entry_id in self.candidates(keyword) if keyword in names[entry_id])
+
+        if limit is None:
+            return list(islice(matches, offset, None))
+        return list(islice(matches, offset, offset + limit))
+
+
+class NameIndex:
+    """This class groups entry IDs by case-folded name, for exact and prefix lookup.
+
+    Entries must be added in increasing ID order, so that every group is in ID order.
+    """
+    def __init__(self):
+        self.groups: Dict[str, List[int]] = dict()
+        self._sorted_names: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        """Return the count of distinct names."""
+        return len(self.groups)
+
+    def add(self, entry_id: int, names: Iterable[Optional[str]]) -> None:
+        """Add an entry and its names to the index.
+
+        :param entry_id: The entry ID, larger than every ID added before it.
+        :param names: The names of the entry, None and empty values are skipped.
+        """
+        for name in {name.casefold() for name in names if name}:
+            self.groups.setdefault(name, list()).append(entry_id)
+        self._sorted_names = None
+
+    def exact(self, name: str) -> List[int]:
+        """Return the IDs of entries with a name (case insensitive).
+
+        :param name: The name to look up.
+        :return: The matching IDs, in ID order.
+        """
+        return list(self.groups.get(name.casefold(), ()))
+
+    def prefix(self, prefix: str, limit: int = None) -> Dict[str, List[int]]:
+        """Return the entries with a name that starts with a prefix (case insensitive), grouped by name.
+
+        :param prefix: The prefix to search for.
+        :param limit: The maximum number of names to return, or None for no limit.
+        :return: A dictionary of case-folded name to IDs (in ID order), in name order.
+        """
+        if self._sorted_names is None:
+            self._sorted_names = sorted(self.groups)
+        prefix = prefix.casefold()
+        names = self._sorted_names
+        start = bisect_left(names, prefix)
+        # Every name with the prefix sorts before the prefix followed by the highest code point
+        end = bisect_right(names, prefix + chr(0x10FFFF), lo=start)
+        if limit is not None:
+            end = min(end, start + max(limit, 0))
+        return {name: list(self.groups[name]) for name in names[start:end]}
+
+
+def _sorted_contains(values: array, value: int) -> bool:
+    position = bisect_left(values, value)
+    return position < len(values) and values[position] == value
+
+
+def levenshtein(a: str, b: str, max_distance: int = None) -> int:
+    """Calculate the edit distance between two strings.
+
+    :param a: The first string.
+    :param b: The second string.
+    :param max_distance: Stop early when the distance is larger than this value.
+    :return: The edit distance, or `max_distance + 1` when the early stop is used.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+
+    return previous[-1]
+
+
+def _deletions(word: str, max_distance: int) -> set:
+    """Return every string made by deleting up to `max_distance` characters from a word."""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        results.update(frontier)
+    return results
+
+
+class DeletionIndex:
+    """This class finds words within a small edit distance, using deletion neighbourhoods.
+
+    Every word is stored under each string that can be made by deleting up to
+    `max_distance` characters from it. Two words within that edit distance always
+    share one of these strings, so a search only has to generate the deletions of
+    the search word, look them up, and verify the few candidates that are found.
+
+    :param max_distance: The largest edit distance that can be searched for.
+    """
+    def __init__(self, words: Iterable[str] = (), max_distance: int = 2):
+        self.max_distance = max_distance
+        self.variants: Dict[str, List[str]] = dict()
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        """Add a word to the index."""
+        for variant in _deletions(word, self.max_distance):
+            self.variants.setdefault(variant, list()).append(word)
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[str, int]]:
+        """Find every word within an edit distance of the search word.
+
+        :param word: The search word.
+        :param max_distance: The maximum edit distance, up to the index `max_distance`.
+        :return: A list of (word, distance) tuples.
+        """
+        max_distance = min(max_distance, self.max_distance)
+        candidates = set()
+        for variant in _deletions(word, max_distance):
+            candidates.update(self.variants.get(variant, ()))
+
+        results = list()
+        for candidate in candidates:
+            distance = levenshtein(word, candidate, max_distance)
+            if distance <= max_distance:
+                results.append((candidate, distance))
+        return results
+
+
+class FuzzyNameIndex:
+    """This class ranks entries by how closely their names match a (misspelt) query.
+
+    Names are split into lower case word tokens. Each query token is matched
+    against the token vocabulary using exact matches, an edit distance search
+    (see :class:`DeletionIndex`), and shared prefixes (so partially typed words still match). Only
+    entries that contain a matched token are scored, using the average token
+    similarity plus small bonuses for full name and prefix matches.
+    """
+    def __init__(self):
+        self.entry_names: Dict[int, List[Tuple[str, Tuple[str, ...]]]] = dict()
+        self.token_postings: Dict[str, List[int]] = dict()
+        self._vocabulary: List[str] = list()
+        self._misspellings: Optional[DeletionIndex] = None
+
+    def __len__(self) -> int:
+        """Return the count of indexed entries."""
+        return len(self.entry_names)
+
+    def add(self, entry_id: int, names: Iterable[Optional[str]]) -> None:
+        """Add an entry and its names to the index.
+
+        :param entry_id: The entry ID.
+        :param names: The names of the entry, None and duplicate names are skipped.
+        """
+        entry_names = list()
+        for name in names:
+            if not name:
+                continue
+            name = name.lower()
+            if any(name == known for known, _ in entry_names):
+                continue
+            tokens = tuple(tokenize(name))
+            entry_names.append((name, tokens))
+            for token in set(tokens):
+                self.token_postings.setdefault(token, list()).append(entry_id)
+
+        self.entry_names[entry_id] = entry_names
+        self._misspellings = None
+
+    def _build(self) -> None:
+        self._vocabulary = sorted(self.token_postings)
+        self._misspellings = DeletionIndex(self._vocabulary)
+
+    def match_tokens(self, query_token: str, partial: bool = False) -> Dict[str, float]:
+        """Find the vocabulary tokens similar to one query token.
+
+        :param query_token: A lower case query token.
+        :param partial: Whether the token may be partially typed (the last query token).
+        :return: A dictionary of matched token to a similarity between 0 and 1.
+        """
+        if self._misspellings is None:
+            self._build()
+
+        matches = dict()
+        if query_token in self.token_postings:
+            matches[query_token] = 1.0
+
+        # Misspellings: allow more edits for longer tokens
+        max_distance = 0 if len(query_token) <= 2 else 1 if len(query_token) <= 4 else 2
+        if max_distance:
+            for token, distance in self._misspellings.search(query_token, max_distance):
+                similarity = 1.0 - distance / max(len(token), len(query_token))
+                matches[token] = max(matches.get(token, 0.0), similarity)
+
+        # Prefixes: shortened or misspelt endings of longer tokens ("scimmy"), and
+        # partially typed or abbreviated tokens ("scim", "d")
+        if len(query_token) >= 5:
+            prefix = query_token[:len(query_token) - 2]
+        elif partial or len(query_token) <= 2:
+            prefix = query_token
+        else:
+            return matches
+
+        start = bisect_left(self._vocabulary, prefix)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            if token.startswith(query_token):
+                similarity = 0.5 + 0.5 * len(query_token) / len(token)
+            else:
+                similarity = 0.9 * len(_common_prefix(token, query_token)) / max(len(token), len(query_token))
+            matches[token] = max(matches.get(token, 0.0), similarity)
+
+        return matches
+
+    def search(self, query: str, limit: int = 10, exclude: Optional[Iterable[int]] = None) -> List[Tuple[float, int]]:
+        """Rank the entries that best match a query.
+
+        :param query: The (possibly misspelt) query.
+        :param limit: The maximum number of results to return.
+        :param exclude: Entry IDs to leave out of the results.
+        :return: A list of (score, entry ID) tuples, best match first.
+        """
+        query = query.lower().strip()
+        query_tokens = tokenize(query)
+        if not query_tokens or limit <= 0:
+            return list()
+
+        # The last token may still be being typed
+        token_matches = [self.match_tokens(query_token, partial=position == len(query_tokens) - 1)
+                         for position, query_token in enumerate(query_tokens)]
+
+        # Collect candidate entries for each query token, common tokens (for
+        # example "s" or "1") are only used when no query token is more specific
+        token_sizes = [(sum(len(self.token_postings[token]) for token in matches), position)
+                       for position, matches in enumerate(token_matches)]
+        token_sizes.sort()
+
+        candidates = set()
+        for size, position in token_sizes:
+            if candidates and size > MAX_TOKEN_CANDIDATES:
+                break
+            for token in token_matches[position]:
+                candidates.update(self.token_postings[token])
+        if exclude:
+            candidates.difference_update(exclude)
+
+        scored = list()
+        for entry_id in candidates:
+            score = max(self._score(query, query_tokens, token_matches, name, tokens)
+                        for name, tokens in self.entry_names[entry_id])
+            scored.append((score, entry_id))
+
+        # Best score first, then lowest entry ID first
+        scored = heapq.nsmallest(limit, scored, key=lambda result: (-result[0], result[1]))
+        return scored
+
+    @staticmethod
+    def _score(query: str, query_tokens: List[str], token_matches: List[Dict[str, float]],
+               name: str, tokens: Tuple[str, ...]) -> float:
+        if name == query:
+            return 2.0
+
+        similarity = 0.0
+        for matches in token_matches:
+            similarity += max((matches.get(token, 0.0) for token in tokens), default=0.0)
+        score = similarity / len(query_tokens)
+
+        if name.startswith(query):
+            score += 0.5
+        # Prefer names without extra unmatched words
+        score -= 0.05 * max(0, len(tokens) - len(query_tokens))
+        return score
+
+
+def tokenize(name: str) -> List[str]:
+    """Split a lower case name into word tokens (letters and numbers)."""
+    return TOKEN_RE.findall(name)
+
+
+def _common_prefix(a: str, b: str) -> str:
+    length = 0
+    for char_a, char_b in zip(a, b):
+        if char_a != char_b:
+            break
+        length += 1
+    return a[:length]
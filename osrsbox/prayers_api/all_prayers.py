@@ -18,10 +18,10 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
-import json
 from pathlib import Path
 from typing import Dict, List, Union, Generator
 
+from osrsbox import codec
 from osrsbox.prayers_api.prayer_properties import PrayerProperties
 
 PATH_TO_PRAYERS_COMPLETE_JSON = Path(__file__).absolute().parent / ".." / ".." / "docs" / "prayers-complete.json"
@@ -112,7 +112,7 @@ class AllPrayers:
         # Loop through every prayer in JSON file
         for json_file in json_files:
             with open(json_file) as input_json_file:
-                temp = json.load(input_json_file)
+                temp = codec.load(input_json_file)
 
             self._load_prayer(temp)
 
@@ -122,7 +122,7 @@ class AllPrayers:
         :param path_to_json_file: The path to the `prayers-complete.json` file.
         """
         with open(path_to_json_file) as input_json_file:
-            temp = json.load(input_json_file)
+            temp = codec.load(input_json_file)
 
         for entry in temp:
             self._load_prayer(temp[entry])
@@ -0,0 +1,273 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+A memory-mapped, offset indexed store of JSON records (items or monsters).
+
+The store is made of two files. The data file (for example `items-complete.jsonl`)
+holds one compact JSON record per line, sorted by ID. The index file (for example
+`items-complete.idx`) holds a small header and three packed arrays of the record
+IDs, byte offsets and byte lengths. Fetching one record is a binary search of the
+ID array, a slice of the memory-mapped data file and one small JSON parse.
+
+The index header stores the size, the modification time and a SHA-256 checksum
+of the data file. A store opened from disk is only used when the size and the
+modification time match. When only the modification time differs (for example, a
+copied file), the checksum is verified instead, so an edited data file is never
+read with a stale index.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import os
+import sys
+import mmap
+import struct
+import hashlib
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict
+from typing import Tuple
+from typing import Union
+from typing import Optional
+from typing import Iterable
+from typing import Iterator
+
+from osrsbox import codec
+
+INDEX_MAGIC = b"OSRSIDX\x00"
+INDEX_FORMAT_VERSION = 3
+DATA_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+
+# Header: magic, format version, record count, data file size, data file modification time (ns), data file checksum
+INDEX_HEADER_STRUCT = struct.Struct("<8sHIQQ32s")
+
+# Index arrays are stored as little-endian unsigned 32 bit integers
+ARRAY_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+
+
+def index_path_for(path_to_data_file: Path) -> Path:
+    """Return the index file path for a record store data file.
+
+    :param path_to_data_file: The path to the data file (`*.jsonl`).
+    :return: The path to the index file (`*.idx`), in the same directory.
+    """
+    return Path(path_to_data_file).with_suffix(INDEX_SUFFIX)
+
+
+def _unpack_array(buffer: bytes) -> array:
+    values = array(ARRAY_TYPECODE)
+    values.frombytes(buffer)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _pack_array(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(ARRAY_TYPECODE, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def build_record_store(records: Iterable[Dict], data_mtime_ns: int = 0) -> Tuple[bytes, bytes]:
+    """Build the data and index contents of a record store.
+
+    :param records: The JSON records, each with an integer `id` property.
+    :param data_mtime_ns: The modification time of the data file in nanoseconds, 0 when unknown.
+    :return: A tuple of the data bytes and the index bytes.
+    """
+    records = sorted(records, key=lambda record: record["id"])
+
+    ids = array(ARRAY_TYPECODE)
+    offsets = array(ARRAY_TYPECODE)
+    lengths = array(ARRAY_TYPECODE)
+    chunks = list()
+    offset = 0
+    for record in records:
+        encoded = codec.dumps(record).encode("utf-8")
+        ids.append(record["id"])
+        offsets.append(offset)
+        lengths.append(len(encoded))
+        chunks.append(encoded)
+        offset += len(encoded) + 1
+
+    data = b"\n".join(chunks) + b"\n" if chunks else b""
+    header = INDEX_HEADER_STRUCT.pack(INDEX_MAGIC, INDEX_FORMAT_VERSION, len(ids), len(data), data_mtime_ns,
+                                      hashlib.sha256(data).digest())
+    index = header + _pack_array(ids) + _pack_array(offsets) + _pack_array(lengths)
+    return data, index
+
+
+def _set_data_mtime(index: bytes, data_mtime_ns: int) -> bytes:
+    magic, format_version, count, data_size, _, checksum = INDEX_HEADER_STRUCT.unpack(index[:INDEX_HEADER_STRUCT.size])
+    header = INDEX_HEADER_STRUCT.pack(magic, format_version, count, data_size, data_mtime_ns, checksum)
+    return header + index[INDEX_HEADER_STRUCT.size:]
+
+
+def write_record_store(records: Iterable[Dict], path_to_data_file: Path, path_to_index_file: Path = None) -> Path:
+    """Write a record store data file, and the matching index file.
+
+    :param records: The JSON records, each with an integer `id` property.
+    :param path_to_data_file: The output data file path (`*.jsonl`).
+    :param path_to_index_file: The output index file path, defaults to the data file with an `.idx` suffix.
+    :return: The path to the written index file.
+    """
+    if path_to_index_file is None:
+        path_to_index_file = index_path_for(path_to_data_file)
+
+    data, index = build_record_store(records)
+    with open(path_to_data_file, "wb") as f:
+        f.write(data)
+    # The index is written after the data file, with its modification time
+    index = _set_data_mtime(index, os.stat(path_to_data_file).st_mtime_ns)
+    with open(path_to_index_file, "wb") as f:
+        f.write(index)
+
+    return path_to_index_file
+
+
+class RecordStore:
+    """This class reads single JSON records from a record store.
+
+    The data can be any buffer: a memory-mapped data file (see :meth:`open`) or,
+    for example, a shared memory segment.
+
+    :param data: A buffer with the contents of the data file.
+    :param index: A buffer with the contents of the index file.
+    :param verify_checksum: Check the data against the checksum in the index, for example, a data file that may have been edited.
+    :param data_mtime_ns: The modification time of the data file in nanoseconds, the checksum is verified when it
+        does not match the index.
+    :raises ValueError: The index is invalid, or does not match the data.
+    """
+    def __init__(self, data: Union[bytes, memoryview, mmap.mmap], index: Union[bytes, memoryview],
+                 verify_checksum: bool = False, data_mtime_ns: int = None):
+        index = memoryview(index)
+        header_size = INDEX_HEADER_STRUCT.size
+        try:
+            magic, format_version, count, data_size, index_mtime_ns, checksum = INDEX_HEADER_STRUCT.unpack(index[:header_size])
+        except struct.error as e:
+            raise ValueError("Error: Invalid record store index. Exiting.") from e
+        if magic != INDEX_MAGIC or format_version != INDEX_FORMAT_VERSION:
+            raise ValueError("Error: Invalid record store index. Exiting.")
+        if data_mtime_ns is not None and data_mtime_ns != index_mtime_ns:
+            verify_checksum = True
+        if data_size != len(data) or (verify_checksum and checksum != hashlib.sha256(data).digest()):
+            raise ValueError("Error: Record store index does not match the data file. Exiting.")
+
+        array_size = count * array(ARRAY_TYPECODE).itemsize
+        self.ids = _unpack_array(index[header_size:header_size + array_size])
+        self.offsets = _unpack_array(index[header_size + array_size:header_size + 2 * array_size])
+        self.lengths = _unpack_array(index[header_size + 2 * array_size:header_size + 3 * array_size])
+        self.data = data
+        self._file = None
+
+    @classmethod
+    def open(cls, path_to_data_file: Path, path_to_index_file: Path = None, verify: bool = False) -> "RecordStore":
+        """Open a record store from disk, memory mapping the data file.
+
+        The size and the modification time of the data file are checked against
+        the index. The data file is only read in full, to verify the checksum,
+        when the modification time differs, or when `verify` is set.
+
+        :param path_to_data_file: The path to the data file (`*.jsonl`).
+        :param path_to_index_file: The path to the index file, defaults to the data file with an `.idx` suffix.
+        :param verify: Always verify the checksum of the data file.
+        :return: A RecordStore object.
+        :raises ValueError: The index is invalid, or does not match the data file.
+        """
+        if path_to_index_file is None:
+            path_to_index_file = index_path_for(path_to_data_file)
+
+        with open(path_to_index_file, "rb") as f:
+            index = f.read()
+
+        data_file = open(path_to_data_file, "rb")
+        try:
+            data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be memory mapped
+            data = b""
+
+        try:
+            store = cls(data, index, verify_checksum=verify, data_mtime_ns=os.fstat(data_file.fileno()).st_mtime_ns)
+        except ValueError:
+            if isinstance(data, mmap.mmap):
+                data.close()
+            data_file.close()
+            raise
+        store._file = data_file
+        return store
+
+    def close(self) -> None:
+        """Close the memory-mapped data file, if opened from disk."""
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "RecordStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the count of records in the store."""
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate (loop) over each record ID, in sorted order."""
+        return iter(self.ids)
+
+    def __contains__(self, id_number: int) -> bool:
+        """Check if a record ID is in the store."""
+        return self._position(id_number) is not None
+
+    def __getitem__(self, id_number: int) -> Dict:
+        """Return the parsed JSON record for an ID.
+
+        :param id_number: The record ID number.
+        :return: The JSON record as a dictionary.
+        :raises KeyError: The record ID is not in the store.
+        """
+        return codec.loads(self.get_bytes(id_number))
+
+    def get_bytes(self, id_number: int) -> bytes:
+        """Return the raw JSON bytes of the record for an ID.
+
+        :param id_number: The record ID number.
+        :return: The JSON encoded record.
+        :raises KeyError: The record ID is not in the store.
+        """
+        position = self._position(id_number)
+        if position is None:
+            raise KeyError(id_number)
+        offset = self.offsets[position]
+        record = self.data[offset:offset + self.lengths[position]]
+        # Slicing an mmap copies the record to bytes, a memoryview slice (for example,
+        # shared memory) does not, so it is copied here, the JSON parsers need bytes
+        return record if isinstance(record, bytes) else bytes(record)
+
+    def _position(self, id_number: int) -> Optional[int]:
+        position = bisect_left(self.ids, id_number)
+        if position < len(self.ids) and self.ids[position] == id_number:
+            return position
+        return None
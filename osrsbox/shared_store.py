@@ -0,0 +1,194 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+A read-only record store (items or monsters) in a shared memory block, so
+many processes (for example, web server workers) share one copy of the
+database, instead of each process holding its own Python objects.
+
+The block holds a small header, the record store index (packed arrays of the
+record IDs, byte offsets and byte lengths) and the record store data (one
+compact JSON record per line). One process creates the block, and other
+processes attach to it by name. The records are read with the AllItems and
+AllMonsters APIs, in lazy mode, so each process only builds the objects it
+uses. Each process memoizes the objects it builds, and iterating or filtering
+builds every object, so a process that iterates holds a full copy again:
+
+    shared = SharedRecordStore.from_json_file("items-complete.json")
+    ...
+    shared = SharedRecordStore.attach(name)
+    all_db_items = AllItems(shared.store, lazy=True)
+
+Shared memory requires Python 3.8 or newer.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import os
+import struct
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+
+try:
+    from multiprocessing import shared_memory
+    from multiprocessing import resource_tracker
+except ImportError:
+    shared_memory = None
+    resource_tracker = None
+
+from osrsbox import codec
+from osrsbox import record_store
+
+SHARED_MAGIC = b"OSRSSHM\x00"
+SHARED_FORMAT_VERSION = 1
+
+# Header: magic, format version, index size, data size
+SHARED_HEADER_STRUCT = struct.Struct("<8sHQQ")
+
+
+def _tracker_name(block: "shared_memory.SharedMemory") -> str:
+    """Return the name of a shared memory block, as registered with the resource tracker.
+
+    :param block: The SharedMemory block.
+    :return: The block name, with the leading slash of POSIX shared memory names.
+    """
+    return f"/{block.name.lstrip('/')}"
+
+
+def _attach_block(name: str) -> "shared_memory.SharedMemory":
+    """Attach to an existing shared memory block, without taking ownership of it.
+
+    :param name: The name of the shared memory block.
+    :return: The attached SharedMemory object.
+    """
+    try:
+        # Python 3.13 and newer, do not track blocks this process did not create
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    # Older versions register every attached block with the resource tracker,
+    # which unlinks it when the tracker exits, so the registration is removed.
+    # The tracker may be shared with the creating process (for example, after a
+    # fork), the creating process registers the block again before unlinking it.
+    block = shared_memory.SharedMemory(name=name)
+    if os.name == "posix":
+        resource_tracker.unregister(_tracker_name(block), "shared_memory")
+    return block
+
+
+class SharedRecordStore:
+    """This class holds a read-only record store in a shared memory block.
+
+    Use :meth:`create`, :meth:`from_json_file` or :meth:`attach` to make a SharedRecordStore.
+
+    :param block: The SharedMemory block.
+    :param owner: Whether this process created the block, and unlinks it when done.
+    :raises ValueError: The block does not hold a valid record store.
+    """
+    def __init__(self, block: "shared_memory.SharedMemory", owner: bool):
+        self.block = block
+        self.owner = owner
+
+        header_size = SHARED_HEADER_STRUCT.size
+        buffer = block.buf
+        magic, format_version, index_size, data_size = SHARED_HEADER_STRUCT.unpack(bytes(buffer[:header_size]))
+        if magic != SHARED_MAGIC or format_version != SHARED_FORMAT_VERSION:
+            raise ValueError("Error: Invalid shared record store. Exiting.")
+
+        # Slices of the shared buffer, the record data is never copied
+        self._index = buffer[header_size:header_size + index_size]
+        self._data = buffer[header_size + index_size:header_size + index_size + data_size]
+        self.store = record_store.RecordStore(self._data, self._index)
+
+    @classmethod
+    def create(cls, records: Iterable[Dict], name: str = None) -> "SharedRecordStore":
+        """Create a shared memory block holding a record store of JSON records.
+
+        :param records: The JSON records, each with an integer `id` property.
+        :param name: The name of the shared memory block, or None for a random name.
+        :return: A SharedRecordStore, owned by this process.
+        :raises ImportError: Shared memory is not available (Python 3.7 or older).
+        """
+        if shared_memory is None:
+            raise ImportError("Error: SharedRecordStore requires Python 3.8 or newer. Exiting.")
+
+        data, index = record_store.build_record_store(records)
+        header = SHARED_HEADER_STRUCT.pack(SHARED_MAGIC, SHARED_FORMAT_VERSION, len(index), len(data))
+        size = len(header) + len(index) + len(data)
+        block = shared_memory.SharedMemory(name=name, create=True, size=size)
+        block.buf[:size] = header + index + data
+        return cls(block, owner=True)
+
+    @classmethod
+    def from_json_file(cls, path_to_json_file: Path, name: str = None) -> "SharedRecordStore":
+        """Create a shared memory block holding the records of a `*-complete.json` file.
+
+        :param path_to_json_file: The path to the JSON file, for example, `items-complete.json`.
+        :param name: The name of the shared memory block, or None for a random name.
+        :return: A SharedRecordStore, owned by this process.
+        """
+        with open(path_to_json_file, "rb") as f:
+            records = codec.load(f)
+        return cls.create(records.values(), name=name)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedRecordStore":
+        """Attach to a shared memory block created by another process.
+
+        :param name: The name of the shared memory block.
+        :return: A SharedRecordStore, not owned by this process.
+        :raises ImportError: Shared memory is not available (Python 3.7 or older).
+        :raises FileNotFoundError: No shared memory block has the name.
+        """
+        if shared_memory is None:
+            raise ImportError("Error: SharedRecordStore requires Python 3.8 or newer. Exiting.")
+        return cls(_attach_block(name), owner=False)
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory block, used to attach from other processes."""
+        return self.block.name
+
+    def __len__(self) -> int:
+        """Return the count of records in the store."""
+        return len(self.store)
+
+    def close(self) -> None:
+        """Detach from the shared memory block, unlinking it if this process created it.
+
+        Objects that read from the store (for example, a lazy AllItems) cannot read
+        unbuilt records after the store is closed.
+        """
+        if self.block is None:
+            return
+        self._index.release()
+        self._data.release()
+        self.block.close()
+        if self.owner:
+            # An attaching process that shares the resource tracker may have removed the registration
+            if os.name == "posix":
+                resource_tracker.register(_tracker_name(self.block), "shared_memory")
+            self.block.unlink()
+        self.block = None
+
+    def __enter__(self) -> "SharedRecordStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
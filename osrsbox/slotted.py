@@ -0,0 +1,131 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Helpers for compact (lower memory) database objects.
+
+A slotted dataclass is a copy of a dataclass that stores its fields in
+`__slots__`, instead of a per-instance `__dict__`. It has the same fields,
+defaults and methods as the original dataclass, and can optionally be frozen.
+Repeated strings (for example, the equipment slot or release date) can also
+be interned, so every object shares one copy of each string.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import sys
+import dataclasses
+from typing import Any
+from typing import Dict
+from typing import Tuple
+from typing import Iterable
+
+# Class attributes that are generated by the dataclass decorator, or by Python
+GENERATED_ATTRIBUTES = {"__dict__", "__weakref__", "__dataclass_fields__", "__dataclass_params__",
+                        "__init__", "__repr__", "__eq__", "__hash__", "__setattr__", "__delattr__",
+                        "__lt__", "__le__", "__gt__", "__ge__", "__annotations__", "__match_args__",
+                        "__module__", "__qualname__"}
+
+
+def _getstate(self) -> Dict:
+    return {field.name: getattr(self, field.name) for field in dataclasses.fields(self)}
+
+
+def _setstate(self, state: Dict) -> None:
+    # object.__setattr__ also restores frozen objects
+    for name, value in state.items():
+        object.__setattr__(self, name, value)
+
+
+def slotted_dataclass(cls: type, frozen: bool = False, field_types: Dict[str, Any] = None, **class_attributes) -> type:
+    """Create a copy of a dataclass that uses `__slots__`.
+
+    The new class is named with a `Slotted` prefix, and is in the same module as
+    the original dataclass. Assign it to that name in the module, so the objects
+    can be pickled.
+
+    :param cls: The dataclass to copy.
+    :param frozen: Whether the new dataclass is frozen (read only).
+    :param field_types: Field types to replace in the new class, for example, a nested slotted dataclass.
+    :param class_attributes: Class attributes to replace in the new class, for example, the class of nested objects.
+    :return: The new slotted dataclass.
+    """
+    fields = dataclasses.fields(cls)
+    field_names = tuple(field.name for field in fields)
+    namespace = {name: value for name, value in cls.__dict__.items()
+                 if name not in GENERATED_ATTRIBUTES and name not in field_names}
+    namespace.update(class_attributes)
+    field_types = field_types or dict()
+
+    # Build a fresh dataclass, so frozen classes get matching generated methods
+    made_fields = list()
+    for field in fields:
+        made_fields.append((field.name,
+                            field_types.get(field.name, field.type),
+                            dataclasses.field(default=field.default,
+                                              default_factory=field.default_factory,
+                                              init=field.init,
+                                              repr=field.repr,
+                                              compare=field.compare,
+                                              metadata=field.metadata)))
+    made = dataclasses.make_dataclass("Slotted" + cls.__name__, made_fields, namespace=namespace, frozen=frozen)
+
+    # Recreate the class with __slots__, field defaults are already stored in the generated __init__
+    slotted_namespace = {name: value for name, value in made.__dict__.items()
+                         if name not in ("__dict__", "__weakref__") and name not in field_names}
+    slotted_namespace["__slots__"] = field_names
+    slotted_namespace["__getstate__"] = _getstate
+    slotted_namespace["__setstate__"] = _setstate
+    slotted_namespace["__module__"] = cls.__module__
+    slotted_namespace["__qualname__"] = "Slotted" + cls.__qualname__
+    return type(made.__name__, made.__bases__, slotted_namespace)
+
+
+def intern_value(value: Any) -> Any:
+    """Return a value with every string interned, including strings in lists and dicts.
+
+    :param value: A value from an open and loaded JSON file.
+    :return: The value, or a copy of a list or dict value, with interned strings.
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    if type(value) is list:
+        return [intern_value(entry) for entry in value]
+    if type(value) is dict:
+        return {key: intern_value(entry) for key, entry in value.items()}
+    return value
+
+
+def intern_strings(json_dict: Dict[str, Any], names: Iterable[str]) -> None:
+    """Intern the string values of some properties, in place.
+
+    :param json_dict: A dict from an open and loaded JSON file.
+    :param names: The property names to intern.
+    """
+    for name in names:
+        if name in json_dict:
+            json_dict[name] = intern_value(json_dict[name])
+
+
+def intern_attributes(obj: Any, names: Tuple[str, ...]) -> None:
+    """Intern the string values of some attributes of an object, in place (including frozen objects).
+
+    :param obj: A dataclass object.
+    :param names: The attribute names to intern.
+    """
+    for name in names:
+        object.__setattr__(obj, name, intern_value(getattr(obj, name)))
@@ -0,0 +1,193 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Versioned binary snapshots of a loaded database, written next to the
+`*-complete.json` file they were built from by `update_json_files.py`, or to the
+user cache directory (see :func:`user_cache_dir`) on first load of the packaged
+database. Snapshots are written to a temporary file, and moved into place.
+
+A snapshot is a small fixed header followed by a pickle of the fully built
+dataclass objects. The header stores the snapshot format version, the osrsbox
+package version, the class name of the stored objects, and a SHA-256 checksum
+of the JSON file. A snapshot is only used when every header value matches,
+otherwise the caller falls back to loading the JSON file.
+
+Loading a snapshot unpickles it, which can run arbitrary code, and the header
+does not protect against a crafted file. Only load snapshots from trusted
+locations, AllItems only loads the snapshots of the packaged JSON file by default.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import os
+import pickle
+import struct
+import hashlib
+import tempfile
+from pathlib import Path
+from contextlib import contextmanager
+from typing import IO
+from typing import List
+from typing import Iterator
+from typing import Optional
+
+from osrsbox import __version__
+
+SNAPSHOT_MAGIC = b"OSRSBOX\x00"
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snapshot"
+
+# Fixed protocol so snapshots built on newer Python versions still load on 3.6+
+PICKLE_PROTOCOL = 4
+
+# Header: magic, format version, checksum, package version length, class name length
+HEADER_STRUCT = struct.Struct(">8sH32sHH")
+
+
+def snapshot_path_for(path_to_json_file: Path) -> Path:
+    """Return the snapshot file path for a `*-complete.json` file.
+
+    :param path_to_json_file: The path to the JSON file.
+    :return: The path to the snapshot file, in the same directory.
+    """
+    return Path(path_to_json_file).with_suffix(SNAPSHOT_SUFFIX)
+
+
+def user_cache_dir() -> Path:
+    """Return the osrsbox directory in the user cache directory, for example, `~/.cache/osrsbox`.
+
+    :return: The path, under `XDG_CACHE_HOME` when it is set.
+    """
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "osrsbox"
+
+
+def cached_snapshot_path(path_to_json_file: Path, cls: type) -> Path:
+    """Return the snapshot file path, in the user cache directory, for a `*-complete.json` file.
+
+    :param path_to_json_file: The path to the JSON file.
+    :param cls: The class of the loaded objects.
+    :return: The path to the snapshot file, named by the JSON file, the class and the osrsbox version.
+    """
+    return user_cache_dir() / f"{Path(path_to_json_file).stem}-{cls.__name__}-{__version__}{SNAPSHOT_SUFFIX}"
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "wb") -> Iterator[IO]:
+    """Open a temporary file next to `path`, and move it into place when the block succeeds.
+
+    Readers never see a partly written file, and a failed write leaves the old file in place.
+
+    :param path: The path to the output file.
+    :param mode: The file mode, `wb` or `w`.
+    :return: A context manager of the open temporary file.
+    """
+    path = Path(path)
+    f = tempfile.NamedTemporaryFile(mode, dir=str(path.parent), prefix=f"{path.name}.", suffix=".tmp", delete=False)
+    try:
+        with f:
+            yield f
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, str(path))
+    except BaseException:
+        try:
+            os.unlink(f.name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def file_checksum(path_to_file: Path) -> bytes:
+    """Calculate the SHA-256 checksum of a file.
+
+    :param path_to_file: The path to the file.
+    :return: The raw digest bytes.
+    """
+    digest = hashlib.sha256()
+    with open(path_to_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _class_name(cls: type) -> bytes:
+    return f"{cls.__module__}.{cls.__qualname__}".encode("utf-8")
+
+
+def write_snapshot(objects: List, cls: type, path_to_json_file: Path, path_to_snapshot: Path = None) -> Path:
+    """Write a snapshot of loaded objects that were built from a JSON file.
+
+    :param objects: The list of loaded objects (for example, ItemProperties).
+    :param cls: The class of the loaded objects.
+    :param path_to_json_file: The JSON file the objects were loaded from.
+    :param path_to_snapshot: The output path, defaults to the JSON file with a `.snapshot` suffix.
+    :return: The path to the written snapshot file.
+    """
+    if path_to_snapshot is None:
+        path_to_snapshot = snapshot_path_for(path_to_json_file)
+
+    package_version = __version__.encode("utf-8")
+    class_name = _class_name(cls)
+    header = HEADER_STRUCT.pack(SNAPSHOT_MAGIC,
+                                SNAPSHOT_FORMAT_VERSION,
+                                file_checksum(path_to_json_file),
+                                len(package_version),
+                                len(class_name))
+
+    with atomic_write(path_to_snapshot) as f:
+        f.write(header)
+        f.write(package_version)
+        f.write(class_name)
+        pickle.dump(objects, f, protocol=PICKLE_PROTOCOL)
+
+    return path_to_snapshot
+
+
+def load_snapshot(cls: type, path_to_json_file: Path, path_to_snapshot: Path = None) -> Optional[List]:
+    """Load the objects stored in a snapshot, if the snapshot is fresh.
+
+    A snapshot is fresh when it was written by the same snapshot format and
+    osrsbox version, stores objects of the requested class, and the checksum
+    matches the current contents of the JSON file.
+
+    :param cls: The expected class of the stored objects.
+    :param path_to_json_file: The JSON file the snapshot must match.
+    :param path_to_snapshot: The snapshot path, defaults to the JSON file with a `.snapshot` suffix.
+    :return: A list of loaded objects, or None when no fresh snapshot is available.
+    """
+    if path_to_snapshot is None:
+        path_to_snapshot = snapshot_path_for(path_to_json_file)
+
+    if not Path(path_to_snapshot).is_file():
+        return None
+
+    try:
+        with open(path_to_snapshot, "rb") as f:
+            header = f.read(HEADER_STRUCT.size)
+            magic, format_version, checksum, version_length, class_name_length = HEADER_STRUCT.unpack(header)
+            if magic != SNAPSHOT_MAGIC or format_version != SNAPSHOT_FORMAT_VERSION:
+                return None
+            if f.read(version_length) != __version__.encode("utf-8"):
+                return None
+            if f.read(class_name_length) != _class_name(cls):
+                return None
+            if checksum != file_checksum(path_to_json_file):
+                return None
+            return pickle.load(f)
+    except (OSError, struct.error, pickle.UnpicklingError, AttributeError, EOFError, ImportError):
+        # A truncated or incompatible snapshot, use the JSON file instead
+        return None
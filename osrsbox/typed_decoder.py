@@ -0,0 +1,161 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Typed decoding of a `*-complete.json` document directly into dataclass objects.
+
+The decoder is driven by the dataclass fields, including nested dataclasses
+(for example, the equipment and weapon of an item). When msgspec is installed,
+the JSON bytes are decoded straight into the dataclass objects, and no
+intermediate dictionaries are allocated. Otherwise, a decoder function is
+generated from the dataclass fields, which builds each object from the parsed
+JSON with one positional constructor call.
+
+After decoding, the `interned_properties` of each object (and nested object)
+are interned, the same as the `from_json` class methods.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import dataclasses
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Union
+from typing import Callable
+from typing import Optional
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+from osrsbox import codec
+from osrsbox.slotted import intern_attributes
+
+# Decoders are built once per dataclass
+_msgspec_decoders: Dict[type, Any] = dict()
+_generated_decoders: Dict[type, Callable[[Dict], Any]] = dict()
+_intern_plans: Dict[type, Tuple[Tuple[str, ...], Tuple[str, ...]]] = dict()
+
+
+def _nested_dataclass(field_type: Any) -> Optional[type]:
+    """Return the dataclass of a field type (or an Optional dataclass), or None."""
+    if getattr(field_type, "__origin__", None) is Union:
+        candidates = [arg for arg in field_type.__args__ if arg is not type(None)]
+        field_type = candidates[0] if len(candidates) == 1 else None
+    if isinstance(field_type, type) and dataclasses.is_dataclass(field_type):
+        return field_type
+    return None
+
+
+def generated_decoder(cls: type) -> Callable[[Dict], Any]:
+    """Return a function that builds a dataclass object from a parsed JSON entry.
+
+    The function source is generated from the dataclass fields. Nested dataclass
+    fields are decoded by their own generated function, and a missing required
+    property raises a KeyError.
+
+    :param cls: The dataclass to build.
+    :return: A function of the parsed JSON entry to a dataclass object.
+    """
+    try:
+        return _generated_decoders[cls]
+    except KeyError:
+        pass
+
+    namespace = {"cls": cls}
+    body = list()
+    arguments = list()
+    for position, field in enumerate(field for field in dataclasses.fields(cls) if field.init):
+        variable = f"value_{position}"
+        if field.default is not dataclasses.MISSING:
+            namespace[f"default_{position}"] = field.default
+            body.append(f"    {variable} = entry.get({field.name!r}, default_{position})")
+        elif field.default_factory is not dataclasses.MISSING:
+            namespace[f"factory_{position}"] = field.default_factory
+            body.append(f"    {variable} = entry[{field.name!r}] if {field.name!r} in entry else factory_{position}()")
+        else:
+            body.append(f"    {variable} = entry[{field.name!r}]")
+
+        nested = _nested_dataclass(field.type)
+        if nested is not None:
+            namespace[f"decode_{position}"] = generated_decoder(nested)
+            body.append(f"    if {variable} is not None:")
+            body.append(f"        {variable} = decode_{position}({variable})")
+        arguments.append(variable)
+
+    source = "def decode(entry):\n" + "\n".join(body) + f"\n    return cls({', '.join(arguments)})\n"
+    exec(source, namespace)
+    _generated_decoders[cls] = namespace["decode"]
+    return namespace["decode"]
+
+
+def intern_objects(objects: List[Any], cls: type) -> None:
+    """Intern the `interned_properties` of dataclass objects, and their nested dataclass objects.
+
+    :param objects: The dataclass objects.
+    :param cls: The dataclass of the objects.
+    """
+    try:
+        interned, nested = _intern_plans[cls]
+    except KeyError:
+        interned = getattr(cls, "interned_properties", ())
+        nested = tuple(field.name for field in dataclasses.fields(cls) if _nested_dataclass(field.type) is not None)
+        _intern_plans[cls] = (interned, nested)
+
+    for obj in objects:
+        if interned:
+            intern_attributes(obj, interned)
+    for name in nested:
+        children = [getattr(obj, name) for obj in objects]
+        children = [child for child in children if child is not None]
+        if children:
+            intern_objects(children, type(children[0]))
+
+
+def decode_entries(data: Union[str, bytes], cls: type) -> List[Any]:
+    """Decode a `*-complete.json` document (a JSON object of ID to entry) into dataclass objects.
+
+    :param data: The JSON document.
+    :param cls: The dataclass of each entry, for example, ItemProperties.
+    :return: A list of dataclass objects, in document order.
+    :raises ValueError: An entry does not match the dataclass fields, or msgspec cannot decode the dataclass.
+    """
+    if msgspec is not None:
+        try:
+            decoder = _msgspec_decoders[cls]
+        except KeyError:
+            try:
+                decoder = _msgspec_decoders[cls] = msgspec.json.Decoder(Dict[str, cls])
+            except TypeError as e:
+                # A msgspec release that cannot decode dataclasses (older than 0.10)
+                raise ValueError("Error: Unsupported msgspec version, check the installed version. Exiting") from e
+        try:
+            objects = list(decoder.decode(data).values())
+        except msgspec.DecodeError as e:
+            raise ValueError("Error: Invalid JSON structure found, check supplied input. Exiting") from e
+    else:
+        decode = generated_decoder(cls)
+        try:
+            objects = [decode(entry) for entry in codec.loads(data).values()]
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError("Error: Invalid JSON structure found, check supplied input. Exiting") from e
+
+    intern_objects(objects, cls)
+    return objects
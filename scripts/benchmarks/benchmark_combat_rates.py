@@ -0,0 +1,100 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark kill rate and loot rate estimates against the full monster list,
+comparing a loop per monster per loadout with the batched CombatRates.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import time
+import argparse
+from typing import Dict
+from typing import List
+
+from osrsbox import items_api
+from osrsbox import monsters_api
+from osrsbox.monsters_api.combat_rates import CombatRates
+from osrsbox.monsters_api.combat_rates import CombatLoadout
+
+
+def loop_loot_per_hour(monsters: List, loadouts: List[CombatLoadout], expected_values: Dict[int, float]) -> List[List[float]]:
+    """The slash loot value per hour of each loadout against each monster, one at a time."""
+    results = list()
+    for loadout in loadouts:
+        row = list()
+        for monster in monsters:
+            attack_roll = (99 + 8) * (loadout.stats["attack_slash"] + 64)
+            defence_roll = (monster.defence_level + 9) * (monster.defence_slash + 64)
+            if attack_roll > defence_roll:
+                hit_chance = 1 - (defence_roll + 2) / (2 * (attack_roll + 1))
+            else:
+                hit_chance = attack_roll / (2 * (defence_roll + 1))
+            max_hit = int(0.5 + (99 + 8) * (loadout.stats["melee_strength"] + 64) / 640)
+            dps = hit_chance * max_hit / 2 / (loadout.attack_speed * 0.6)
+            if dps > 0 and monster.hitpoints:
+                row.append(3600 / (monster.hitpoints / dps) * expected_values[monster.id])
+            else:
+                row.append(0.0)
+        results.append(row)
+    return results
+
+
+def main(loadout_count: int):
+    all_db_monsters = monsters_api.load()
+    all_db_items = items_api.load()
+    prices = {item.id: item.cost for item in all_db_items}
+    weapons = [item for item in all_db_items
+               if item.equipable_by_player and item.weapon is not None and item.equipment.attack_slash > 0]
+    loadouts = [CombatLoadout.from_items([weapon]) for weapon in weapons[:loadout_count]]
+
+    start = time.perf_counter()
+    rates = CombatRates(all_db_monsters, drop_table=all_db_monsters.drop_table())
+    rates.evaluate(loadouts[:1], "slash", prices=prices)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected_values = all_db_monsters.drop_table().expected_values(prices)
+    loop_loot_per_hour(rates.monsters, loadouts, expected_values)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rates.evaluate(loadouts, "slash", prices=prices)
+    batched_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for loadout in loadouts:
+        rates.evaluate([loadout], "slash", prices=prices)
+    single_time = time.perf_counter() - start
+
+    print(f"{len(loadouts)} loadouts against {len(rates)} monsters")
+    print(f"Build (with drop table):      {build_time:.3f}s")
+    print(f"Loop per monster per loadout: {loop_time:.3f}s")
+    print(f"One loadout per evaluate:     {single_time:.3f}s")
+    print(f"Every loadout in one batch:   {batched_time:.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched kill rate and loot rate estimates.")
+    parser.add_argument('--loadouts',
+                        default=100,
+                        type=int,
+                        required=False,
+                        help='The number of loadouts (weapons) to evaluate.')
+    args = parser.parse_args()
+    main(args.loadouts)
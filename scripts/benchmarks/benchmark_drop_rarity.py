@@ -0,0 +1,70 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark a rarity leaderboard (the rarest drops, and the hardest items to
+get), comparing a full recomputation from the monster database with loading
+the precomputed drop rarity artifact.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import config
+from osrsbox.monsters_api.all_monsters import AllMonsters
+from osrsbox.monsters_api.drop_rarity import DropRarityTable
+from osrsbox.monsters_api.drop_rarity import write_drop_rarity
+
+
+def main(repeats: int):
+    path_to_monsters = Path(config.DOCS_PATH / "monsters-complete.json")
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        path_to_artifact = Path(temp_directory) / "monsters-complete.rarity.json"
+        write_drop_rarity(AllMonsters(path_to_monsters), path_to_monsters, path_to_artifact)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            table = DropRarityTable.from_monsters(AllMonsters(path_to_monsters))
+            table.rarest_drops(limit=10)
+            table.rarest_items(limit=10)
+        recompute_time = (time.perf_counter() - start) / repeats
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            table = DropRarityTable.load(path_to_monsters, path_to_artifact)
+            table.rarest_drops(limit=10)
+            table.rarest_items(limit=10)
+        artifact_time = (time.perf_counter() - start) / repeats
+
+    print(f"Load monsters and recompute: {recompute_time:.3f}s")
+    print(f"Load precomputed artifact:   {artifact_time:.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the precomputed drop rarity artifact.")
+    parser.add_argument('--repeats',
+                        default=3,
+                        type=int,
+                        required=False,
+                        help='The number of leaderboards to build.')
+    args = parser.parse_args()
+    main(args.repeats)
@@ -0,0 +1,81 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark ranking every equipable item by a weighted sum of equipment stats,
+looping over ItemProperties objects compared to the EquipmentColumns arrays.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import time
+import argparse
+from pathlib import Path
+
+import config
+from osrsbox.items_api.all_items import AllItems
+
+WEIGHTS = {"attack_slash": 1.0, "melee_strength": 1.5, "defence_slash": 0.25, "prayer": 0.5}
+
+
+def rank_objects(all_db_items: AllItems, k: int) -> list:
+    """Rank equipable weapons by looping over every ItemProperties object."""
+    scores = list()
+    for item in all_db_items:
+        if not item.equipable_by_player or item.equipment is None or item.equipment.slot != "weapon":
+            continue
+        score = sum(getattr(item.equipment, stat) * weight for stat, weight in WEIGHTS.items())
+        scores.append((-score, item.id))
+    return [item_id for _, item_id in sorted(scores)[:k]]
+
+
+def rank_columns(all_db_items: AllItems, k: int) -> list:
+    """Rank equipable weapons with the EquipmentColumns arrays."""
+    columns = all_db_items.equipment_columns()
+    scores = columns.weighted_scores(WEIGHTS)
+    return columns.top_k(scores, k, mask=columns.mask(slot="weapon")).tolist()
+
+
+def main(repeats: int, k: int):
+    all_db_items = AllItems(Path(config.DOCS_PATH / "items-complete.json"))
+
+    start = time.perf_counter()
+    all_db_items.equipment_columns()
+    print(f">>> Built EquipmentColumns in {time.perf_counter() - start:.3f} seconds")
+
+    for name, rank in (("ItemProperties loop", rank_objects), ("EquipmentColumns", rank_columns)):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            top = rank(all_db_items, k)
+        elapsed = (time.perf_counter() - start) / repeats
+        print(f"{name:<20} {elapsed * 1000:>8.3f} ms per ranking, top: {all_db_items[top[0]].name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark weighted equipment stat ranking.")
+    parser.add_argument('--repeats',
+                        default=100,
+                        type=int,
+                        required=False,
+                        help='The number of rankings to time for each method.')
+    parser.add_argument('--k',
+                        default=10,
+                        type=int,
+                        required=False,
+                        help='The number of top items to return.')
+    args = parser.parse_args()
+    main(args.repeats, args.k)
@@ -0,0 +1,101 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark the GearOptimizer over the full equipment set, compared to a scan of
+every ItemProperties object that picks the best item for each slot.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import time
+import argparse
+from pathlib import Path
+
+import config
+from osrsbox.items_api.all_items import AllItems
+from osrsbox.items_api.gear_optimizer import GearOptimizer
+
+OBJECTIVES = [
+    ({"attack_slash": 1.0, "melee_strength": 1.5, "defence_slash": 0.2}, {"attack": 70, "strength": 70, "defence": 70}, True),
+    ({"attack_ranged": 1.0, "ranged_strength": 2.0, "prayer": 0.5}, {"ranged": 60, "defence": 40}, True),
+    ({"attack_magic": 1.0, "magic_damage": 3.0, "defence_magic": 0.5}, {"magic": 50, "defence": 30}, False),
+    ({"prayer": 1.0}, None, True),
+]
+
+
+def scan_best_loadout(all_db_items: AllItems, weights: dict, skills: dict, members: bool) -> float:
+    """Return the best loadout score, scanning every ItemProperties object."""
+    best = dict()
+    for item in all_db_items:
+        if not item.equipable_by_player or item.equipment is None:
+            continue
+        if item.members and not members:
+            continue
+        requirements = item.equipment.requirements or dict()
+        if any(requirements.get(skill, 1) > level for skill, level in (skills or dict()).items()):
+            continue
+        score = sum(getattr(item.equipment, stat) * weight for stat, weight in weights.items())
+        best[item.equipment.slot] = max(best.get(item.equipment.slot, 0.0), score)
+
+    one_handed = best.pop("weapon", 0.0) + best.pop("shield", 0.0)
+    best["weapon"] = max(one_handed, best.pop("2h", 0.0))
+    return sum(best.values())
+
+
+def main(repeats: int, n: int):
+    all_db_items = AllItems(Path(config.DOCS_PATH / "items-complete.json"))
+
+    start = time.perf_counter()
+    optimizer = GearOptimizer(all_db_items, max_loadouts=max(n, 10))
+    print(f">>> Built GearOptimizer in {time.perf_counter() - start:.3f} seconds")
+    for slot, rows in optimizer.slot_rows.items():
+        print(f"    {slot:<8} {len(rows):>5} items, {len(optimizer.candidate_rows[slot]):>5} after pruning")
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        scan_scores = [scan_best_loadout(all_db_items, *objective) for objective in OBJECTIVES]
+    scan_time = (time.perf_counter() - start) / (repeats * len(OBJECTIVES))
+
+    timings = dict()
+    for top_n in (1, n):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            results = [optimizer.best_loadouts(weights, skills, members, n=top_n) for weights, skills, members in OBJECTIVES]
+        timings[top_n] = (time.perf_counter() - start) / (repeats * len(OBJECTIVES))
+        if top_n == 1:
+            assert all(abs(loadouts[0].score - score) < 1e-6 for loadouts, score in zip(results, scan_scores))
+
+    print(f"{'ItemProperties scan (best 1)':<30} {scan_time * 1000:>8.3f} ms per query")
+    for top_n, elapsed in timings.items():
+        print(f"{f'GearOptimizer (best {top_n})':<30} {elapsed * 1000:>8.3f} ms per query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the best-in-slot gear optimizer.")
+    parser.add_argument('--repeats',
+                        default=20,
+                        type=int,
+                        required=False,
+                        help='The number of times to run every objective.')
+    parser.add_argument('--n',
+                        default=10,
+                        type=int,
+                        required=False,
+                        help='The number of top loadouts to find.')
+    args = parser.parse_args()
+    main(args.repeats, args.n)
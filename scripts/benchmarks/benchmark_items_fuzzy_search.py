@@ -0,0 +1,93 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark the query latency of AllItems.fuzzy_search_item_names over the
+full item database. Queries are made from random item names with typing
+errors (deleted, swapped or replaced characters) and partially typed names.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import time
+import random
+import string
+import argparse
+
+from osrsbox import items_api
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """Add one random typing error to a name, or cut it short."""
+    position = rng.randrange(len(name))
+    error = rng.choice(("delete", "swap", "replace", "partial"))
+    if error == "delete":
+        return name[:position] + name[position + 1:]
+    if error == "swap" and position < len(name) - 1:
+        return name[:position] + name[position + 1] + name[position] + name[position + 2:]
+    if error == "replace":
+        return name[:position] + rng.choice(string.ascii_lowercase) + name[position + 1:]
+    return name[:max(1, position)]
+
+
+def percentile(timings: list, percent: float) -> float:
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * percent / 100))]
+
+
+def main(queries: int, limit: int, seed: int):
+    all_db_items = items_api.load()
+    rng = random.Random(seed)
+    names = [item.name for item in all_db_items if item.name]
+    query_names = [misspell(rng.choice(names), rng) for _ in range(queries)]
+
+    start = time.perf_counter()
+    all_db_items.fuzzy_search_item_names("")
+    all_db_items.fuzzy_search_item_names("a")
+    print(f"Index build: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    timings = list()
+    for query_name in query_names:
+        start = time.perf_counter()
+        all_db_items.fuzzy_search_item_names(query_name, limit=limit)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(f"Queries: {len(timings)}, top-{limit}")
+    print(f"p50: {percentile(timings, 50):.2f} ms")
+    print(f"p99: {percentile(timings, 99):.2f} ms")
+    print(f"max: {max(timings):.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fuzzy item name search latency.")
+    parser.add_argument('--queries',
+                        default=2000,
+                        type=int,
+                        required=False,
+                        help='The number of random queries.')
+    parser.add_argument('--limit',
+                        default=10,
+                        type=int,
+                        required=False,
+                        help='The number of results for each query.')
+    parser.add_argument('--seed',
+                        default=1,
+                        type=int,
+                        required=False,
+                        help='The random seed used to make queries.')
+    args = parser.parse_args()
+    main(args.queries, args.limit, args.seed)
@@ -0,0 +1,79 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark the cold load time of the item database from `items-complete.json`
+compared to the binary `items-complete.snapshot` file. Each load runs in a
+fresh Python process, so module imports and object construction are included.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import sys
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+import config
+from osrsbox import snapshot
+from osrsbox.items_api.all_items import AllItems
+from osrsbox.items_api.item_properties import ItemProperties
+
+COLD_LOAD_CODE = """
+import time
+start = time.perf_counter()
+from osrsbox.items_api.all_items import AllItems
+all_db_items = AllItems({path!r}, use_snapshot={use_snapshot})
+print(time.perf_counter() - start)
+"""
+
+
+def cold_load(path_to_json_file: Path, use_snapshot: bool) -> float:
+    """Load the item database in a new Python process and return the load time."""
+    code = COLD_LOAD_CODE.format(path=str(path_to_json_file), use_snapshot=use_snapshot)
+    result = subprocess.run([sys.executable, "-c", code],
+                            cwd=config.PROJECT_ROOT_PATH,
+                            stdout=subprocess.PIPE,
+                            check=True)
+    return float(result.stdout.decode().strip())
+
+
+def main(repeats: int):
+    path_to_items_complete = Path(config.DOCS_PATH / "items-complete.json")
+
+    # Make sure the snapshot is fresh before timing it
+    if snapshot.load_snapshot(ItemProperties, path_to_items_complete) is None:
+        print(">>> Writing items-complete.snapshot...")
+        all_db_items = AllItems(path_to_items_complete, use_snapshot=False)
+        snapshot.write_snapshot(all_db_items.all_items, ItemProperties, path_to_items_complete)
+
+    print(f"{'Source':<25} {'Min (s)':>10} {'Median (s)':>12}")
+    for name, use_snapshot in (("items-complete.json", False), ("items-complete.snapshot", True)):
+        timings = [cold_load(path_to_items_complete, use_snapshot) for _ in range(repeats)]
+        print(f"{name:<25} {min(timings):>10.3f} {statistics.median(timings):>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark item database cold load time.")
+    parser.add_argument('--repeats',
+                        default=5,
+                        type=int,
+                        required=False,
+                        help='The number of cold loads for each source.')
+    args = parser.parse_args()
+    main(args.repeats)
@@ -0,0 +1,76 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark loading `items-complete.json` into ItemProperties objects, comparing
+the dict path (parse to dicts, then ItemProperties.from_json) with typed
+decoding straight into the dataclass objects. The load time, and the peak
+memory while loading, are reported.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+import config
+from osrsbox import codec
+from osrsbox import typed_decoder
+from osrsbox.items_api.item_properties import ItemProperties
+from osrsbox.items_api.item_properties import SlottedItemProperties
+
+
+def load_from_dicts(raw_items: bytes, item_class: type) -> list:
+    return [item_class.from_json(item) for item in codec.loads(raw_items).values()]
+
+
+def load_typed(raw_items: bytes, item_class: type) -> list:
+    return typed_decoder.decode_entries(raw_items, item_class)
+
+
+def main(repeats: int):
+    raw_items = Path(config.DOCS_PATH / "items-complete.json").read_bytes()
+    decoder_name = "msgspec" if typed_decoder.msgspec is not None else "generated"
+
+    print(f"{'Class':<22} {'Method':<20} {'Best time':>10} {'Peak memory':>12}")
+    for item_class in (ItemProperties, SlottedItemProperties):
+        for method, load in (("from_json", load_from_dicts), (f"typed ({decoder_name})", load_typed)):
+            timings = list()
+            for _ in range(repeats):
+                start = time.perf_counter()
+                load(raw_items, item_class)
+                timings.append(time.perf_counter() - start)
+
+            tracemalloc.start()
+            items = load(raw_items, item_class)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            del items
+            print(f"{item_class.__name__:<22} {method:<20} {min(timings):>9.3f}s {peak / 1024 / 1024:>10.1f}MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark typed decoding of items-complete.json.")
+    parser.add_argument('--repeats',
+                        default=3,
+                        type=int,
+                        required=False,
+                        help='The number of loads for each method.')
+    args = parser.parse_args()
+    main(args.repeats)
@@ -0,0 +1,75 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark the load time of `items-complete.json` and `monsters-complete.json`
+with each installed JSON backend (orjson, msgspec and the standard library).
+Both the JSON parse alone, and the full database load, are timed.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import time
+import argparse
+import statistics
+from pathlib import Path
+from typing import Callable
+
+import config
+from osrsbox import codec
+from osrsbox.items_api.all_items import AllItems
+from osrsbox.monsters_api.all_monsters import AllMonsters
+
+
+def median_time(function: Callable, repeats: int) -> float:
+    """Return the median run time of a function, in seconds."""
+    timings = list()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(repeats: int):
+    path_to_items = Path(config.DOCS_PATH / "items-complete.json")
+    path_to_monsters = Path(config.DOCS_PATH / "monsters-complete.json")
+    raw_items = path_to_items.read_bytes()
+    raw_monsters = path_to_monsters.read_bytes()
+
+    print(f"{'Backend':<10} {'Items parse':>12} {'Items load':>12} {'Monsters parse':>15} {'Monsters load':>14}")
+    for backend in codec.available_backends():
+        codec.set_backend(backend)
+        timings = [
+            median_time(lambda: codec.loads(raw_items), repeats),
+            median_time(lambda: AllItems(path_to_items, use_snapshot=False), repeats),
+            median_time(lambda: codec.loads(raw_monsters), repeats),
+            median_time(lambda: AllMonsters(path_to_monsters), repeats),
+        ]
+        print(f"{backend:<10} {timings[0]:>11.3f}s {timings[1]:>11.3f}s {timings[2]:>14.3f}s {timings[3]:>13.3f}s")
+    codec.set_backend()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark database load time with each JSON backend.")
+    parser.add_argument('--repeats',
+                        default=5,
+                        type=int,
+                        required=False,
+                        help='The number of loads for each backend.')
+    args = parser.parse_args()
+    main(args.repeats)
@@ -0,0 +1,89 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark the expected loot value of every monster, and the kills for a 90%
+chance of every drop, comparing loops over MonsterDrop objects with the
+vectorized drop table.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import math
+import time
+import argparse
+
+from osrsbox import items_api
+from osrsbox import monsters_api
+from osrsbox.monsters_api.drop_index import rarity_value
+from osrsbox.monsters_api.drop_calculator import parse_quantity
+
+
+def loop_expected_values(all_db_monsters, prices):
+    values = dict()
+    for monster in all_db_monsters:
+        total = 0.0
+        for drop in monster.drops:
+            # Parse the quantity on every call, without the parse_quantity cache
+            mean_quantity = parse_quantity.__wrapped__(drop.quantity)[2]
+            total += (rarity_value(drop.rarity) or 0.0) * drop.rolls * mean_quantity * prices.get(drop.id, 0)
+        values[monster.id] = total
+    return values
+
+
+def loop_kills(all_db_monsters, probability):
+    kills = list()
+    for monster in all_db_monsters:
+        for drop in monster.drops:
+            rarity = rarity_value(drop.rarity) or 0.0
+            if rarity >= 1:
+                kills.append(1)
+            elif rarity <= 0:
+                kills.append(math.inf)
+            else:
+                kills.append(math.ceil(math.log(1 - probability) / (drop.rolls * math.log(1 - rarity))))
+    return kills
+
+
+def main(repeats: int):
+    all_db_monsters = monsters_api.load()
+    prices = {item.id: item.cost for item in items_api.load()}
+
+    start = time.perf_counter()
+    drop_table = all_db_monsters.drop_table()
+    build_time = time.perf_counter() - start
+    print(f"Drop table build ({len(drop_table)} drops, quantities parsed once): {build_time:.3f}s")
+
+    for name, function in (("Loop expected values", lambda: loop_expected_values(all_db_monsters, prices)),
+                           ("Table expected values", lambda: drop_table.expected_values(prices)),
+                           ("Loop kills for 90%", lambda: loop_kills(all_db_monsters, 0.9)),
+                           ("Table kills for 90%", lambda: drop_table.kills_for_probability(0.9))):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            function()
+        print(f"{name:<22} {(time.perf_counter() - start) / repeats * 1000:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized drop calculator.")
+    parser.add_argument('--repeats',
+                        default=10,
+                        type=int,
+                        required=False,
+                        help='The number of runs of each calculation.')
+    args = parser.parse_args()
+    main(args.repeats)
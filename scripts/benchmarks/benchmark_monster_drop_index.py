@@ -0,0 +1,65 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark finding the monsters that drop an item, comparing a scan of every
+drop of every monster with the inverted drop index.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import time
+import random
+import argparse
+
+from osrsbox import monsters_api
+
+
+def main(queries: int):
+    all_db_monsters = monsters_api.load()
+    item_names = sorted({drop.name for monster in all_db_monsters for drop in monster.drops})
+    random.seed(0)
+    searches = [random.choice(item_names) for _ in range(queries)]
+
+    start = time.perf_counter()
+    for item_name in searches:
+        [monster for monster in all_db_monsters for drop in monster.drops if drop.name.lower() == item_name.lower()]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    all_db_monsters.drop_index()
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for item_name in searches:
+        all_db_monsters.monsters_dropping(item_name)
+    index_time = time.perf_counter() - start
+
+    print(f"Index build: {build_time:.3f}s")
+    print(f"Scan:        {scan_time / queries * 1000:.3f}ms per query")
+    print(f"Drop index:  {index_time / queries * 1000:.3f}ms per query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the inverted drop index.")
+    parser.add_argument('--queries',
+                        default=200,
+                        type=int,
+                        required=False,
+                        help='The number of item searches.')
+    args = parser.parse_args()
+    main(args.queries)
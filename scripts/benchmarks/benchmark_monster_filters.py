@@ -0,0 +1,68 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark filtering monsters by slayer master, combat level range and venom
+immunity, comparing a scan of every monster with the monster field indexes.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import time
+import argparse
+
+from osrsbox import monsters_api
+from osrsbox.field_index import Between
+from osrsbox.field_index import Contains
+
+SLAYER_MASTERS = ("turael", "mazchna", "vannaka", "chaeldar", "konar", "nieve", "duradel", "krystilia")
+
+
+def main(queries: int):
+    all_db_monsters = monsters_api.load()
+    searches = [(SLAYER_MASTERS[query % len(SLAYER_MASTERS)], 20 * (query % 10)) for query in range(queries)]
+
+    start = time.perf_counter()
+    for slayer_master, level in searches:
+        [monster for monster in all_db_monsters
+         if slayer_master in monster.slayer_masters and level <= monster.combat_level <= level + 100 and not monster.immune_venom]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    all_db_monsters.filter_monsters(slayer_masters=Contains("duradel"), combat_level=Between(0, 0), immune_venom=False)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for slayer_master, level in searches:
+        all_db_monsters.filter_monsters(slayer_masters=Contains(slayer_master), combat_level=Between(level, level + 100),
+                                        immune_venom=False)
+    index_time = time.perf_counter() - start
+
+    print(f"Index build:    {build_time:.3f}s")
+    print(f"Scan:           {scan_time / queries * 1000:.3f}ms per query")
+    print(f"Field indexes:  {index_time / queries * 1000:.3f}ms per query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark monster field index queries.")
+    parser.add_argument('--queries',
+                        default=200,
+                        type=int,
+                        required=False,
+                        help='The number of monster filters.')
+    args = parser.parse_args()
+    main(args.queries)
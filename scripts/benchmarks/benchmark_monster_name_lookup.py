@@ -0,0 +1,79 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark exact, substring and prefix monster name lookups, comparing a scan
+of every monster with the monster name indexes.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import time
+import random
+import argparse
+from typing import Callable
+from typing import List
+
+from osrsbox import monsters_api
+
+
+def per_query_time(function: Callable, queries: List[str]) -> float:
+    """Return the mean run time of a function for each query, in milliseconds."""
+    start = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main(queries: int):
+    all_db_monsters = monsters_api.load()
+    names = sorted({monster.name for monster in all_db_monsters})
+    random.seed(0)
+    exact = [random.choice(names) for _ in range(queries)]
+    substrings = [name[1:5].lower() for name in exact]
+    prefixes = [name[:4].lower() for name in exact]
+
+    start = time.perf_counter()
+    all_db_monsters.lookup_monsters_by_name("")
+    all_db_monsters.search_monster_names("")
+    build_time = time.perf_counter() - start
+
+    timings = [
+        ("Exact", lambda name: [monster for monster in all_db_monsters if monster.name.lower() == name.lower()],
+         all_db_monsters.lookup_monsters_by_name, exact),
+        ("Substring", lambda keyword: [monster for monster in all_db_monsters
+                                       if keyword in monster.name.lower() or keyword in (monster.wiki_name or "").lower()],
+         all_db_monsters.search_monster_names, substrings),
+        ("Prefix", lambda prefix: [monster for monster in all_db_monsters if monster.name.lower().startswith(prefix)],
+         all_db_monsters.prefix_search_monster_names, prefixes),
+    ]
+
+    print(f"Index build: {build_time:.3f}s")
+    print(f"{'Lookup':<10} {'Scan':>10} {'Index':>10}")
+    for name, scan, index, searches in timings:
+        print(f"{name:<10} {per_query_time(scan, searches):>8.3f}ms {per_query_time(index, searches):>8.3f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark monster name lookups.")
+    parser.add_argument('--queries',
+                        default=200,
+                        type=int,
+                        required=False,
+                        help='The number of lookups of each type.')
+    args = parser.parse_args()
+    main(args.queries)
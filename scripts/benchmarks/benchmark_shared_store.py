@@ -0,0 +1,87 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark the per-process cost of the items and monsters databases, comparing
+a full load in each process with attaching to a shared memory record store.
+The start-up time, and the memory retained by Python objects after 100
+lookups, are reported for one worker process.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import gc
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import config
+from osrsbox.shared_store import SharedRecordStore
+from osrsbox.items_api.all_items import AllItems
+from osrsbox.monsters_api.all_monsters import AllMonsters
+
+
+def measure(load: Callable, lookups: int) -> tuple:
+    """Return the start-up time, and the memory retained after some lookups, of a database load."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    database = load()
+    startup_time = time.perf_counter() - start
+    entry_ids = database._item_ids if isinstance(database, AllItems) else database._monster_ids
+    entries = [database[entry_id] for entry_id in entry_ids[:lookups]]
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del database, entries
+    return startup_time, retained
+
+
+def main(lookups: int):
+    path_to_items = Path(config.DOCS_PATH / "items-complete.json")
+    path_to_monsters = Path(config.DOCS_PATH / "monsters-complete.json")
+
+    print(f"{'Database':<10} {'Method':<22} {'Start-up':>10} {'Retained':>10}")
+    for name, database_class, path in (("Items", AllItems, path_to_items), ("Monsters", AllMonsters, path_to_monsters)):
+        with SharedRecordStore.from_json_file(path) as shared:
+            startup_time, retained = measure(lambda: database_class(path), lookups)
+            print(f"{name:<10} {'Full load':<22} {startup_time:>9.3f}s {retained / 1024 / 1024:>8.1f}MB")
+
+            # A worker process attaches to the block by name, and only builds the records it reads
+            attached = list()
+
+            def attach():
+                attached.append(SharedRecordStore.attach(shared.name))
+                return database_class(attached[-1].store, lazy=True)
+
+            startup_time, retained = measure(attach, lookups)
+            print(f"{name:<10} {'Attach shared memory':<22} {startup_time:>9.3f}s {retained / 1024 / 1024:>8.1f}MB")
+            gc.collect()
+            attached.pop().close()
+            print(f"{name:<10} {'Shared block size':<22} {'':>10} {shared.block.size / 1024 / 1024:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the shared memory record store.")
+    parser.add_argument('--lookups',
+                        default=100,
+                        type=int,
+                        required=False,
+                        help='The number of records each process reads.')
+    args = parser.parse_args()
+    main(args.lookups)
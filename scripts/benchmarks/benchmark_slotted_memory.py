@@ -0,0 +1,66 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Benchmark the memory used by a fully loaded item and monster database, using
+the default dataclasses compared to the compact slotted dataclasses. Memory is
+measured with tracemalloc, after the JSON file is loaded and released.
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import gc
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+from typing import Tuple
+
+import config
+from osrsbox.items_api.all_items import AllItems
+from osrsbox.monsters_api.all_monsters import AllMonsters
+
+
+def measure(load: Callable) -> Tuple[int, int]:
+    """Return the bytes retained by a loaded database, and the count of entries."""
+    gc.collect()
+    tracemalloc.start()
+    database = load()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, len(database)
+
+
+def main():
+    path_to_items = Path(config.DOCS_PATH / "items-complete.json")
+    path_to_monsters = Path(config.DOCS_PATH / "monsters-complete.json")
+
+    databases = [
+        ("Items", lambda slotted: AllItems(path_to_items, use_snapshot=False, slotted=slotted).all_items),
+        ("Monsters", lambda slotted: AllMonsters(path_to_monsters, slotted=slotted)),
+    ]
+
+    print(f"{'Database':<10} {'Dataclass':>14} {'Slotted':>14} {'Saving':>8}")
+    for name, load in databases:
+        default_size, count = measure(lambda: load(False))
+        slotted_size, _ = measure(lambda: load(True))
+        saving = 1 - slotted_size / default_size
+        print(f"{name:<10} {default_size / count:>8.0f} B/ea {slotted_size / count:>8.0f} B/ea {saving:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,10 +21,10 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
-import json
 from pathlib import Path
 
 import config
+from osrsbox import codec
 
 CACHE_DUMP_TYPES = [
     "items",
@@ -43,7 +43,7 @@ if len(all_cache_items) == 0:
     exit(">>> Could not load item cache files. Exiting.")
 for cache_file in all_cache_items:
     with open(cache_file) as f:
-        data = json.load(f)
+        data = codec.load(f)
         ITEM_DEFINITIONS[str(data["id"])] = data
 
 all_cache_npcs = sorted(Path(config.DATA_CACHE_PATH / "npcs").glob("*.json"),
@@ -53,7 +53,7 @@ if len(all_cache_npcs) == 0:
     exit(">>> Could not load npc cache files. Exiting.")
 for cache_file in all_cache_npcs:
     with open(cache_file) as f:
-        data = json.load(f)
+        data = codec.load(f)
         NPC_DEFINITIONS[str(data["id"])] = data
 
 all_cache_objects = sorted(Path(config.DATA_CACHE_PATH / "objects").glob("*.json"),
@@ -63,5 +63,5 @@ if len(all_cache_objects) == 0:
     exit(">>> Could not load object cache files. Exiting.")
 for cache_file in all_cache_objects:
     with open(cache_file) as f:
-        data = json.load(f)
+        data = codec.load(f)
         OBJECT_DEFINITIONS[str(data["id"])] = data
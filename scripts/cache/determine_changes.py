@@ -77,6 +77,21 @@ class DetermineCacheChanges:
         return unchanged
 
 
+def export_changes(dd: DetermineCacheChanges, out_file_name: Path):
+    """Save the added, removed and changed IDs to a JSON file.
+
+    :param dd: The DetermineCacheChanges object.
+    :param out_file_name: The path to the output JSON file.
+    """
+    changes = {
+        "added": dd.added(),
+        "removed": dd.removed(),
+        "changed": dd.changed()
+    }
+    with open(out_file_name, "w") as f:
+        json.dump(changes, f, indent=4)
+
+
 def items():
     """The main function for determining item changes."""
     # Read in the old items-cache-data.json file
@@ -119,6 +134,9 @@ def items():
                                       old_items[itemID]["name"],
                                       '|'.join(changed_keys)))
 
+    # Save the change set, used by the incremental item build (builders/items/builder.py --incremental)
+    export_changes(dd, Path(config.DATA_ITEMS_PATH / "items-cache-changes.json"))
+
     # # Determine unchanged items
     # # This is commented out, as the results are always large
     # unchanged = dd.unchanged()
@@ -21,14 +21,21 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
-import json
 import collections
 from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Iterable
 
 import config
+from osrsbox import codec
+from osrsbox import snapshot
+from osrsbox import record_store
 from osrsbox import items_api
 from osrsbox import monsters_api
 from osrsbox import prayers_api
+from osrsbox.items_api.item_properties import ItemProperties
+from osrsbox.monsters_api.drop_rarity import write_drop_rarity
 
 
 def generate_items_complete():
@@ -43,15 +50,27 @@ def generate_items_complete():
         json_out = item.construct_json()
         items[item.id] = json_out
 
-    # Save all items to docs/items_complete.json
-    out_fi = Path(config.DOCS_PATH / "items-complete.json")
-    with open(out_fi, "w") as f:
-        json.dump(items, f)
+    # Save all items to docs/items_complete.json and osrsbox/docs/items_complete.json
+    for out_fi in (Path(config.DOCS_PATH / "items-complete.json"),
+                   Path(config.PACKAGE_PATH / "docs" / "items-complete.json")):
+        with open(out_fi, "w") as f:
+            codec.dump(items, f)
+    write_items_artifacts(all_db_items.all_items, items)
 
-    # Save all items to osrsbox/docs/items_complete.json
-    out_fi = Path(config.PACKAGE_PATH / "docs" / "items-complete.json")
-    with open(out_fi, "w") as f:
-        json.dump(items, f)
+
+def write_items_artifacts(item_objects: List[ItemProperties], items: Dict[int, Dict]):
+    """Write the derived files of `docs/items-complete.json`.
+
+    A binary snapshot (items-complete.snapshot) for fast loading, and a record store
+    (items-complete.jsonl and items-complete.idx) for single item lookups. They are
+    only written to `docs`, so they are not shipped in the package.
+
+    :param item_objects: The ItemProperties of every item, in item ID order.
+    :param items: A dictionary of item ID to item JSON, in item ID order.
+    """
+    out_fi = Path(config.DOCS_PATH / "items-complete.json")
+    snapshot.write_snapshot(item_objects, ItemProperties, out_fi)
+    record_store.write_record_store(items.values(), out_fi.with_suffix(record_store.DATA_SUFFIX))
 
 
 def generate_item_slot_files():
@@ -59,22 +78,26 @@ def generate_item_slot_files():
     # Read in the item database content
     all_db_items = items_api.load()
 
-    items = collections.defaultdict(list)
+    items = collections.defaultdict(dict)
 
     # Fetch every equipable item with an item slot value
     for item in all_db_items:
         if item.equipable_by_player:
-            items[item.equipment.slot].append(item)
+            items[item.equipment.slot][item.id] = item.construct_json()
+
+    write_item_slot_files(items)
 
+
+def write_item_slot_files(items: Dict[str, Dict[int, Dict]]):
+    """Write the `docs/items-slot/` JSON files.
+
+    :param items: A dictionary of equipment slot to a dictionary of item ID to item JSON.
+    """
     # Process each item found, and add to an individual file for each equipment slot
     for slot in items:
-        json_out = {}
-        for item in items[slot]:
-            json_out_temp = item.construct_json()
-            json_out[item.id] = json_out_temp
         out_fi = Path(config.DOCS_PATH / "items-json-slot" / f"items-{slot}.json")
         with open(out_fi, "w") as f:
-            json.dump(json_out, f)
+            codec.dump(items[slot], f)
 
 
 def generate_monsters_complete():
@@ -89,15 +112,14 @@ def generate_monsters_complete():
         json_out = monster.construct_json()
         monsters[monster.id] = json_out
 
-    # Save all monsters to docs/monsters-complete.json
-    out_fi = Path(config.DOCS_PATH / "monsters-complete.json")
-    with open(out_fi, "w") as f:
-        json.dump(monsters, f)
+    # Save all monsters to docs/monsters-complete.json and osrsbox/docs/monsters-complete.json
+    for out_fi in (Path(config.DOCS_PATH / "monsters-complete.json"),
+                   Path(config.PACKAGE_PATH / "docs" / "monsters-complete.json")):
+        with open(out_fi, "w") as f:
+            codec.dump(monsters, f)
 
-    # Save all monsters to osrsbox/docs/monsters-complete.json
-    out_fi = Path(config.PACKAGE_PATH / "docs" / "monsters-complete.json")
-    with open(out_fi, "w") as f:
-        json.dump(monsters, f)
+    # The precomputed drop rarity tables (monsters-complete.rarity.json) are only written to docs
+    write_drop_rarity(all_db_monsters, Path(config.DOCS_PATH / "monsters-complete.json"))
 
 
 def generate_prayers_complete():
@@ -115,12 +137,12 @@ def generate_prayers_complete():
     # Save all prayers to docs/prayers-complete.json
     out_fi = Path(config.DOCS_PATH / "prayers-complete.json")
     with open(out_fi, "w") as f:
-        json.dump(prayers, f)
+        codec.dump(prayers, f)
 
     # Save all prayers to osrsbox/docs/prayers-complete.json
     out_fi = Path(config.PACKAGE_PATH / "docs" / "prayers-complete.json")
     with open(out_fi, "w") as f:
-        json.dump(prayers, f)
+        codec.dump(prayers, f)
 
 
 def generate_items_search_file():
@@ -132,28 +154,77 @@ def generate_items_search_file():
     items_search = {}
 
     for item in all_db_items:
-        # Make a temporary dictionary for each item
-        temp_dict = dict()
-
         # Add id, name, type and duplicate status
-        temp_dict["id"] = item.id
-        temp_dict["name"] = item.name
-        temp_dict["type"] = None
-        if item.noted:
-            temp_dict["type"] = "noted"
-        elif item.placeholder:
-            temp_dict["type"] = "placeholder"
-        else:
-            temp_dict["type"] = "normal"
-        temp_dict["duplicate"] = item.duplicate
-
-        # Add temp_dict to all items
-        items_search[item.id] = temp_dict
+        items_search[item.id] = item_search_entry(item.construct_json())
 
     # Save search file to docs/items_complete.json
     out_fi = Path(config.DOCS_PATH / "items-search.json")
     with open(out_fi, "w") as f:
-        json.dump(items_search, f, indent=4)
+        codec.dump(items_search, f, indent=4)
+
+
+def item_search_entry(item_json: Dict) -> Dict:
+    """Return the `docs/items-search.json` entry of an item.
+
+    :param item_json: The item JSON, for example, from ItemProperties.construct_json.
+    :return: A dictionary of the id, name, type and duplicate status.
+    """
+    if item_json["noted"]:
+        item_type = "noted"
+    elif item_json["placeholder"]:
+        item_type = "placeholder"
+    else:
+        item_type = "normal"
+    return {"id": item_json["id"],
+            "name": item_json["name"],
+            "type": item_type,
+            "duplicate": item_json["duplicate"]}
+
+
+def patch_items_files(items: Dict[int, Dict], removed: Iterable[int]):
+    """Patch the item JSON files in place, after an incremental item build.
+
+    Only the rebuilt and removed items are changed, the other items are kept
+    as they are, instead of reading every file in `docs/items-json`.
+
+    :param items: A dictionary of item ID to the JSON of every rebuilt item.
+    :param removed: The IDs of removed items.
+    """
+    removed = {int(item_id) for item_id in removed}
+    patched = set(items) | removed
+
+    # The items-complete.json files, and the snapshot and record store
+    for out_fi in (Path(config.DOCS_PATH / "items-complete.json"),
+                   Path(config.PACKAGE_PATH / "docs" / "items-complete.json")):
+        with open(out_fi) as f:
+            all_items = {int(item_id): item_json for item_id, item_json in codec.load(f).items()}
+        all_items.update(items)
+        all_items = {item_id: all_items[item_id] for item_id in sorted(all_items) if item_id not in removed}
+        with open(out_fi, "w") as f:
+            codec.dump(all_items, f)
+    write_items_artifacts([ItemProperties.from_json(dict(item_json)) for item_json in all_items.values()], all_items)
+
+    # The items-json-slot files, an item can move to another slot
+    slot_items = collections.defaultdict(dict)
+    for slot_fi in Path(config.DOCS_PATH / "items-json-slot").glob("items-*.json"):
+        slot = slot_fi.stem[len("items-"):]
+        with open(slot_fi) as f:
+            slot_items[slot] = {int(item_id): item_json for item_id, item_json in codec.load(f).items()
+                                if int(item_id) not in patched}
+    for item_id, item_json in items.items():
+        if item_json["equipable_by_player"] and item_id not in removed:
+            slot_items[item_json["equipment"]["slot"]][item_id] = item_json
+    write_item_slot_files({slot: {item_id: slot_items[slot][item_id] for item_id in sorted(slot_items[slot])}
+                           for slot in slot_items})
+
+    # The items-search.json file
+    out_fi = Path(config.DOCS_PATH / "items-search.json")
+    with open(out_fi) as f:
+        items_search = {int(item_id): entry for item_id, entry in codec.load(f).items()}
+    items_search.update({item_id: item_search_entry(item_json) for item_id, item_json in items.items()})
+    items_search = {item_id: items_search[item_id] for item_id in sorted(items_search) if item_id not in removed}
+    with open(out_fi, "w") as f:
+        codec.dump(items_search, f, indent=4)
 
 
 def main():
@@ -18,6 +18,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
+import os
 import pytest
 from pathlib import Path
 
@@ -34,3 +35,11 @@ def path_to_docs_dir() -> Path:
 @pytest.fixture(scope="session")
 def path_to_cache_dir() -> Path:
     return TEST_PATH / "cache"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def user_cache_dir(tmp_path_factory) -> Path:
+    # Snapshots of the packaged database are written to the user cache directory, keep them out of the home directory
+    path_to_cache = tmp_path_factory.mktemp("cache")
+    os.environ["XDG_CACHE_HOME"] = str(path_to_cache)
+    return path_to_cache / "osrsbox"
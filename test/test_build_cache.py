@@ -0,0 +1,190 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Tests for module: builders.build_cache
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+import mwparserfromhell
+
+import osrsbox
+from osrsbox import codec
+from builders import build_cache
+from builders.items import builder as items_builder
+from builders.monsters import builder as monsters_builder
+
+
+def _load_module(path: Path, source: str) -> ModuleType:
+    path.write_text(source)
+    spec = importlib.util.spec_from_file_location(path.stem, str(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _sources() -> dict:
+    return {"buy_limits": {"Abyssal whip": 70, "Coins": None},
+            "icons": {"blank": "", "4151": "whip"}}
+
+
+def _record(sources: dict) -> list:
+    """Read some input entries, as a populated item would."""
+    recorders = {name: build_cache.InputRecorder(data) for name, data in sources.items()}
+    recorders["buy_limits"]["Abyssal whip"]
+    "Abyssal whip (or)" in recorders["buy_limits"]
+    recorders["icons"].get("4151")
+    return build_cache.recorded_inputs(recorders)
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    cache = build_cache.BuildCache(tmp_path / "build-cache.db", "version-1")
+    yield cache
+    cache.close()
+
+
+def test_input_recorder_mapping():
+    recorder = build_cache.InputRecorder({"Abyssal whip": 70, "Coins": None})
+    assert recorder["Abyssal whip"] == 70
+    assert recorder.get("Abyssal whop", 10) == 10
+    assert "Coins" in recorder
+    with pytest.raises(KeyError):
+        recorder["Dragon scimitar"]
+
+    # Every key that is read is recorded, including the keys that do not exist
+    assert recorder.keys_read == {"Abyssal whip", "Abyssal whop", "Coins", "Dragon scimitar"}
+    assert not recorder.iterated
+    assert build_cache.recorded_inputs({"buy_limits": recorder}) == [
+        ["buy_limits", "Abyssal whip", build_cache.fingerprint(70)],
+        ["buy_limits", "Abyssal whop", build_cache.MISSING],
+        ["buy_limits", "Coins", build_cache.fingerprint(None)],
+        ["buy_limits", "Dragon scimitar", build_cache.MISSING]]
+
+
+@pytest.mark.parametrize("iterate", [list, len, lambda recorder: list(recorder.items())])
+def test_input_recorder_iterated(iterate):
+    # Iterating reads every entry, so the inputs cannot be recorded
+    recorder = build_cache.InputRecorder({"Abyssal whip": 70})
+    iterate(recorder)
+    assert recorder.iterated
+    assert build_cache.recorded_inputs({"buy_limits": recorder}) is None
+
+
+def test_build_cache_hit_and_miss(cache: build_cache.BuildCache):
+    sources = _sources()
+    assert cache.get("4151", sources) is None
+    assert cache.inputs("4151") is None
+
+    inputs = _record(sources)
+    cache.put("4151", inputs, codec.dumps({"id": 4151, "name": "Abyssal whip"}))
+    assert cache.get("4151", sources) == {"id": 4151, "name": "Abyssal whip"}
+    assert cache.inputs("4151") == inputs
+    assert cache.get("995", sources) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_build_cache_recorded_input_changes(cache: build_cache.BuildCache):
+    cache.put("4151", _record(_sources()), codec.dumps({"id": 4151}))
+
+    # An entry that was read changes
+    sources = _sources()
+    sources["buy_limits"]["Abyssal whip"] = 100
+    assert cache.get("4151", sources) is None
+
+    # An entry that was read when it did not exist is added
+    sources = _sources()
+    sources["buy_limits"]["Abyssal whip (or)"] = 70
+    assert cache.get("4151", sources) is None
+
+    # A recorded input is missing
+    sources = _sources()
+    del sources["icons"]
+    assert cache.get("4151", sources) is None
+
+    # An entry that was not read changes
+    sources = _sources()
+    sources["buy_limits"]["Coins"] = 1
+    sources["icons"]["995"] = "coins"
+    assert cache.get("4151", sources) == {"id": 4151}
+
+
+def test_build_cache_version(tmp_path: Path):
+    path_to_database = tmp_path / "build-cache.db"
+    cache = build_cache.BuildCache(path_to_database, "version-1")
+    cache.put("4151", _record(_sources()), codec.dumps({"id": 4151}))
+    cache.close()
+
+    # Entries are kept when the database is opened again, with the same version
+    cache = build_cache.BuildCache(path_to_database, "version-1")
+    assert cache.get("4151", _sources()) == {"id": 4151}
+    cache.close()
+
+    cache = build_cache.BuildCache(path_to_database, "version-2")
+    assert cache.get("4151", _sources()) is None
+    assert cache.inputs("4151") is None
+    cache.close()
+
+
+def test_code_version(tmp_path: Path):
+    module = _load_module(tmp_path / "cached_module.py", "VALUE = 1\n")
+    schema = tmp_path / "schema.json"
+    schema.write_text('{"id": {"type": "integer"}}')
+
+    version = build_cache.code_version(module, data_files=[schema])
+    assert version == build_cache.code_version(module, data_files=[schema])
+    assert version != build_cache.code_version(module)
+
+    # The version changes when a source file changes
+    module = _load_module(tmp_path / "cached_module.py", "VALUE = 2\n")
+    assert build_cache.code_version(module, data_files=[schema]) != version
+
+    # The version changes when a data file changes
+    module = _load_module(tmp_path / "cached_module.py", "VALUE = 1\n")
+    assert build_cache.code_version(module, data_files=[schema]) == version
+    schema.write_text('{"id": {"type": "string"}}')
+    assert build_cache.code_version(module, data_files=[schema]) != version
+
+
+@pytest.mark.parametrize("library", [mwparserfromhell, osrsbox])
+def test_code_version_library_versions(tmp_path: Path, monkeypatch, library: ModuleType):
+    # The version changes when the wikitext parser, or osrsbox, is upgraded
+    module = _load_module(tmp_path / "cached_module.py", "VALUE = 1\n")
+    version = build_cache.code_version(module)
+    monkeypatch.setattr(library, "__version__", library.__version__ + ".post1")
+    assert build_cache.code_version(module) != version
+
+
+@pytest.mark.parametrize("builder_module", [items_builder, monsters_builder])
+def test_builder_cache_version_schema(builder_module: ModuleType, tmp_path: Path, monkeypatch):
+    # Cached entries are not validated again, so a changed schema is a cache miss
+    schema = tmp_path / "schema.json"
+    monkeypatch.setattr(builder_module, "SCHEMA_FILE", schema)
+    versions = list()
+    for schema_text in ('{"id": {"type": "integer"}}', '{"id": {"type": "string"}}'):
+        schema.write_text(schema_text)
+        builder = builder_module.Builder.__new__(builder_module.Builder)
+        builder.open_build_cache(tmp_path / "build-cache.db")
+        versions.append(builder.build_cache.version)
+        builder.build_cache.close()
+    assert versions[0] != versions[1]
@@ -0,0 +1,82 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Tests for module: osrsbox.codec
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from osrsbox import codec
+from osrsbox.items_api import all_items
+from osrsbox.monsters_api import all_monsters
+
+
+@pytest.fixture
+def restore_backend():
+    backend = codec.get_backend()
+    yield
+    codec.set_backend(backend)
+
+
+@pytest.mark.parametrize("backend", codec.available_backends())
+def test_codec_output_bytes_match(path_to_docs_dir: Path, tmp_path: Path, backend: str, restore_backend):
+    codec.set_backend(backend)
+    assert codec.get_backend() == backend
+
+    for file_name in ("items-complete.json", "monsters-complete.json"):
+        raw = (path_to_docs_dir / file_name).read_bytes()
+        expected = json.loads(raw)
+        loaded = codec.loads(raw)
+        assert loaded == expected
+        assert list(loaded) == list(expected)
+        with open(path_to_docs_dir / file_name) as f:
+            assert codec.load(f) == expected
+
+        assert codec.dumps(loaded) == json.dumps(expected)
+        assert codec.dumps(loaded, indent=4) == json.dumps(expected, indent=4)
+
+    all_db_items = all_items.AllItems(path_to_docs_dir / "items-complete.json", use_snapshot=False)
+    all_db_monsters = all_monsters.AllMonsters(path_to_docs_dir / "monsters-complete.json")
+    for entry in (all_db_items[4151], all_db_monsters.all_monsters[0]):
+        for pretty in (True, False):
+            entry.export_json(pretty, tmp_path)
+            exported = (tmp_path / f"{entry.id}.json").read_text()
+            assert exported == json.dumps(entry.construct_json(), indent=4 if pretty else None)
+
+
+def test_codec_set_backend_not_installed(restore_backend):
+    with pytest.raises(ValueError):
+        codec.set_backend("not-a-backend")
+
+
+def test_codec_environment_backend(restore_backend, monkeypatch):
+    monkeypatch.setenv("OSRSBOX_JSON_BACKEND", "json")
+    codec._set_environment_backend()
+    assert codec.get_backend() == "json"
+
+    # A backend that is not installed does not stop osrsbox from importing
+    codec.set_backend(codec.available_backends()[0])
+    monkeypatch.setenv("OSRSBOX_JSON_BACKEND", "not-a-backend")
+    with pytest.warns(UserWarning, match="not-a-backend"):
+        codec._set_environment_backend()
+    assert codec.get_backend() == "json"
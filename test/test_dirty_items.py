@@ -0,0 +1,171 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Tests for module: builders.items.dirty_items
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from builders import build_cache
+from builders.items import dirty_items
+
+PAGE_TITLES = {"Bronze axe": "2021-01-01T00:00:00Z", "Iron axe": "2021-01-01T00:00:00Z",
+               "Coins": "2021-01-01T00:00:00Z", "Steel axe": "2021-01-01T00:00:00Z"}
+
+
+def _cache_data(name: str, linked_id_item: int = None, linked_id_noted: int = None, noted: bool = False) -> dict:
+    return {"name": name, "linked_id_item": linked_id_item, "linked_id_noted": linked_id_noted,
+            "linked_id_placeholder": None, "noted": noted, "placeholder": False}
+
+
+def _keys(**keys) -> dict:
+    return {name: keys.get(name, []) for name in dirty_items.AUXILIARY_INPUTS}
+
+
+def _fake_builder() -> SimpleNamespace:
+    builder = SimpleNamespace(
+        all_items_cache_data={"1": _cache_data("Bronze axe", linked_id_noted=2),
+                              "2": _cache_data("Bronze axe", linked_id_item=1, noted=True),
+                              "3": _cache_data("Iron axe"),
+                              "4": _cache_data("Coins"),
+                              "5": _cache_data("Coins"),
+                              "6": _cache_data("Steel axe")},
+        all_wikitext_processed={"1": ["Bronze axe", "{{Infobox Item}}"]},
+        all_db_items={"6": {"name": "Steel axe", "wiki_url": "https://oldschool.runescape.wiki/w/Steel_axe"}},
+        unalchable=dict(),
+        buy_limits={"Bronze axe": 40, "Coins": None},
+        skill_requirements=dict(),
+        weapon_stances={"axe": ["chop"]},
+        icons={"blank": "", "1": "axe"},
+        duplicates={"2": {"duplicate": True}},
+        item_inputs={"1": _keys(buy_limits=["Bronze axe"], weapon_stances=["axe"], icons=["1"]),
+                     "2": _keys(icons=["blank"], duplicates=["2"]),
+                     "3": _keys(unalchable=["Iron axe"], icons=["blank"]),
+                     "4": _keys(buy_limits=["Coins"], icons=["blank"]),
+                     "5": _keys(icons=["blank"]),
+                     "6": _keys(icons=["blank"])})
+    builder.item_ids = lambda: list(builder.all_items_cache_data)
+    return builder
+
+
+def _dirty(builder: SimpleNamespace, state: dict, cache_changes: dict = None, page_titles: dict = PAGE_TITLES):
+    cache_changes = cache_changes or {"added": [], "removed": [], "changed": []}
+    return dirty_items.dirty_item_ids(builder, cache_changes, state, page_titles)
+
+
+def test_changed_keys():
+    assert dirty_items.changed_keys({"a": 1, "b": 2, "c": 3}, {"a": 1, "b": 5, "d": 4}) == ["b", "c", "d"]
+    assert dirty_items.changed_keys({}, {}) == []
+
+
+def test_linked_variants():
+    # The noted item is linked from both items
+    variants = dirty_items.linked_variants(_fake_builder().all_items_cache_data)
+    assert {item_id: set(variant_ids) for item_id, variant_ids in variants.items()} == {"1": {"2"}}
+
+
+def test_auxiliary_keys():
+    # The keys are recorded by an InputRecorder, including the lookups of missing entries
+    buy_limits = build_cache.InputRecorder({"Bronze axe": 40})
+    unalchable = build_cache.InputRecorder(dict())
+    assert buy_limits["Bronze axe"] == 40
+    assert "Bronze axe" not in unalchable
+    inputs_read = build_cache.recorded_inputs({"buy_limits": buy_limits, "unalchable": unalchable,
+                                               "all_wikitext_raw": build_cache.InputRecorder({"1": "text"})})
+    assert dirty_items.auxiliary_keys(inputs_read, ["1"]) == _keys(buy_limits=["Bronze axe"], unalchable=["Bronze axe"],
+                                                                   duplicates=["1"])
+    assert dirty_items.auxiliary_keys(None, ["1"]) is None
+
+
+def test_dirty_item_ids_unchanged():
+    builder = _fake_builder()
+    state = dirty_items.build_state(builder, PAGE_TITLES, builder.item_inputs)
+    assert _dirty(builder, state) == ([], [])
+
+
+def test_dirty_item_ids_cache_changes():
+    builder = _fake_builder()
+    state = dirty_items.build_state(builder, PAGE_TITLES, builder.item_inputs)
+    # The noted variant of a changed item is dirty, the removed items are only the items not in the cache
+    changes = {"added": [], "removed": [7, 3], "changed": [1]}
+    assert _dirty(builder, state, changes) == (["1", "2"], ["7"])
+
+
+def test_dirty_item_ids_page_titles():
+    builder = _fake_builder()
+    state = dirty_items.build_state(builder, PAGE_TITLES, builder.item_inputs)
+    # The page title of an item without wikitext is the cache name, or the page of the wiki_url
+    assert _dirty(builder, state, page_titles=dict(PAGE_TITLES, **{"Iron axe": "2021-02-01T00:00:00Z"})) == (["3"], [])
+    assert _dirty(builder, state, page_titles=dict(PAGE_TITLES, **{"Steel axe": "2021-02-01T00:00:00Z"})) == (["6"], [])
+
+
+def test_dirty_item_ids_auxiliary_inputs():
+    builder = _fake_builder()
+    state = dirty_items.build_state(builder, PAGE_TITLES, builder.item_inputs)
+
+    # A changed entry that was read, items with the same name are dirty too
+    builder.buy_limits["Coins"] = 10000
+    assert _dirty(builder, state) == (["4", "5"], [])
+
+    # An added entry, that was looked up when missing
+    builder = _fake_builder()
+    builder.unalchable["Iron axe"] = True
+    assert _dirty(builder, state) == (["3"], [])
+
+    # An entry that no item read
+    builder = _fake_builder()
+    builder.skill_requirements["9"] = {"attack": 1}
+    assert _dirty(builder, state) == ([], [])
+
+
+def test_dirty_item_ids_unrecorded_inputs():
+    builder = _fake_builder()
+    item_inputs = dict(builder.item_inputs, **{"3": None})
+    del item_inputs["6"]
+    state = dirty_items.build_state(builder, PAGE_TITLES, item_inputs)
+    assert _dirty(builder, state) == (["3", "6"], [])
+
+
+def test_write_build_state(tmp_path: Path):
+    path_to_page_titles = tmp_path / "items-wiki-page-titles.json"
+    path_to_page_titles.write_text('{"Coins": "2021-01-01T00:00:00Z"}')
+    path_to_state = tmp_path / "items-build-state.json"
+    with pytest.raises(ValueError):
+        dirty_items.load_build_state(path_to_state)
+
+    builder = _fake_builder()
+    builder.item_inputs = {"1": _keys(icons=["1"]), "9": _keys()}
+    dirty_items.write_build_state(builder, path_to_state, path_to_page_titles)
+
+    # An incremental build keeps the recorded inputs of the other items, of items still in the cache
+    builder.item_inputs = {"3": _keys(icons=["blank"])}
+    dirty_items.write_build_state(builder, path_to_state, path_to_page_titles)
+    state = dirty_items.load_build_state(path_to_state)
+    assert state["wiki_page_titles"] == {"Coins": "2021-01-01T00:00:00Z"}
+    assert state["item_inputs"] == {"1": _keys(icons=["1"]), "3": _keys(icons=["blank"])}
+    assert state["auxiliary"]["buy_limits"] == {"Bronze axe": build_cache.fingerprint(40),
+                                                "Coins": build_cache.fingerprint(None)}
+
+
+def test_load_cache_changes_missing(tmp_path: Path):
+    assert dirty_items.load_cache_changes(tmp_path / "items-cache-changes.json") == {"added": [], "removed": [], "changed": []}
@@ -22,9 +22,20 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
 import os
+import json
+import pickle
+from types import SimpleNamespace
 from pathlib import Path
 
+import pytest
+
+import osrsbox
+from osrsbox import snapshot
+from osrsbox import typed_decoder
+from osrsbox import record_store
 from osrsbox.items_api import all_items
+from osrsbox.items_api.item_properties import ItemProperties
+from osrsbox.items_api.item_properties import SlottedItemProperties
 
 # The current number of items being loaded from the db
 NUMBER_OF_ITEMS = 24735
@@ -44,3 +55,343 @@ def test_all_items_load_items_complete(path_to_docs_dir: Path):
 
     all_db_items = all_items.AllItems(str(path_to_items_complete))
     assert len(all_db_items.all_items) == NUMBER_OF_ITEMS
+
+
+def test_all_items_load_items_snapshot(path_to_docs_dir: Path, tmp_path: Path):
+    # Write a small items-complete.json file, and a snapshot next to it
+    all_db_items = all_items.AllItems(path_to_docs_dir / "items-complete.json", use_snapshot=False)
+    items = {item.id: item.construct_json() for item in all_db_items.all_items[:100]}
+    path_to_items_complete = tmp_path / "items-complete.json"
+    with open(path_to_items_complete, "w") as f:
+        json.dump(items, f)
+
+    json_items = all_items.AllItems(path_to_items_complete)
+    snapshot.write_snapshot(json_items.all_items, ItemProperties, path_to_items_complete)
+    assert snapshot.load_snapshot(ItemProperties, path_to_items_complete) == json_items.all_items
+
+    snapshot_items = all_items.AllItems(path_to_items_complete, use_snapshot=True)
+    assert snapshot_items.all_items == json_items.all_items
+    assert snapshot_items[json_items.all_items[0].id] == json_items.all_items[0]
+
+    # The snapshot of a JSON file that is not packaged is only loaded when requested
+    snapshot.write_snapshot(json_items.all_items[:1], ItemProperties, path_to_items_complete)
+    assert len(all_items.AllItems(path_to_items_complete)) == 100
+    assert len(all_items.AllItems(path_to_items_complete, use_snapshot=True)) == 1
+
+    # A changed JSON file makes the snapshot stale
+    del items[json_items.all_items[0].id]
+    with open(path_to_items_complete, "w") as f:
+        json.dump(items, f)
+    assert snapshot.load_snapshot(ItemProperties, path_to_items_complete) is None
+    assert len(all_items.AllItems(path_to_items_complete, use_snapshot=True)) == 99
+
+
+def test_all_items_packaged_snapshot_first_use(path_to_docs_dir: Path, tmp_path: Path, monkeypatch):
+    all_db_items = all_items.AllItems(path_to_docs_dir / "items-complete.json", use_snapshot=False)
+    items = {item.id: item.construct_json() for item in all_db_items.all_items[:100]}
+    path_to_items_complete = tmp_path / "items-complete.json"
+    with open(path_to_items_complete, "w") as f:
+        json.dump(items, f)
+    monkeypatch.setattr(all_items, "PATH_TO_ITEMS_COMPLETE_JSON", path_to_items_complete)
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    # The packaged JSON file writes its snapshot to the user cache directory on first use, and loads it after
+    json_items = all_items.AllItems(path_to_items_complete)
+    path_to_snapshot = tmp_path / "cache" / "osrsbox" / f"items-complete-ItemProperties-{osrsbox.__version__}.snapshot"
+    assert snapshot.cached_snapshot_path(path_to_items_complete, ItemProperties) == path_to_snapshot
+    assert not snapshot.snapshot_path_for(path_to_items_complete).exists()
+    assert snapshot.load_snapshot(ItemProperties, path_to_items_complete, path_to_snapshot) == json_items.all_items
+    assert all_items.AllItems(path_to_items_complete).all_items == json_items.all_items
+
+    # A snapshot that cannot be written is a warning
+    path_to_snapshot.unlink()
+    (tmp_path / "cache" / "osrsbox").rmdir()
+    (tmp_path / "cache" / "osrsbox").write_text("")
+    with pytest.warns(UserWarning, match="Cannot write the items snapshot"):
+        assert all_items.AllItems(path_to_items_complete).all_items == json_items.all_items
+
+
+def test_snapshot_atomic_write(tmp_path: Path):
+    path_to_file = tmp_path / "items-complete.snapshot"
+    with snapshot.atomic_write(path_to_file) as f:
+        f.write(b"complete")
+
+    # An interrupted write leaves the old file, and no temporary file
+    with pytest.raises(KeyboardInterrupt):
+        with snapshot.atomic_write(path_to_file) as f:
+            f.write(b"partial")
+            raise KeyboardInterrupt
+    assert path_to_file.read_bytes() == b"complete"
+    assert [path.name for path in tmp_path.iterdir()] == ["items-complete.snapshot"]
+
+
+def test_all_items_lazy(path_to_docs_dir: Path):
+    path_to_items_complete = path_to_docs_dir / "items-complete.json"
+    eager_items = all_items.AllItems(path_to_items_complete, use_snapshot=False)
+    lazy_items = all_items.AllItems(path_to_items_complete, lazy=True)
+
+    # Length and ID membership do not build any items
+    assert len(lazy_items) == NUMBER_OF_ITEMS
+    assert 4151 in lazy_items
+    assert -1 not in lazy_items
+    assert len(lazy_items.all_items_dict) == 0
+
+    # Lookups build one item, and memoize it
+    item = lazy_items.lookup_by_item_id(4151)
+    assert item == eager_items[4151]
+    assert lazy_items[4151] is item
+    assert len(lazy_items.all_items_dict) == 1
+
+    # Iteration builds every item, in ID order
+    assert list(lazy_items) == eager_items.all_items
+    assert lazy_items.all_items == eager_items.all_items
+
+
+def test_all_items_load_items_record_store(path_to_docs_dir: Path, tmp_path: Path):
+    all_db_items = all_items.AllItems(path_to_docs_dir / "items-complete.json", use_snapshot=False)
+    path_to_data_file = tmp_path / "items-complete.jsonl"
+    record_store.write_record_store((item.construct_json() for item in all_db_items), path_to_data_file)
+
+    with record_store.RecordStore.open(path_to_data_file) as store:
+        assert len(store) == NUMBER_OF_ITEMS
+        assert 4151 in store
+        assert -1 not in store
+        assert ItemProperties.from_json(store[4151]) == all_db_items[4151]
+
+    eager_items = all_items.AllItems(path_to_data_file)
+    assert eager_items.all_items == all_db_items.all_items
+
+    lazy_items = all_items.AllItems(path_to_data_file, lazy=True)
+    assert len(lazy_items) == NUMBER_OF_ITEMS
+    assert 4151 in lazy_items
+    assert lazy_items.lookup_by_item_id(4151) == all_db_items[4151]
+    assert len(lazy_items.all_items_dict) == 1
+
+    # A data file with another modification time, and the same contents, is verified and opened
+    stat = path_to_data_file.stat()
+    os.utime(path_to_data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    with record_store.RecordStore.open(path_to_data_file) as store:
+        assert 4151 in store
+
+    # An edited data file of the same size does not match the index
+    data = bytearray(path_to_data_file.read_bytes())
+    position = data.index(b'"Abyssal whip"')
+    data[position:position + 14] = b'"Abyssal whop"'
+    path_to_data_file.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        record_store.RecordStore.open(path_to_data_file)
+
+    # The same edit, with the modification time of the index, is only found by a full verification
+    os.utime(path_to_data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    record_store.RecordStore.open(path_to_data_file).close()
+    with pytest.raises(ValueError):
+        record_store.RecordStore.open(path_to_data_file, verify=True)
+
+
+def test_all_items_lookup_by_item_name(path_to_docs_dir: Path):
+    path_to_items_complete = path_to_docs_dir / "items-complete.json"
+    all_db_items = all_items.AllItems(path_to_items_complete)
+    lazy_items = all_items.AllItems(path_to_items_complete, lazy=True)
+
+    for db in (all_db_items, lazy_items):
+        assert db.lookup_by_item_name("Abyssal whip").id == 4151
+        assert db.lookup_by_item_name("ABYSSAL WHIP").id == 4151
+        assert db.lookup_by_item_name("abyssal whip", use_wiki_name=True).id == 4151
+        with pytest.raises(ValueError):
+            db.lookup_by_item_name("Not an item name")
+
+    # The first item (lowest ID) with a matching name is returned
+    for item in all_db_items:
+        if item.name.lower() == "coins":
+            assert all_db_items.lookup_by_item_name("Coins") is item
+            break
+
+    # Name lookups in lazy mode only build the returned item
+    assert len(lazy_items.all_items_dict) == 1
+
+
+def test_all_items_search_item_names(path_to_docs_dir: Path):
+    all_db_items = all_items.AllItems(path_to_docs_dir / "items-complete.json")
+
+    for keyword in ("", "a", "Wh", "whip", "Dragon scim", "(p++)", "potion(4)", "not an item name"):
+        # Compare against a full scan of every item name and wiki_name
+        expected = [item for item in all_db_items
+                    if keyword.lower() in item.name.lower() or
+                    (item.wiki_name and keyword.lower() in item.wiki_name.lower())]
+        assert all_db_items.search_item_names(keyword) == expected
+        assert all_db_items.search_item_names(keyword, limit=5, offset=2) == expected[2:7]
+
+
+def test_all_items_fuzzy_search_item_names(path_to_docs_dir: Path):
+    all_db_items = all_items.AllItems(path_to_docs_dir / "items-complete.json")
+
+    assert all_db_items.fuzzy_search_item_names("Abyssal whip")[0].id == 4151
+    assert all_db_items.fuzzy_search_item_names("abyssal whp")[0].id == 4151
+    assert all_db_items.fuzzy_search_item_names("dragon scimmy")[0].name == "Dragon scimitar"
+    assert all_db_items.fuzzy_search_item_names("rune platebdy")[0].name == "Rune platebody"
+    assert all_db_items.fuzzy_search_item_names("d scim")[0].name == "Dragon scimitar"
+    assert all_db_items.fuzzy_search_item_names("zzzzzz") == []
+
+    results = all_db_items.fuzzy_search_item_names("shark", limit=3)
+    assert len(results) == 3
+    assert not any(item.duplicate for item in results)
+    assert any(item.duplicate for item in all_db_items.fuzzy_search_item_names("shark", limit=50, include_duplicates=True))
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_all_items_filter_items(path_to_docs_dir: Path, lazy: bool):
+    all_db_items = all_items.AllItems(path_to_docs_dir / "items-complete.json", lazy=lazy)
+
+    expected = [item.id for item in all_db_items.all_items
+                if item.equipable_by_player and not item.members and item.equipment.slot in ("weapon", "2h")]
+    results = all_db_items.filter_items({"equipment.slot": ("weapon", "2h")}, equipable_by_player=True, members=False)
+    assert [item.id for item in results] == expected
+
+    f2p_2h = all_db_items.filter_items({"equipment.slot": "2h"}, members=False)
+    assert f2p_2h
+    assert all(item.equipment.slot == "2h" and not item.members for item in f2p_2h)
+
+    bows = all_db_items.filter_items({"weapon.weapon_type": "bow"}, tradeable_on_ge=True)
+    assert bows
+    assert all(item.weapon.weapon_type == "bow" and item.tradeable_on_ge for item in bows)
+
+    assert all_db_items.filter_items({"equipment.slot": "not a slot"}) == []
+    assert len(all_db_items.filter_items()) == len(all_db_items)
+
+
+def test_all_items_equipment_columns(path_to_docs_dir: Path):
+    np = pytest.importorskip("numpy")
+    all_db_items = all_items.AllItems(path_to_docs_dir / "items-complete.json")
+    columns = all_db_items.equipment_columns()
+    assert columns is all_db_items.equipment_columns()
+
+    equipable = [item for item in all_db_items.all_items if item.equipable_by_player and item.equipment]
+    assert columns.ids.tolist() == [item.id for item in equipable]
+    assert columns.column("attack_slash").tolist() == [item.equipment.attack_slash for item in equipable]
+
+    mask = columns.mask(slot=("weapon", "2h"), members=False, minimums={"attack_slash": 10})
+    expected = [item.id for item in equipable
+                if item.equipment.slot in ("weapon", "2h") and not item.members and item.equipment.attack_slash >= 10]
+    assert columns.ids[mask].tolist() == expected
+
+    weights = {"attack_slash": 1, "melee_strength": 1.5}
+    scores = columns.weighted_scores(weights)
+    assert np.allclose(scores, [item.equipment.attack_slash + 1.5 * item.equipment.melee_strength for item in equipable])
+
+    ranked = sorted(equipable, key=lambda item: (-item.equipment.prayer, item.id))
+    assert columns.top_k("prayer", 5).tolist() == [item.id for item in ranked[:5]]
+    assert len(columns.top_k(scores, 5, mask=mask)) == 5
+
+    with pytest.raises(ValueError):
+        columns.column("slot")
+
+
+def test_gear_optimizer_best_loadouts(path_to_docs_dir: Path):
+    pytest.importorskip("numpy")
+    from itertools import product
+    from osrsbox.items_api.gear_optimizer import GearOptimizer
+    from osrsbox.items_api.gear_optimizer import ARMOUR_SLOTS
+
+    all_db_items = all_items.AllItems(path_to_docs_dir / "items-complete.json")
+    optimizer = GearOptimizer(all_db_items, max_loadouts=5)
+    weights = {"attack_slash": 1, "melee_strength": 1.5, "defence_slash": 0.2}
+    skills = {"attack": 60, "strength": 60, "defence": 40}
+
+    # Brute force reference: the best 2 options of each slot (or an empty slot), from every allowed item
+    def allowed(item):
+        requirements = item.equipment.requirements or dict()
+        return not item.members and all(requirements.get(skill, 1) <= level for skill, level in skills.items())
+
+    def score(item):
+        return sum(getattr(item.equipment, stat) * weight for stat, weight in weights.items())
+
+    slot_scores = {slot: [0.0] for slot in ARMOUR_SLOTS + ("weapon", "shield", "2h")}
+    for item in all_db_items:
+        if item.equipable_by_player and item.equipment and allowed(item):
+            slot_scores[item.equipment.slot].append(score(item))
+    best = {slot: sorted(scores, reverse=True)[:2] for slot, scores in slot_scores.items()}
+    weapon = sorted([w + s for w, s in product(best["weapon"], best["shield"])] + best["2h"], reverse=True)[:2]
+    expected = sorted((sum(combination) for combination in product(*[best[slot] for slot in ARMOUR_SLOTS], weapon)),
+                      reverse=True)[:2]
+
+    loadouts = optimizer.best_loadouts(weights, skills=skills, members=False, n=2)
+    assert [loadout.score for loadout in loadouts] == pytest.approx(expected)
+    for loadout in loadouts:
+        assert loadout.score == pytest.approx(sum(score(item) for item in loadout.items.values()))
+        assert all(allowed(item) and item.equipment.slot == slot for slot, item in loadout.items.items())
+        assert not ("2h" in loadout.items and ("weapon" in loadout.items or "shield" in loadout.items))
+
+    assert len(optimizer.best_loadouts(weights, n=5)) == 5
+    with pytest.raises(ValueError):
+        optimizer.best_loadouts(weights, n=6)
+
+
+def test_all_items_slotted(path_to_docs_dir: Path):
+    path_to_items_complete = path_to_docs_dir / "items-complete.json"
+    all_db_items = all_items.AllItems(path_to_items_complete)
+    slotted_db_items = all_items.AllItems(path_to_items_complete, slotted=True)
+
+    whip = slotted_db_items[4151]
+    assert isinstance(whip, SlottedItemProperties)
+    assert not hasattr(whip, "__dict__")
+    assert not hasattr(whip.equipment, "__dict__")
+    assert not hasattr(whip.weapon, "__dict__")
+    assert [item.construct_json() for item in slotted_db_items] == [item.construct_json() for item in all_db_items]
+    assert pickle.loads(pickle.dumps(whip)) == whip
+    assert whip.equipment.slot is slotted_db_items.lookup_by_item_name("Dragon scimitar").equipment.slot
+
+
+@pytest.mark.parametrize("item_class", [ItemProperties, SlottedItemProperties])
+def test_typed_decoder_decode_entries(path_to_docs_dir: Path, item_class: type):
+    raw_items = (path_to_docs_dir / "items-complete.json").read_bytes()
+    expected = [item_class.from_json(item) for item in json.loads(raw_items).values()]
+
+    items = typed_decoder.decode_entries(raw_items, item_class)
+    assert items == expected
+    assert isinstance(items[0], item_class)
+    assert [typed_decoder.generated_decoder(item_class)(item) for item in json.loads(raw_items).values()] == expected
+
+    with pytest.raises(ValueError):
+        typed_decoder.decode_entries(b'{"0": {"id": 0}}', item_class)
+
+
+@pytest.mark.parametrize("item_class", [ItemProperties, SlottedItemProperties])
+def test_typed_decoder_generated_decoders(path_to_docs_dir: Path, item_class: type, monkeypatch):
+    # Use the exec generated decoders, as when msgspec is not installed
+    monkeypatch.setattr(typed_decoder, "msgspec", None)
+    raw_items = (path_to_docs_dir / "items-complete.json").read_bytes()
+    expected = [item_class.from_json(item) for item in json.loads(raw_items).values()]
+
+    items = typed_decoder.decode_entries(raw_items, item_class)
+    assert len(items) == NUMBER_OF_ITEMS
+    assert items == expected
+    assert [item.construct_json() for item in items] == [item.construct_json() for item in expected]
+    assert all(type(item) is item_class for item in items)
+
+    # Nullable integers are kept as None, the same as from_json
+    for name in ("stacked", "lowalch", "highalch"):
+        assert {type(getattr(item, name)) for item in items} == {int, type(None)}
+
+    # Repeated strings are interned, the same as from_json
+    whip, scimitar = (next(item for item in items if item.id == item_id) for item_id in (4151, 4587))
+    assert whip.equipment.slot is scimitar.equipment.slot
+
+    with pytest.raises(ValueError):
+        typed_decoder.decode_entries(b'{"0": {"id": 0}}', item_class)
+
+
+def test_typed_decoder_unsupported_msgspec(path_to_docs_dir: Path, monkeypatch):
+    class OldDecoder:
+        def __init__(self, decode_type):
+            raise TypeError("Type 'ItemProperties' is not supported")
+
+    # An old msgspec release that cannot decode dataclasses falls back to from_json
+    monkeypatch.setattr(typed_decoder, "msgspec", SimpleNamespace(json=SimpleNamespace(Decoder=OldDecoder)))
+    monkeypatch.setattr(typed_decoder, "_msgspec_decoders", dict())
+    with pytest.raises(ValueError):
+        typed_decoder.decode_entries(b'{"0": {"id": 0}}', ItemProperties)
+
+    all_db_items = all_items.AllItems(path_to_docs_dir / "items-complete.json", use_snapshot=False)
+    assert len(all_db_items) == NUMBER_OF_ITEMS
+    assert all_db_items[4151].name == "Abyssal whip"
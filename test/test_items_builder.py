@@ -0,0 +1,200 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Tests for module: builders.items.builder
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import multiprocessing
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from builders.items import builder
+from builders.items import dirty_items
+from builders.items import known_items
+
+requires_fork = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                                   reason="The fake builder inputs are only shared with forked workers")
+
+
+class FakeBuildItem:
+    """A stand-in for BuildItem, that populates an item from its cache name and wikitext."""
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+        self.item_dict = dict()
+
+    def preprocessing(self):
+        return {"status": self.item_id in self.all_wikitext_processed}
+
+    def populate_wiki_item(self):
+        self.item_dict = {"id": int(self.item_id),
+                          "name": self.all_items_cache_data[self.item_id]["name"],
+                          "wiki_name": self.all_wikitext_processed[self.item_id]}
+
+    def populate_non_wiki_item(self):
+        self.item_dict = {"id": int(self.item_id),
+                          "name": self.all_items_cache_data[self.item_id]["name"],
+                          "wiki_name": None}
+        # Auxiliary inputs are looked up by the name, and the item ID
+        self.item_dict["buy_limit"] = self.buy_limits.get(self.item_dict["name"])
+        self.item_dict["icon"] = self.icons[self.item_id] if self.item_id in self.icons else self.icons["blank"]
+
+    def check_duplicate_item(self):
+        item_properties = SimpleNamespace(**self.item_dict)
+        if self.item_id in self.duplicates:
+            self.item_dict["duplicate"] = self.duplicates[self.item_id]["duplicate"]
+            return None
+        self.item_dict["duplicate"] = self.known_items.find_duplicate(item_properties) is not None
+        return item_properties
+
+    def compare_new_vs_old_item(self):
+        print(f"Comparing: {self.item_id}")
+
+    def export_item_to_json(self):
+        print(f"Exporting: {self.item_id}")
+
+    def validate_item(self):
+        if self.item_dict["name"] == "Broken item":
+            print({"name": ["invalid"]})
+            exit(1)
+
+
+def _fake_builder(names: dict, wikitext: dict) -> builder.Builder:
+    fake = builder.Builder.__new__(builder.Builder)
+    fake.verbose = False
+    fake.compare = True
+    fake.export = True
+    fake.validate = True
+    fake.all_items_cache_data = {item_id: {"name": name, "linked_id_item": None, "linked_id_noted": None,
+                                           "linked_id_placeholder": None, "noted": False, "placeholder": False}
+                                 for item_id, name in names.items()}
+    fake.all_wikitext_processed = wikitext
+    for name in builder.POPULATE_INPUTS + ("all_db_items", "duplicates", "schema_data"):
+        if not hasattr(fake, name):
+            setattr(fake, name, dict())
+    fake.icons = {"blank": "", "3": "axe"}
+    fake.buy_limits = {"Iron axe": 40}
+    fake.duplicates = {"2": {"duplicate": True}}
+    fake.known_items = known_items.KnownItems()
+    fake.build_cache = None
+    fake.item_inputs = dict()
+    return fake
+
+
+@pytest.fixture
+def fake_build_item(monkeypatch):
+    monkeypatch.setattr(builder.build_item, "BuildItem", FakeBuildItem)
+    monkeypatch.setattr(builder, "_worker_builder", None)
+
+
+NAMES = {"1": "Coins", "2": "Coins", "3": "Bronze axe", "4": "Coins (beta)", "5": "Bronze axe", "6": "Iron axe"}
+WIKITEXT = {"1": "Coins", "3": "Bronze axe", "5": "Bronze axe#Broken", "6": "Iron axe"}
+
+
+def _build(workers: int, names: dict = NAMES):
+    return _fake_builder(names, WIKITEXT).build(workers)
+
+
+@pytest.mark.parametrize("workers", [1, pytest.param(2, marks=requires_fork)])
+def test_build_items(fake_build_item, capsys, workers: int):
+    item_dicts = _build(workers)
+    output = capsys.readouterr().out
+
+    # Beta items are skipped, and items are built in cache order
+    assert list(item_dicts) == ["1", "2", "3", "5", "6"]
+    # The duplicate check runs in cache order, item 2 is a known duplicate, item 5 has the same name and wiki_name as item 3
+    assert {item_id: item_dict["duplicate"] for item_id, item_dict in item_dicts.items()} == \
+        {"1": False, "2": True, "3": False, "5": False, "6": False}
+    assert output.index("Comparing: 1") < output.index("Exporting: 1") < output.index("Comparing: 2")
+    assert ">>> Build timing" in output
+    assert ">>> Build errors" not in output
+
+
+@requires_fork
+def test_build_items_serial_vs_parallel(fake_build_item, capsys):
+    serial = _build(1)
+    serial_output = capsys.readouterr().out
+    parallel = _build(3)
+    parallel_output = capsys.readouterr().out
+
+    assert serial == parallel
+    # The same output, apart from the phase times
+    assert serial_output.split(">>> Build timing")[0] == parallel_output.split(">>> Build timing")[0]
+
+
+@pytest.mark.parametrize("workers", [1, pytest.param(2, marks=requires_fork)])
+def test_build_items_errors(fake_build_item, capsys, workers: int):
+    names = dict(NAMES, **{"3": "Broken item", "5": "Broken item"})
+    with pytest.raises(SystemExit) as exit_info:
+        _build(workers, names)
+    output = capsys.readouterr().out
+
+    # Every item is built, and every error is reported after the timing summary
+    assert exit_info.value.code == 1
+    assert "Exporting: 6" in output
+    assert output.index(">>> Build timing") < output.index(">>> Build errors: 2")
+    assert "  3: Exited with status 1: {'name': ['invalid']}" in output
+    assert "  5: Exited with status 1: {'name': ['invalid']}" in output
+
+
+@pytest.mark.parametrize("workers", [1, pytest.param(2, marks=requires_fork)])
+def test_build_items_records_inputs(fake_build_item, workers: int):
+    fake = _fake_builder(NAMES, WIKITEXT)
+    fake.build(workers)
+
+    # The auxiliary keys read by each item, including lookups of missing entries
+    assert fake.item_inputs == {
+        "1": dirty_items.auxiliary_keys([], ["1"]),
+        "2": dict(dirty_items.auxiliary_keys([], ["2"]), buy_limits=["Coins"], icons=["2", "blank"]),
+        "3": dirty_items.auxiliary_keys([], ["3"]),
+        "5": dirty_items.auxiliary_keys([], ["5"]),
+        "6": dirty_items.auxiliary_keys([], ["6"])}
+
+    # A changed entry only dirties the items that read it, and the items with the same name (beta items are not built)
+    state = dirty_items.build_state(fake, dict(), fake.item_inputs)
+    fake.icons["6"] = "axe"
+    assert dirty_items.dirty_item_ids(fake, {"added": [], "removed": [], "changed": []}, state, dict()) == ([], [])
+    fake.buy_limits["Coins"] = 25000
+    assert dirty_items.dirty_item_ids(fake, {"added": [], "removed": [], "changed": []}, state, dict()) == (["1", "2"], [])
+
+
+def test_build_incremental(fake_build_item, monkeypatch, tmp_path: Path, capsys):
+    fake = _fake_builder(NAMES, WIKITEXT)
+    state = dirty_items.build_state(fake, dict(), {item_id: dirty_items.auxiliary_keys([], [item_id]) for item_id in NAMES})
+    monkeypatch.setattr(dirty_items, "load_cache_changes", lambda: {"added": [], "removed": [7, 8], "changed": [6]})
+    monkeypatch.setattr(dirty_items, "load_build_state", lambda: state)
+    monkeypatch.setattr(dirty_items, "load_page_titles", lambda: dict())
+    monkeypatch.setattr(builder, "ItemProperties", lambda **item_dict: SimpleNamespace(construct_json=lambda: item_dict))
+    patched = list()
+    monkeypatch.setattr(builder.update_json_files, "patch_items_files", lambda items, removed: patched.append((items, removed)))
+    monkeypatch.setattr(config, "DOCS_PATH", tmp_path)
+    (tmp_path / "items-json").mkdir()
+    (tmp_path / "items-json" / "7.json").write_text("{}")
+
+    fake.build_incremental()
+    assert ">>> Incremental build: 1 dirty items, 2 removed items" in capsys.readouterr().out
+
+    # Only the dirty item is patched, the JSON files of removed items are deleted, when they exist
+    assert [(list(items), removed) for items, removed in patched] == [([6], ["7", "8"])]
+    assert patched[0][0][6]["name"] == "Iron axe"
+    assert not (tmp_path / "items-json" / "7.json").exists()
+    assert list(fake.item_inputs) == ["6"]
@@ -0,0 +1,108 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Tests for module: builders.items.known_items
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+from types import SimpleNamespace
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Callable
+
+import config
+from osrsbox import codec
+from osrsbox.items_api.item_properties import ItemProperties
+from builders.items.known_items import KnownItems
+
+
+def _reference_is_duplicate(item_properties: ItemProperties, known_items: List[ItemProperties]) -> bool:
+    """The duplicate check of BuildItem.check_duplicate_item, before the KnownItems index."""
+    correlation_properties = {
+        "name": False,
+        "wiki_name": False
+    }
+    for known_item in known_items:
+        if item_properties.name != known_item.name:
+            continue
+        for cprop in correlation_properties:
+            if getattr(item_properties, cprop) == getattr(known_item, cprop):
+                correlation_properties[cprop] = True
+        if all(value is True for value in correlation_properties.values()):
+            return True
+        if not item_properties.wiki_name:
+            return True
+    return False
+
+
+def _duplicate_flags(items: List[ItemProperties], duplicates: Dict, is_duplicate: Callable, add_known_item: Callable) -> Dict[int, bool]:
+    """Set the duplicate flag of every item in build order, as BuildItem.check_duplicate_item does."""
+    flags = dict()
+    for item_properties in items:
+        if str(item_properties.id) in duplicates:
+            flags[item_properties.id] = duplicates[str(item_properties.id)]["duplicate"]
+            continue
+        if item_properties.stacked or item_properties.noted or item_properties.placeholder:
+            flags[item_properties.id] = True
+            continue
+        flags[item_properties.id] = is_duplicate(item_properties)
+        add_known_item(item_properties)
+    return flags
+
+
+def test_known_items_find_duplicate():
+    # Only the name and wiki_name properties are indexed
+    known_items = KnownItems()
+    known_items.add(SimpleNamespace(id=1, name="Coins", wiki_name="Coins (1)"))
+    known_items.add(SimpleNamespace(id=2, name="Coins", wiki_name="Coins (5)"))
+    assert len(known_items) == 2
+
+    # Same name and wiki_name, as any earlier item
+    assert known_items.find_duplicate(SimpleNamespace(id=3, name="Coins", wiki_name="Coins (5)")).id == 2
+    # Same name and no wiki_name, the first item with the name
+    assert known_items.find_duplicate(SimpleNamespace(id=4, name="Coins", wiki_name=None)).id == 1
+    # Same name, but a different wiki_name
+    assert known_items.find_duplicate(SimpleNamespace(id=5, name="Coins", wiki_name="Coins (25)")) is None
+    assert known_items.find_duplicate(SimpleNamespace(id=6, name="Bones", wiki_name=None)) is None
+
+
+def test_known_items_matches_reference(path_to_docs_dir: Path):
+    with open(path_to_docs_dir / "items-complete.json") as f:
+        all_db_items = codec.load(f)
+    with open(Path(config.DATA_ITEMS_PATH / "items-duplicates.json")) as f:
+        duplicates = codec.load(f)
+
+    # Every item, in item ID (cache) order
+    items = [ItemProperties.from_json(dict(item_json))
+             for _, item_json in sorted(all_db_items.items(), key=lambda entry: int(entry[0]))]
+
+    reference_known_items = list()
+    reference_flags = _duplicate_flags(items, duplicates,
+                                       lambda item_properties: _reference_is_duplicate(item_properties, reference_known_items),
+                                       reference_known_items.append)
+
+    known_items = KnownItems()
+    flags = _duplicate_flags(items, duplicates,
+                             lambda item_properties: known_items.find_duplicate(item_properties) is not None,
+                             known_items.add)
+
+    assert len(known_items) == len(reference_known_items)
+    assert flags == reference_flags
+    assert any(flags.values()) and not all(flags.values())
@@ -22,9 +22,24 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 ###############################################################################
 """
 import os
+import math
 from pathlib import Path
 
+import pytest
+
+from osrsbox import snapshot
+from osrsbox import monsters_api
+from osrsbox.items_api import all_items
+from osrsbox.field_index import Not
+from osrsbox.field_index import Between
+from osrsbox.field_index import Contains
 from osrsbox.monsters_api import all_monsters
+from osrsbox.monsters_api import drop_rarity
+from osrsbox.monsters_api import drop_calculator
+from osrsbox.monsters_api.combat_rates import CombatRates
+from osrsbox.monsters_api.combat_rates import CombatLoadout
+from osrsbox.monsters_api.drop_index import rarity_value
+from osrsbox.monsters_api.drop_rarity import DropRarityTable
 
 # The current number of monsters being loaded from the db
 NUMBER_OF_MONSTERS = 3000
@@ -44,3 +59,248 @@ def test_all_monsters_load_monsters_complete(path_to_docs_dir: Path):
 
     all_db_monsters = all_monsters.AllMonsters(str(path_to_monsters_complete))
     assert len(all_db_monsters.all_monsters) == NUMBER_OF_MONSTERS
+
+
+def test_all_monsters_slotted(path_to_docs_dir: Path):
+    path_to_monsters_complete = path_to_docs_dir / "monsters-complete.json"
+    all_db_monsters = all_monsters.AllMonsters(path_to_monsters_complete)
+    slotted_db_monsters = all_monsters.AllMonsters(path_to_monsters_complete, slotted=True)
+
+    assert all(not hasattr(monster, "__dict__") for monster in slotted_db_monsters)
+    assert all(not hasattr(drop, "__dict__") for monster in slotted_db_monsters for drop in monster.drops)
+    assert [monster.construct_json() for monster in slotted_db_monsters] == [monster.construct_json() for monster in all_db_monsters]
+
+
+def test_all_monsters_drop_index(path_to_docs_dir: Path):
+    path_to_monsters_complete = path_to_docs_dir / "monsters-complete.json"
+    all_db_monsters = all_monsters.AllMonsters(path_to_monsters_complete)
+    drop_index = all_db_monsters.drop_index()
+
+    # Reference: scan every drop of every monster
+    for item_id in (4151, 11286, 995):
+        expected = sorted((monster.id, rarity_value(drop.rarity))
+                          for monster in all_db_monsters for drop in monster.drops if drop.id == item_id)
+        postings = drop_index.drops_by_item_id(item_id)
+        assert sorted((posting.monster_id, posting.rarity) for posting in postings) == expected
+        assert [posting.rarity for posting in postings] == sorted((posting.rarity for posting in postings), reverse=True)
+        rarest = drop_index.drops_by_item_id(item_id, rarest_first=True)
+        assert [posting.rarity for posting in rarest] == sorted(posting.rarity for posting in postings)
+
+    whip_name = drop_index.drops_by_item_name("ABYSSAL WHIP")
+    assert whip_name == drop_index.drops_by_item_id(4151)
+    assert [monster.id for monster in all_db_monsters.monsters_dropping("Abyssal whip")] == [posting.monster_id for posting in whip_name]
+    assert all_db_monsters.monsters_dropping(-1) == []
+    assert "prayer potion(4)" in drop_index.search_item_names("Prayer potion")
+
+
+@pytest.mark.parametrize("quantity, expected", [
+    ("1", (1.0, 1.0, 1.0)),
+    ("1-3", (1.0, 3.0, 2.0)),
+    ("5 (noted)", (5.0, 5.0, 5.0)),
+    ("1,2", (1.0, 2.0, 1.5)),
+    ("10-20,30", (10.0, 30.0, 22.5)),
+    (None, (1.0, 1.0, 1.0)),
+])
+def test_parse_quantity(quantity: str, expected: tuple):
+    assert drop_calculator.parse_quantity(quantity) == expected
+
+
+def test_all_monsters_drop_table(path_to_docs_dir: Path):
+    np = pytest.importorskip("numpy")
+    all_db_monsters = all_monsters.AllMonsters(path_to_docs_dir / "monsters-complete.json")
+    drop_table = all_db_monsters.drop_table()
+    assert len(drop_table) == sum(len(monster.drops) for monster in all_db_monsters)
+
+    # Reference: loop over the drops of each monster
+    prices = {item_id: float(item_id % 97) for item_id in set(drop_table.item_ids.tolist())}
+    expected_values = drop_table.expected_values(prices)
+    for monster in all_db_monsters:
+        expected = sum(rarity_value(drop.rarity) * drop.rolls * drop_calculator.parse_quantity(drop.quantity)[2] * prices[drop.id]
+                       for drop in monster.drops)
+        assert expected_values[monster.id] == pytest.approx(expected)
+
+    rows = drop_table.drop_rows(all_db_monsters.all_monsters[0].id)
+    drops = all_db_monsters.all_monsters[0].drops
+    assert drop_table.item_ids[rows].tolist() == [drop.id for drop in drops]
+    probabilities = drop_table.kill_probabilities([1, 100])
+    assert probabilities.shape == (len(drop_table), 2)
+    assert np.allclose(probabilities[:, 0], 1 - (1 - drop_table.rarity) ** drop_table.rolls)
+    assert np.allclose(drop_table.kill_probabilities(100), probabilities[:, 1])
+
+    kills = drop_table.kills_for_probability(0.5)
+    possible = drop_table.rarity > 0
+    assert np.all(drop_table.kill_probabilities(1)[drop_table.rarity >= 1] == 1)
+    at_kills = 1 - (1 - drop_table.rarity[possible]) ** (drop_table.rolls[possible] * kills[possible])
+    before_kills = 1 - (1 - drop_table.rarity[possible]) ** (drop_table.rolls[possible] * (kills[possible] - 1))
+    assert np.all(at_kills >= 0.5 - 1e-9)
+    assert np.all(before_kills < 0.5 + 1e-9)
+    with pytest.raises(ValueError):
+        drop_table.kills_for_probability(1)
+
+
+def test_all_monsters_filter_monsters(path_to_docs_dir: Path):
+    all_db_monsters = all_monsters.AllMonsters(path_to_docs_dir / "monsters-complete.json")
+
+    # Reference: scan every monster
+    expected = [monster.id for monster in all_db_monsters
+                if "duradel" in monster.slayer_masters and 100 <= monster.combat_level <= 200 and not monster.immune_venom]
+    matches = all_db_monsters.filter_monsters(slayer_masters=Contains("duradel"), combat_level=Between(100, 200), immune_venom=False)
+    assert expected
+    assert [monster.id for monster in matches] == expected
+
+    expected = [monster.id for monster in all_db_monsters
+                if monster.hitpoints is not None and monster.hitpoints >= 500
+                and "demon" not in monster.attributes and set(monster.attack_type) & {"magic", "ranged"}]
+    matches = all_db_monsters.filter_monsters({"hitpoints": Between(minimum=500),
+                                               "attributes": Not(Contains("demon")),
+                                               "attack_type": Contains(["magic", "ranged"])})
+    assert [monster.id for monster in matches] == expected
+
+    expected = [monster.id for monster in all_db_monsters if monster.defence_slash is not None and monster.defence_slash <= 0]
+    assert [monster.id for monster in all_db_monsters.filter_monsters(defence_slash=Between(maximum=0))] == expected
+    assert len(all_db_monsters.filter_monsters(size=Not([1, 2]))) == len([monster for monster in all_db_monsters if monster.size not in (1, 2)])
+    with pytest.raises(ValueError):
+        all_db_monsters.filter_monsters(slayer_masters="duradel")
+
+
+def test_all_monsters_name_lookup(path_to_docs_dir: Path):
+    all_db_monsters = all_monsters.AllMonsters(path_to_docs_dir / "monsters-complete.json")
+
+    # Reference: scan every monster
+    expected = [monster.id for monster in all_db_monsters if monster.name.lower() == "abyssal demon"]
+    assert len(expected) > 1
+    assert [monster.id for monster in all_db_monsters.lookup_monsters_by_name("ABYSSAL DEMON")] == expected
+    assert all_db_monsters.lookup_by_monster_name("Abyssal demon").id == expected[0]
+    assert all_db_monsters.lookup_by_monster_name("abyssal demon (standard)", use_wiki_name=True).name == "Abyssal demon"
+    with pytest.raises(ValueError):
+        all_db_monsters.lookup_by_monster_name("Not a monster")
+
+    expected = [monster.id for monster in all_db_monsters
+                if "dragon" in monster.name.lower() or "dragon" in (monster.wiki_name or "").lower()]
+    assert [monster.id for monster in all_db_monsters.search_monster_names("Dragon")] == expected
+    assert [monster.id for monster in all_db_monsters.search_monster_names("dragon", limit=5, offset=2)] == expected[2:7]
+
+    groups = all_db_monsters.prefix_search_monster_names("Abyssal")
+    expected_names = sorted({monster.name.casefold() for monster in all_db_monsters if monster.name.casefold().startswith("abyssal")})
+    assert list(groups) == expected_names
+    assert [monster.id for monster in groups["abyssal demon"]] == [monster.id for monster in all_db_monsters.lookup_monsters_by_name("abyssal demon")]
+    assert list(all_db_monsters.prefix_search_monster_names("abyssal", limit=2)) == expected_names[:2]
+    assert all_db_monsters.prefix_search_monster_names("zzzz") == {}
+
+
+def test_combat_rates_evaluate(path_to_docs_dir: Path):
+    np = pytest.importorskip("numpy")
+    all_db_monsters = all_monsters.AllMonsters(path_to_docs_dir / "monsters-complete.json")
+    all_db_items = all_items.AllItems(path_to_docs_dir / "items-complete.json")
+    whip = CombatLoadout.from_items([all_db_items[4151], all_db_items[1127]])
+    assert whip.attack_speed == 4
+    assert whip.stats["attack_slash"] == all_db_items[4151].equipment.attack_slash + all_db_items[1127].equipment.attack_slash
+
+    rates = CombatRates(all_db_monsters, drop_table=all_db_monsters.drop_table())
+    prices = {item.id: item.cost for item in all_db_items}
+    result = rates.evaluate([whip], "slash", levels={"attack": 80}, prices=prices, overhead_seconds=2)
+    assert result.dps.shape == (1, len(all_db_monsters))
+
+    # Reference: one monster at a time
+    expected_values = all_db_monsters.drop_table().expected_values(prices)
+    for column, monster in enumerate(all_db_monsters.all_monsters[:200]):
+        attack_roll = (80 + 8) * (whip.stats["attack_slash"] + 64)
+        defence_roll = (monster.defence_level + 9) * (monster.defence_slash + 64)
+        if attack_roll > defence_roll:
+            hit_chance = 1 - (defence_roll + 2) / (2 * (attack_roll + 1))
+        else:
+            hit_chance = attack_roll / (2 * (defence_roll + 1))
+        max_hit = int(0.5 + (99 + 8) * (whip.stats["melee_strength"] + 64) / 640)
+        dps = hit_chance * max_hit / 2 / (4 * 0.6)
+        assert result.dps[0, column] == pytest.approx(dps)
+        if monster.hitpoints:
+            kills_per_hour = 3600 / (monster.hitpoints / dps + 2)
+            assert result.kills_per_hour[0, column] == pytest.approx(kills_per_hour)
+            assert result.loot_per_hour[0, column] == pytest.approx(kills_per_hour * expected_values[monster.id])
+        else:
+            assert result.kills_per_hour[0, column] == 0
+
+    # Many loadouts against one monster match one loadout against every monster
+    unarmed = CombatLoadout()
+    many = rates.evaluate([whip, unarmed, whip], "slash", levels={"attack": 80}, monster_ids=[415])
+    assert many.dps.shape == (3, 1)
+    assert many.dps[0, 0] == pytest.approx(result.dps[0, result.monster_ids.tolist().index(415)])
+    assert many.dps[2, 0] == many.dps[0, 0]
+    assert many.dps[1, 0] < many.dps[0, 0]
+    assert np.all(rates.evaluate([unarmed], "magic").dps == 0)
+    with pytest.raises(ValueError):
+        rates.evaluate([whip], "kick")
+    with pytest.raises(ValueError):
+        rates.evaluate([whip], "slash", monster_ids=[-1])
+
+
+def test_all_monsters_drop_rarity(path_to_docs_dir: Path, tmp_path: Path):
+    path_to_monsters_complete = path_to_docs_dir / "monsters-complete.json"
+    all_db_monsters = all_monsters.AllMonsters(path_to_monsters_complete)
+    computed = DropRarityTable.from_monsters(all_db_monsters)
+
+    # Reference: the rarest drop, and the total rarity of each monster
+    rarities = [(rarity_value(drop.rarity), monster.id) for monster in all_db_monsters for drop in monster.drops if drop.rarity is not None]
+    rarest = min(rarity for rarity, _ in rarities)
+    assert computed.rarest_drops(limit=1)[0][0] == rarest
+    assert [drop[0] for drop in computed.drops] == sorted(rarity for rarity, _ in rarities)
+    for monster in all_db_monsters.all_monsters[:100]:
+        total_rarity = sum(drop.rarity for drop in monster.drops if drop.rarity is not None and drop.rarity < 1.0)
+        assert computed.monster_rarity(monster.id).total_rarity == pytest.approx(total_rarity)
+    # The drops of each monster, rarest first, with the cumulative chance of at least one drop
+    for monster in all_db_monsters.all_monsters[:100]:
+        monster_rarity = computed.monster_rarity(monster.id)
+        chances = sorted((drop.rarity, drop.id, 1 - (1 - drop.rarity) ** drop.rolls)
+                         for drop in monster.drops if drop.rarity is not None and drop.rarity < 1.0)
+        assert [drop[:3] for drop in monster_rarity.drops] == pytest.approx(chances)
+        for index, drop in enumerate(monster_rarity.drops):
+            assert drop[3] == pytest.approx(1 - math.prod([1 - chance for _, _, chance in chances[:index + 1]]))
+            assert monster_rarity.drop_chance(drop[0]) >= drop[3]
+        assert monster_rarity.any_drop == pytest.approx(monster_rarity.drops[-1][3] if chances else 0.0)
+    monster_rarity = next(computed.monster_rarity(monster.id) for monster in all_db_monsters if len(monster.drops) > 5)
+    rarest_rarity, _, _, rarest_chance = monster_rarity.drops[0]
+    assert monster_rarity.drop_chance(rarest_rarity / 2) == 0.0
+    assert monster_rarity.drop_chance(rarest_rarity, kills=10) == pytest.approx(1 - (1 - rarest_chance) ** 10)
+    assert monster_rarity.drop_chance(1.0) == pytest.approx(monster_rarity.any_drop)
+
+    whip = computed.item_rarity(4151)
+    assert whip.best_rarity == max(posting.rarity for posting in all_db_monsters.drop_index().drops_by_item_id(4151))
+    assert computed.item_rarity(computed.rarest_items(limit=1)[0]).rank == 1
+
+    # A fresh artifact is loaded, a stale artifact is ignored
+    path_to_artifact = drop_rarity.write_drop_rarity(all_db_monsters, path_to_monsters_complete, tmp_path / "monsters.rarity.json")
+    loaded = DropRarityTable.load(path_to_monsters_complete, path_to_artifact)
+    assert loaded.drops == computed.drops
+    assert loaded.items == computed.items
+    assert loaded.monsters == computed.monsters
+
+    stale_json = tmp_path / "monsters-complete.json"
+    stale_json.write_text("{}")
+    assert DropRarityTable.load(stale_json, path_to_artifact) is None
+    assert DropRarityTable.load(stale_json) is None
+    assert all_db_monsters.drop_rarity().drops == computed.drops
+
+
+def test_packaged_drop_rarity_cached(path_to_docs_dir: Path, tmp_path: Path, monkeypatch):
+    # The packaged JSON file, without an artifact next to it
+    path_to_monsters_complete = tmp_path / "monsters-complete.json"
+    path_to_monsters_complete.write_bytes((path_to_docs_dir / "monsters-complete.json").read_bytes())
+    monkeypatch.setattr(all_monsters, "PATH_TO_MONSTERS_COMPLETE", path_to_monsters_complete)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path_to_cached = drop_rarity.cached_rarity_path(path_to_monsters_complete)
+    assert path_to_cached.parent == snapshot.user_cache_dir()
+    assert not path_to_cached.exists()
+
+    # The tables are computed once, and written to the user cache directory, never next to the JSON file
+    computed = all_monsters.AllMonsters(path_to_monsters_complete).drop_rarity()
+    assert path_to_cached.is_file()
+    assert not drop_rarity.rarity_path_for(path_to_monsters_complete).exists()
+    loaded = DropRarityTable.load(path_to_monsters_complete)
+    assert loaded.monsters == computed.monsters
+    assert monsters_api.load_drop_rarity().monsters == computed.monsters
+
+    # An artifact that cannot be written is a warning, the tables are still computed
+    path_to_cached.unlink()
+    monkeypatch.setattr(drop_rarity, "user_cache_dir", lambda: tmp_path / "monsters-complete.json" / "cache")
+    with pytest.warns(UserWarning, match="Cannot write the drop rarity tables"):
+        assert all_monsters.AllMonsters(path_to_monsters_complete).drop_rarity().monsters == computed.monsters
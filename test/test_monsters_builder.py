@@ -0,0 +1,136 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Tests for module: builders.monsters.builder
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import multiprocessing
+from types import SimpleNamespace
+
+import pytest
+
+from builders.monsters import builder
+
+requires_fork = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                                   reason="The fake builder inputs are only shared with forked workers")
+
+
+class FakeBuildMonster:
+    """A stand-in for BuildMonster, that populates a monster from its cache name and wikitext."""
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+        self.monster_dict = dict()
+
+    def preprocessing(self):
+        return self.monster_id in self.all_wikitext_processed
+
+    def populate_monster(self):
+        self.monster_dict = {"id": int(self.monster_id),
+                             "name": self.all_monster_cache_data[self.monster_id]["name"],
+                             "wiki_name": self.all_wikitext_processed[self.monster_id]}
+
+    def check_duplicate_monster(self):
+        monster_properties = SimpleNamespace(**self.monster_dict)
+        self.monster_dict["duplicate"] = any(known_monster.name == monster_properties.name and
+                                             known_monster.wiki_name == monster_properties.wiki_name
+                                             for known_monster in self.known_monsters)
+        return monster_properties
+
+    def populate_monster_drops(self):
+        self.monster_dict["drops"] = self.monsters_drops.get(self.monster_id, [])
+
+    def compare_new_vs_old_monster(self):
+        print(f"Comparing: {self.monster_id}")
+
+    def export_monster_to_json(self):
+        print(f"Exporting: {self.monster_id}")
+
+    def validate_monster(self):
+        if not self.monster_dict["drops"]:
+            print({"drops": ["empty"]})
+            exit(1)
+
+
+NAMES = {"1": "Goblin", "2": "Goblin", "3": "Man", "4": "Goblin", "5": "Cow"}
+WIKITEXT = {"1": "Goblin#Level 2", "2": "Goblin#Level 2", "4": "Goblin#Level 5", "5": "Cow"}
+DROPS = {"1": ["Bones"], "2": ["Bones"], "4": ["Bones"], "5": ["Cowhide"]}
+
+
+def _fake_builder(drops: dict) -> builder.Builder:
+    fake = builder.Builder.__new__(builder.Builder)
+    fake.verbose = False
+    fake.compare = True
+    fake.export = True
+    fake.validate = True
+    fake.all_monster_cache_data = {monster_id: {"name": name} for monster_id, name in NAMES.items()}
+    fake.all_db_monsters = dict()
+    fake.all_wikitext_raw = dict()
+    fake.all_wikitext_processed = WIKITEXT
+    fake.monsters_drops = drops
+    fake.schema_data = dict()
+    fake.known_monsters = list()
+    fake.build_cache = None
+    return fake
+
+
+@pytest.fixture
+def fake_build_monster(monkeypatch):
+    monkeypatch.setattr(builder.build_monster, "BuildMonster", FakeBuildMonster)
+    monkeypatch.setattr(builder, "_worker_builder", None)
+
+
+@pytest.mark.parametrize("workers", [1, pytest.param(2, marks=requires_fork)])
+def test_build_monsters(fake_build_monster, capsys, workers: int):
+    fake = _fake_builder(DROPS)
+    fake.build(workers)
+    output = capsys.readouterr().out
+
+    # Monsters without a wiki infobox are skipped, and the duplicate check runs in cache order
+    assert [(monster.id, monster.wiki_name) for monster in fake.known_monsters] == \
+        [(1, "Goblin#Level 2"), (2, "Goblin#Level 2"), (4, "Goblin#Level 5"), (5, "Cow")]
+    assert [line for line in output.splitlines() if line.startswith("Exporting")] == \
+        ["Exporting: 1", "Exporting: 2", "Exporting: 4", "Exporting: 5"]
+    assert "Comparing: 3" not in output
+    assert ">>> Build errors" not in output
+
+
+@requires_fork
+def test_build_monsters_serial_vs_parallel(fake_build_monster, capsys):
+    _fake_builder(DROPS).build(1)
+    serial_output = capsys.readouterr().out
+    _fake_builder(DROPS).build(3)
+    parallel_output = capsys.readouterr().out
+
+    # The same output, apart from the phase times
+    assert serial_output.split(">>> Build timing")[0] == parallel_output.split(">>> Build timing")[0]
+
+
+@pytest.mark.parametrize("workers", [1, pytest.param(2, marks=requires_fork)])
+def test_build_monsters_errors(fake_build_monster, capsys, workers: int):
+    with pytest.raises(SystemExit) as exit_info:
+        _fake_builder({"2": ["Bones"], "5": ["Cowhide"]}).build(workers)
+    output = capsys.readouterr().out
+
+    # Every monster is built, and every error is reported after the timing summary
+    assert exit_info.value.code == 1
+    assert "Exporting: 5" in output
+    assert output.index(">>> Build timing") < output.index(">>> Build errors: 2")
+    assert "  1: Exited with status 1: {'drops': ['empty']}" in output
+    assert "  4: Exited with status 1: {'drops': ['empty']}" in output
@@ -0,0 +1,151 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Tests for module: builders.parallel_build
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import multiprocessing
+
+import pytest
+
+from builders import parallel_build
+
+requires_fork = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                                   reason="The test tasks are only shared with forked workers")
+
+# Set by the initializer, in each worker, or in this process for a serial run
+_offset = None
+
+
+def _init_offset(offset: int):
+    global _offset
+    _offset = offset
+
+
+def _square(value: int, timer: parallel_build.PhaseTimer) -> int:
+    with timer.phase("square"):
+        print(f"Squaring: {value}")
+    return value * value
+
+
+def _validate(value: int, timer: parallel_build.PhaseTimer) -> int:
+    print("Validating...")
+    print(f"Invalid value: {value}")
+    exit(1)
+
+
+def _raise(value: int, timer: parallel_build.PhaseTimer) -> int:
+    raise KeyError(value)
+
+
+def _task(value: int) -> parallel_build.TaskResult:
+    if value % 3 == 0:
+        return parallel_build.run_task(str(value), _validate, value)
+    return parallel_build.run_task(str(value), _square, value + _offset)
+
+
+def test_run_task_success():
+    result = parallel_build.run_task("4", _square, 4)
+    assert result.key == "4"
+    assert result.value == 16
+    assert result.output == "Squaring: 4\n"
+    assert result.error is None
+    assert list(result.seconds) == ["square"]
+
+
+def test_run_task_system_exit():
+    result = parallel_build.run_task("5", _validate, 5)
+    assert result.value is None
+    assert result.output == "Validating...\nInvalid value: 5\n"
+    # The last printed line is the reason of the exit
+    assert result.error == "Exited with status 1: Invalid value: 5"
+
+
+def test_run_task_exception():
+    result = parallel_build.run_task("6", _raise, 6)
+    assert result.value is None
+    assert result.error.startswith("Traceback")
+    assert "KeyError: 6" in result.error
+
+
+def test_phase_timer_merge():
+    timer = parallel_build.PhaseTimer()
+    timer.merge({"populate": 1.0, "validate": 0.5})
+    timer.merge({"populate": 2.0, "export": 0.25})
+    assert timer.seconds == {"populate": 3.0, "validate": 0.5, "export": 0.25}
+
+
+@pytest.mark.parametrize("count, workers, expected", [
+    (0, 4, 1),
+    (1, 4, 1),
+    (31, 4, 1),
+    (64, 4, 2),
+    (23000, 4, 718),
+    (100, 1, 12),
+])
+def test_chunk_size(count: int, workers: int, expected: int):
+    assert parallel_build.chunk_size(count, workers) == expected
+
+
+def test_collect_result(capsys):
+    timer = parallel_build.PhaseTimer()
+    errors = dict()
+    assert parallel_build.collect_result(parallel_build.run_task("4", _square, 4), timer, errors)
+    assert not parallel_build.collect_result(parallel_build.run_task("5", _validate, 5), timer, errors)
+    assert errors == {"5": "Exited with status 1: Invalid value: 5"}
+    assert "square" in timer.seconds
+    assert capsys.readouterr().out == "Squaring: 4\nValidating...\nInvalid value: 5\n"
+
+
+def test_print_error_report(capsys):
+    parallel_build.print_error_report({"5": "Exited with status 1\n", "6": "Traceback"})
+    assert capsys.readouterr().out == ">>> Build errors: 2\n  5: Exited with status 1\n  6: Traceback\n"
+
+
+def _run(workers: int, values: list):
+    timer = parallel_build.PhaseTimer()
+    errors = dict()
+    squares = list()
+    with parallel_build.task_runner(workers, _init_offset, (1,)) as run_tasks:
+        for result in run_tasks(_task, values):
+            if parallel_build.collect_result(result, timer, errors):
+                squares.append((result.key, result.value))
+    return squares, errors
+
+
+@requires_fork
+def test_task_runner_serial_vs_parallel(capsys):
+    values = list(range(1, 100))
+    serial = _run(1, values)
+    serial_output = capsys.readouterr().out
+    parallel = _run(3, values)
+    parallel_output = capsys.readouterr().out
+
+    # The same results, errors and output, in task order
+    assert serial == parallel
+    assert serial_output == parallel_output
+    squares, errors = serial
+    assert [key for key, _ in squares] == [str(value) for value in values if value % 3]
+    assert squares[0] == ("1", 4)
+    assert list(errors) == [str(value) for value in values if value % 3 == 0]
+
+
+def test_task_runner_empty():
+    assert _run(1, []) == ([], {})
@@ -0,0 +1,83 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Tests for module: osrsbox.shared_store
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from osrsbox import shared_store
+from osrsbox.items_api import all_items
+from osrsbox.monsters_api import all_monsters
+
+pytestmark = pytest.mark.skipif(shared_store.shared_memory is None, reason="Shared memory requires Python 3.8+")
+
+
+def _attached_item_names(name: str, item_ids: list) -> list:
+    with shared_store.SharedRecordStore.attach(name) as shared:
+        all_db_items = all_items.AllItems(shared.store, lazy=True)
+        return [all_db_items[item_id].name for item_id in item_ids]
+
+
+def test_shared_record_store_items(path_to_docs_dir: Path):
+    path_to_items_complete = path_to_docs_dir / "items-complete.json"
+    all_db_items = all_items.AllItems(path_to_items_complete)
+
+    with shared_store.SharedRecordStore.from_json_file(path_to_items_complete) as shared:
+        assert len(shared) == len(all_db_items)
+
+        # Attach in this process, the read API matches a normal load
+        with shared_store.SharedRecordStore.attach(shared.name) as attached:
+            shared_db_items = all_items.AllItems(attached.store, lazy=True)
+            assert len(shared_db_items) == len(all_db_items)
+            assert shared_db_items[4151] == all_db_items[4151]
+            assert shared_db_items.lookup_by_item_name("Dragon scimitar") == all_db_items.lookup_by_item_name("Dragon scimitar")
+            assert [item.id for item in shared_db_items.filter_items(members=False, tradeable=True)][:50] == \
+                [item.id for item in all_db_items.filter_items(members=False, tradeable=True)][:50]
+
+        # Attach in another process
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        with context.Pool(1) as pool:
+            names = pool.apply(_attached_item_names, (shared.name, [4151, 11802]))
+        assert names == [all_db_items[4151].name, all_db_items[11802].name]
+
+        name = shared.name
+    with pytest.raises(FileNotFoundError):
+        shared_store.SharedRecordStore.attach(name)
+
+
+def test_shared_record_store_monsters(path_to_docs_dir: Path):
+    path_to_monsters_complete = path_to_docs_dir / "monsters-complete.json"
+    all_db_monsters = all_monsters.AllMonsters(path_to_monsters_complete)
+
+    with shared_store.SharedRecordStore.from_json_file(path_to_monsters_complete) as shared:
+        shared_db_monsters = all_monsters.AllMonsters(shared.store, lazy=True)
+        assert len(shared_db_monsters) == len(all_db_monsters)
+        assert 415 in shared_db_monsters
+        assert shared_db_monsters[415] == all_db_monsters[415]
+        assert [monster.id for monster in shared_db_monsters.lookup_monsters_by_name("abyssal demon")] == \
+            [monster.id for monster in all_db_monsters.lookup_monsters_by_name("abyssal demon")]
+        assert [monster.construct_json() for monster in shared_db_monsters] == [monster.construct_json() for monster in all_db_monsters]
+
+        # Not lazy, every monster is built when loaded
+        assert all_monsters.AllMonsters(shared.store).all_monsters == all_db_monsters.all_monsters
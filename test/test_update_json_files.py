@@ -0,0 +1,89 @@
+"""
+Author:  PH01L
+Email:   phoil@osrsbox.com
+Website: https://www.osrsbox.com
+
+Description:
+Tests for module: scripts.update.update_json_files
+
+Copyright (c) 2021, PH01L
+
+###############################################################################
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+"""
+import json
+from pathlib import Path
+
+import config
+from osrsbox import codec
+from osrsbox import snapshot
+from osrsbox import record_store
+from osrsbox.items_api import all_items
+from osrsbox.items_api.item_properties import ItemProperties
+from scripts.update import update_json_files
+
+
+def _write_json(path: Path, data: dict):
+    with open(path, "w") as f:
+        codec.dump(data, f)
+
+
+def _read_json(path: Path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_patch_items_files(path_to_docs_dir: Path, tmp_path: Path, monkeypatch):
+    with open(path_to_docs_dir / "items-complete.json") as f:
+        db_items = codec.load(f)
+    items = {item_id: db_items[str(item_id)] for item_id in (995, 1038, 4151)}
+
+    # A docs directory, and a package docs directory, of three items
+    docs_path = tmp_path / "docs"
+    package_path = tmp_path / "osrsbox"
+    (docs_path / "items-json-slot").mkdir(parents=True)
+    (package_path / "docs").mkdir(parents=True)
+    monkeypatch.setattr(config, "DOCS_PATH", docs_path)
+    monkeypatch.setattr(config, "PACKAGE_PATH", package_path)
+    for path in (docs_path / "items-complete.json", package_path / "docs" / "items-complete.json"):
+        _write_json(path, items)
+    _write_json(docs_path / "items-json-slot" / "items-head.json", {1038: items[1038]})
+    _write_json(docs_path / "items-json-slot" / "items-weapon.json", {4151: items[4151]})
+    _write_json(docs_path / "items-search.json",
+                {item_id: update_json_files.item_search_entry(item_json) for item_id, item_json in items.items()})
+
+    # The partyhat moves to another slot, the whip is renamed, and the coins are removed
+    partyhat = dict(items[1038], equipment=dict(items[1038]["equipment"], slot="neck"))
+    whip = dict(items[4151], name="Abyssal whop")
+    update_json_files.patch_items_files({1038: partyhat, 4151: whip}, ["995"])
+
+    for path in (docs_path / "items-complete.json", package_path / "docs" / "items-complete.json"):
+        assert _read_json(path) == {"1038": partyhat, "4151": whip}
+
+    # The snapshot and the record store are rewritten with the JSON file, and are not written to the package
+    path = docs_path / "items-complete.json"
+    assert snapshot.load_snapshot(ItemProperties, path) is not None
+    patched_items = all_items.AllItems(path, use_snapshot=True)
+    assert [(item.id, item.name, item.equipment.slot) for item in patched_items] == \
+        [(1038, "Red partyhat", "neck"), (4151, "Abyssal whop", "weapon")]
+    with record_store.RecordStore.open(path.with_suffix(record_store.DATA_SUFFIX)) as store:
+        assert list(store) == [1038, 4151]
+        assert store[4151] == whip
+    assert [path.name for path in (package_path / "docs").iterdir()] == ["items-complete.json"]
+
+    assert _read_json(docs_path / "items-json-slot" / "items-head.json") == {}
+    assert _read_json(docs_path / "items-json-slot" / "items-neck.json") == {"1038": partyhat}
+    assert _read_json(docs_path / "items-json-slot" / "items-weapon.json") == {"4151": whip}
+    assert _read_json(docs_path / "items-search.json") == {
+        "1038": {"id": 1038, "name": "Red partyhat", "type": "normal", "duplicate": False},
+        "4151": {"id": 4151, "name": "Abyssal whop", "type": "normal", "duplicate": False}}